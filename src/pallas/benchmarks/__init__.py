@@ -0,0 +1,6 @@
+from pallas.benchmarks.suites import Benchmark, collect_benchmarks
+from pallas.benchmarks.runner import load_results, run_benchmarks, save_results
+from pallas.benchmarks.compare import compare_results, mann_whitney_u
+
+__all__ = ['Benchmark', 'collect_benchmarks', 'load_results', 'run_benchmarks', 'save_results', 'compare_results',
+           'mann_whitney_u']
@@ -0,0 +1,70 @@
+import argparse
+import sys
+from pathlib import Path
+from typing import List, Optional
+from pallas.benchmarks.compare import REGRESSION, compare_results, format_comparisons
+from pallas.benchmarks.runner import format_result, load_results, run_benchmarks, save_results
+from pallas.benchmarks.suites import GROUPS, collect_benchmarks
+
+DEFAULT_RESULTS_PATH = Path('out') / 'bench.json'
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse the arguments of `pallas bench`."""
+    parser = argparse.ArgumentParser(prog='pallas bench', description='Pallas benchmark suite')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help='Run the benchmarks and write the results as JSON')
+    run.add_argument('--quick', action='store_true', help='Use fewer sizes, lengths and rule combinations')
+    run.add_argument('-g', '--group', action='append', choices=GROUPS, dest='groups',
+                     help='Run only this group of benchmarks. Can be given several times')
+    run.add_argument('-k', '--filter', dest='pattern', help='Run only the benchmarks whose name contains this text')
+    run.add_argument('--repeat', type=int, default=5,
+                     help='Samples per benchmark (default 5). Comparisons need 4 or more to reach p < 0.05')
+    run.add_argument('--min-time', type=float, metavar='SECONDS',
+                     help='Minimum duration of a sample, overriding the per-benchmark default')
+    run.add_argument('-o', '--output', type=Path, default=DEFAULT_RESULTS_PATH,
+                     help=f'Results file (default {DEFAULT_RESULTS_PATH})')
+    run.add_argument('--list', action='store_true', help='List the selected benchmarks without running them')
+
+    compare = commands.add_parser('compare', help='Compare results against a saved baseline')
+    compare.add_argument('baseline', type=Path, help='Baseline results file')
+    compare.add_argument('current', type=Path, help='Current results file')
+    compare.add_argument('--alpha', type=float, default=0.05,
+                         help='Significance level of the Mann-Whitney U test (default 0.05)')
+    compare.add_argument('--threshold', type=float, default=0.05,
+                         help='Relative change of the median time ignored as noise (default 0.05)')
+
+    args = parser.parse_args(argv)
+    if args.command == 'run' and args.repeat < 2:
+        parser.error("--repeat must be at least 2 for results to be compared")
+    return args
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run `pallas bench`.
+
+    Args:
+        argv: Arguments after 'bench'. If None, uses sys.argv.
+
+    Returns:
+        int: Exit status, 1 when a comparison finds a significant regression.
+    """
+    args = parse_args(argv)
+
+    if args.command == 'compare':
+        comparisons = compare_results(load_results(args.baseline), load_results(args.current),
+                                      args.alpha, args.threshold)
+        print(format_comparisons(comparisons))
+        return 1 if any(c['verdict'] == REGRESSION for c in comparisons) else 0
+
+    benchmarks = collect_benchmarks(args.quick, args.groups, args.pattern)
+    if args.list:
+        for benchmark in benchmarks:
+            print(benchmark.name)
+        return 0
+    results = run_benchmarks(benchmarks, args.repeat, args.min_time, progress=lambda r: print(format_result(r)))
+    save_results(results, args.output)
+    print(f"Wrote {len(results['benchmarks'])} results to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
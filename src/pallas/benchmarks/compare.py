@@ -0,0 +1,141 @@
+import math
+import statistics
+from typing import Any, Dict, List, Sequence, Tuple
+from pallas.benchmarks.runner import format_seconds
+
+# Samples per side below which the exact distribution of U is computed rather than approximated
+EXACT_LIMIT = 20
+
+REGRESSION = 'regression'
+IMPROVEMENT = 'improvement'
+UNCHANGED = 'unchanged'
+
+def mann_whitney_u(baseline: Sequence[float], current: Sequence[float]) -> Tuple[float, float]:
+    """Two-sided Mann-Whitney U test of whether two samples come from the same distribution.
+
+    Unlike a t-test it assumes nothing about the shape of the timing distribution, which is
+    usually skewed by outliers. Small samples without ties get the exact p-value, others the
+    normal approximation with tie correction.
+
+    Args:
+        baseline: The baseline samples.
+        current: The current samples.
+
+    Returns:
+        Tuple[float, float]: The U statistic of the current samples and the two-sided p-value.
+    """
+    n1, n2 = len(baseline), len(current)
+    if not n1 or not n2:
+        raise ValueError("Both samples must be non-empty")
+    ranks = _ranks(list(baseline) + list(current))
+    u = sum(ranks[n1:]) - n2 * (n2 + 1) / 2
+    mean = n1 * n2 / 2
+    ties = _tie_sizes(list(baseline) + list(current))
+
+    if n1 <= EXACT_LIMIT and n2 <= EXACT_LIMIT and not ties:
+        counts = _u_distribution(n1, n2)
+        total = sum(counts)
+        extreme = min(u, n1 * n2 - u)
+        tail = sum(counts[:int(math.floor(extreme)) + 1])
+        return u, min(1.0, 2 * tail / total)
+
+    n = n1 + n2
+    variance = n1 * n2 / 12 * ((n + 1) - sum(t ** 3 - t for t in ties) / (n * (n - 1)))
+    if variance <= 0:
+        return u, 1.0
+    # Continuity correction toward the mean
+    z = (abs(u - mean) - 0.5) / math.sqrt(variance)
+    return u, min(1.0, 2 * (1 - statistics.NormalDist().cdf(max(z, 0.0))))
+
+def _ranks(values: List[float]) -> List[float]:
+    """Rank values from 1, giving tied values the mean of their ranks."""
+    order = sorted(range(len(values)), key=values.__getitem__)
+    ranks = [0.0] * len(values)
+    i = 0
+    while i < len(order):
+        j = i
+        while j + 1 < len(order) and values[order[j + 1]] == values[order[i]]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[order[k]] = (i + j) / 2 + 1
+        i = j + 1
+    return ranks
+
+def _tie_sizes(values: List[float]) -> List[int]:
+    counts: Dict[float, int] = {}
+    for value in values:
+        counts[value] = counts.get(value, 0) + 1
+    return [count for count in counts.values() if count > 1]
+
+def _u_distribution(n1: int, n2: int) -> List[int]:
+    """Count the arrangements of n1 + n2 distinct values giving each U from 0 to n1 * n2."""
+    # counts[i][j][u] built over the values from smallest to largest, keeping only the last row
+    previous = [[1] + [0] * (n1 * n2) for _ in range(n2 + 1)]
+    for i in range(1, n1 + 1):
+        row = [[0] * (n1 * n2 + 1) for _ in range(n2 + 1)]
+        row[0][0] = 1
+        for j in range(1, n2 + 1):
+            # The largest value is either from the first sample, adding j to U, or from the second
+            for u in range(n1 * n2 + 1):
+                count = row[j - 1][u]
+                if u >= j:
+                    count += previous[j][u - j]
+                row[j][u] = count
+        previous = row
+    return previous[n2]
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any], alpha: float = 0.05,
+                    threshold: float = 0.05) -> List[Dict[str, Any]]:
+    """Compare the benchmarks two results documents have in common.
+
+    A benchmark regresses when its samples differ significantly and its median time grew by
+    more than the threshold, and improves in the opposite case.
+
+    Args:
+        baseline: The baseline results document.
+        current: The current results document.
+        alpha: Significance level of the Mann-Whitney U test.
+        threshold: Relative change of the median below which differences are ignored.
+
+    Returns:
+        List[Dict[str, Any]]: For each common benchmark, in current order, the medians, their
+            ratio, the p-value and a verdict of REGRESSION, IMPROVEMENT or UNCHANGED.
+    """
+    baseline_by_name = {result['name']: result for result in baseline['benchmarks']}
+    comparisons = []
+    for result in current['benchmarks']:
+        base = baseline_by_name.get(result['name'])
+        if base is None:
+            continue
+        base_median = statistics.median(base['samples'])
+        median = statistics.median(result['samples'])
+        ratio = median / base_median if base_median else math.inf
+        _, p_value = mann_whitney_u(base['samples'], result['samples'])
+        verdict = UNCHANGED
+        if p_value < alpha and ratio > 1 + threshold:
+            verdict = REGRESSION
+        elif p_value < alpha and ratio < 1 / (1 + threshold):
+            verdict = IMPROVEMENT
+        comparisons.append({
+            'name': result['name'],
+            'baseline_median': base_median,
+            'current_median': median,
+            'ratio': ratio,
+            'p_value': p_value,
+            'verdict': verdict,
+        })
+    return comparisons
+
+def format_comparisons(comparisons: List[Dict[str, Any]]) -> str:
+    """Format comparisons as a table, followed by counts of each verdict."""
+    width = max([len('benchmark')] + [len(comparison['name']) for comparison in comparisons])
+    lines = [f"{'benchmark':<{width}} {'baseline':>11} {'current':>11} {'ratio':>7} {'p':>7}  verdict"]
+    for comparison in comparisons:
+        lines.append(f"{comparison['name']:<{width}} {format_seconds(comparison['baseline_median'])} "
+                     f"{format_seconds(comparison['current_median'])} {comparison['ratio']:7.3f} "
+                     f"{comparison['p_value']:7.4f}  {comparison['verdict']}")
+    counts = {verdict: sum(c['verdict'] == verdict for c in comparisons)
+              for verdict in (REGRESSION, IMPROVEMENT, UNCHANGED)}
+    lines.append(f"{counts[REGRESSION]} regressions, {counts[IMPROVEMENT]} improvements, "
+                 f"{counts[UNCHANGED]} unchanged")
+    return "\n".join(lines)
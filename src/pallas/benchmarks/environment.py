@@ -0,0 +1,45 @@
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+def collect_environment() -> Dict[str, Any]:
+    """Describe the machine and build a benchmark ran on, so results are compared like for like.
+
+    Returns:
+        Dict[str, Any]: Interpreter, platform, CPU and source revision details and the time of the run.
+    """
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'executable': sys.executable,
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'pallas_version': _package_version(),
+        'git_commit': _git_commit(),
+    }
+
+def _package_version() -> Optional[str]:
+    try:
+        from importlib.metadata import PackageNotFoundError, version
+    except ImportError:
+        return None
+    try:
+        return version('pallas')
+    except PackageNotFoundError:
+        return None
+
+def _git_commit() -> Optional[str]:
+    """Get the commit of the source tree, or None outside a git checkout."""
+    try:
+        result = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=Path(__file__).parent,
+                                capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None if result.returncode == 0 else None
@@ -0,0 +1,87 @@
+import json
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+from pallas.benchmarks.environment import collect_environment
+from pallas.benchmarks.suites import Benchmark
+from pallas.benchmarks.timing import measure, summarize
+
+# Version of the results format, bumped when its fields change
+SCHEMA_VERSION = 1
+
+def run_benchmarks(benchmarks: List[Benchmark], repeat: int = 5, min_time: Optional[float] = None,
+                   progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """Run benchmarks and collect their results.
+
+    Each benchmark is set up in its own scratch directory, which is removed once it is timed.
+
+    Args:
+        benchmarks: The benchmarks to run.
+        repeat: Number of samples per benchmark.
+        min_time: Optional minimum duration of a sample, in seconds, overriding the benchmarks' own.
+        progress: Optional callback invoked with each result as it completes.
+
+    Returns:
+        Dict[str, Any]: The results document, with the environment and one entry per benchmark.
+    """
+    results = []
+    for benchmark in benchmarks:
+        with tempfile.TemporaryDirectory(prefix='pallas-bench-') as workdir:
+            func, items = benchmark.setup(Path(workdir))
+            samples, number = measure(func, repeat, benchmark.min_time if min_time is None else min_time)
+        result = {
+            'name': benchmark.name,
+            'group': benchmark.group,
+            'params': benchmark.params,
+            'number': number,
+            'samples': samples,
+            'stats': summarize(samples),
+        }
+        if items is not None and benchmark.item_unit:
+            result['items'] = items
+            result['item_unit'] = benchmark.item_unit
+            result['throughput'] = items / result['stats']['median'] if result['stats']['median'] else None
+        results.append(result)
+        if progress is not None:
+            progress(result)
+    return {
+        'schema': SCHEMA_VERSION,
+        'environment': collect_environment(),
+        'settings': {'repeat': repeat, 'min_time': min_time},
+        'benchmarks': results,
+    }
+
+def save_results(results: Dict[str, Any], path: Path) -> None:
+    """Write a results document as JSON."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
+        f.write('\n')
+
+def load_results(path: Path) -> Dict[str, Any]:
+    """Read a results document written by save_results.
+
+    Raises:
+        ValueError: If the file is not a results document of a supported schema.
+    """
+    with open(path) as f:
+        results = json.load(f)
+    if not isinstance(results, dict) or results.get('schema') != SCHEMA_VERSION:
+        raise ValueError(f"{path} is not a benchmark results file of schema {SCHEMA_VERSION}")
+    return results
+
+def format_result(result: Dict[str, Any]) -> str:
+    """Format one benchmark result as a line of the progress output."""
+    line = f"{result['name']:<48} median {format_seconds(result['stats']['median'])}"
+    line += f"  stdev {format_seconds(result['stats']['stdev'])}"
+    if result.get('throughput'):
+        line += f"  {result['throughput']:,.0f} {result['item_unit']}/s"
+    return line
+
+def format_seconds(seconds: float) -> str:
+    """Format a duration with a unit that keeps three or more significant digits."""
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('us', 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:8.3f} {unit:<2}"
+    return f"{seconds / 1e-9:8.1f} ns"
@@ -0,0 +1,178 @@
+import itertools
+import random
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from pallas.tools.Tool import Tool
+from pallas.tools.tool_map import tools as tool_map
+from pallas.toolchain.ToolChainer import ToolChainer
+from pallas.toolchain.ToolProvider import ToolProvider
+from pallas.toolchain.rules.RuleEnforcer import RuleEnforcer
+from pallas.toolchain.rules.rule_map import rules as rule_map
+from pallas.toolrun.ToolRunner import ToolRunner
+
+MICRO = 'micro'
+GENERATION = 'generation'
+RUN = 'run'
+GROUPS = (MICRO, GENERATION, RUN)
+
+# Input sizes of the tool micro-benchmarks, in plain-text characters
+TOOL_SIZES = (64, 4096, 262144)
+QUICK_TOOL_SIZES = (64, 4096)
+GENERATION_LENGTHS = tuple(range(3, 9))
+QUICK_GENERATION_LENGTHS = (3, 4)
+RUN_LENGTHS = (3, 4)
+QUICK_RUN_LENGTHS = (3,)
+RUN_INPUT = "Hello, World! 48 65 6c 6c 6f"
+
+# Builds the function to time in a scratch directory, returning it with the number of items one call handles
+Setup = Callable[[Path], Tuple[Callable[[], object], Optional[int]]]
+
+@dataclass
+class Benchmark:
+    """A named function to time, built on demand.
+
+    Attributes:
+        name: Unique name, such as 'micro/hex_encoder/str/4096'.
+        group: One of GROUPS.
+        setup: Builds the function to time and the number of items it handles per call.
+        params: Parameters identifying the case, written to the results.
+        item_unit: What the items are, for the throughput, such as 'chars' or 'chains'.
+        min_time: Minimum duration of a sample, in seconds. 0 times a single call per sample.
+    """
+    name: str
+    group: str
+    setup: Setup
+    params: Dict[str, Any] = field(default_factory=dict)
+    item_unit: Optional[str] = None
+    min_time: float = 0.05
+
+def collect_benchmarks(quick: bool = False, groups: Optional[Iterable[str]] = None,
+                       pattern: Optional[str] = None) -> List[Benchmark]:
+    """Collect the benchmarks of the suite.
+
+    Args:
+        quick: Whether to use the smaller set of sizes and lengths, for a fast check.
+        groups: Optional groups to include. If None, includes every group.
+        pattern: Optional substring the benchmark names must contain.
+
+    Returns:
+        List[Benchmark]: The selected benchmarks, in a stable order.
+    """
+    groups = set(groups or GROUPS)
+    benchmarks: List[Benchmark] = []
+    if MICRO in groups:
+        benchmarks += tool_benchmarks(QUICK_TOOL_SIZES if quick else TOOL_SIZES)
+    if GENERATION in groups:
+        combos = [(), tuple(rule_map)] if quick else rule_combinations()
+        benchmarks += generation_benchmarks(QUICK_GENERATION_LENGTHS if quick else GENERATION_LENGTHS, combos)
+    if RUN in groups:
+        benchmarks += runner_benchmarks(QUICK_RUN_LENGTHS if quick else RUN_LENGTHS)
+    if pattern:
+        benchmarks = [benchmark for benchmark in benchmarks if pattern in benchmark.name]
+    return benchmarks
+
+def rule_combinations() -> List[Tuple[str, ...]]:
+    """Get every subset of the available rules, from no rules to all of them."""
+    names = sorted(rule_map)
+    return [combo for size in range(len(names) + 1) for combo in itertools.combinations(names, size)]
+
+def tool_input(name: str, size: int, seed: int = 0) -> str:
+    """Build a valid input for a tool.
+
+    Decoders get the encoding of `size` random characters by the encoder whose inverse they are,
+    so `size` counts plain-text characters for every tool.
+
+    Args:
+        name: Name of the tool in tool_map.
+        size: Number of plain-text characters.
+        seed: Seed of the random text.
+
+    Returns:
+        str: Input the tool accepts.
+    """
+    rng = random.Random(seed)
+    encoder = next((cls() for cls in tool_map.values() if cls.inverse == name and cls.name != name), None)
+    if encoder is not None:
+        domain = sorted(encoder.inverse_chars or encoder.domain_chars)
+        text = "".join(rng.choice(domain) for _ in range(size))
+        output, error = encoder.execute(text)
+        if error:
+            raise ValueError(f"Cannot build input for {name}: {error.message}")
+        return output
+    domain = sorted(tool_map[name].domain_chars)
+    return "".join(rng.choice(domain) for _ in range(size))
+
+def tool_benchmarks(sizes: Sequence[int]) -> List[Benchmark]:
+    """Micro-benchmarks of every tool in tool_map, on str and bytes input of each size."""
+    benchmarks = []
+    for name in tool_map:
+        for mode in ('str', 'bytes'):
+            for size in sizes:
+                benchmarks.append(Benchmark(
+                    name=f"{MICRO}/{name}/{mode}/{size}",
+                    group=MICRO,
+                    params={'tool': name, 'mode': mode, 'size': size},
+                    setup=_tool_setup(name, mode, size),
+                    item_unit='chars',
+                ))
+    return benchmarks
+
+def _tool_setup(name: str, mode: str, size: int) -> Setup:
+    def setup(workdir: Path) -> Tuple[Callable[[], object], Optional[int]]:
+        tool: Tool = tool_map[name]()
+        text = tool_input(name, size)
+        if mode == 'bytes':
+            data = text.encode('latin1')
+            return (lambda: tool.execute_bytes(data)), len(data)
+        return (lambda: tool.execute(text)), len(text)
+    return setup
+
+def generation_benchmarks(lengths: Sequence[int], combos: Sequence[Tuple[str, ...]]) -> List[Benchmark]:
+    """Macro-benchmarks of ToolChainer.generate_chains for each chain length and rule combination."""
+    benchmarks = []
+    for length in lengths:
+        for combo in combos:
+            benchmarks.append(Benchmark(
+                name=f"{GENERATION}/{length}/{'+'.join(combo) or 'none'}",
+                group=GENERATION,
+                params={'length': length, 'rules': list(combo)},
+                setup=_generation_setup(length, combo),
+                item_unit='chains',
+                min_time=0,
+            ))
+    return benchmarks
+
+def _generation_setup(length: int, combo: Tuple[str, ...]) -> Setup:
+    def setup(workdir: Path) -> Tuple[Callable[[], object], Optional[int]]:
+        chainer = ToolChainer(ToolProvider(), max_tree_size=length,
+                              rule_enforcer=RuleEnforcer([rule_map[rule] for rule in combo]))
+        chainer.output_file = workdir / 'toolchain.txt'
+        return chainer.generate_chains, chainer.count()
+    return setup
+
+def runner_benchmarks(lengths: Sequence[int]) -> List[Benchmark]:
+    """Macro-benchmarks of ToolRunner.run over every chain of each length, in str and bytes mode."""
+    benchmarks = []
+    for length in lengths:
+        for mode in ('str', 'bytes'):
+            benchmarks.append(Benchmark(
+                name=f"{RUN}/{length}/{mode}",
+                group=RUN,
+                params={'length': length, 'mode': mode, 'input': RUN_INPUT},
+                setup=_runner_setup(length, mode),
+                item_unit='chains',
+                min_time=0,
+            ))
+    return benchmarks
+
+def _runner_setup(length: int, mode: str) -> Setup:
+    def setup(workdir: Path) -> Tuple[Callable[[], object], Optional[int]]:
+        provider = ToolProvider()
+        chainer = ToolChainer(provider, max_tree_size=length)
+        chains_file = workdir / f'toolchain_{length}.txt'
+        count = chainer.write_chains(chains_file, chainer.iter_chains())
+        runner = ToolRunner(str(chains_file), RUN_INPUT, tool_provider=provider, use_bytes=mode == 'bytes')
+        runner.output_dir = workdir
+        return runner.run, count
+    return setup
@@ -0,0 +1,62 @@
+import statistics
+import time
+from typing import Callable, Dict, List, Tuple
+
+def calibrate(func: Callable[[], object], min_time: float) -> int:
+    """Find how many calls make a sample last at least `min_time` seconds.
+
+    Args:
+        func: The function to time, called without arguments.
+        min_time: Minimum duration of a sample, in seconds.
+
+    Returns:
+        int: Number of calls per sample, a power of two.
+    """
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        if time.perf_counter() - start >= min_time:
+            return number
+        number *= 2
+
+def measure(func: Callable[[], object], repeat: int = 5, min_time: float = 0.05,
+            warmup: int = 1) -> Tuple[List[float], int]:
+    """Time a function over several samples.
+
+    Args:
+        func: The function to time, called without arguments.
+        repeat: Number of samples to take.
+        min_time: Minimum duration of a sample, in seconds. Fast functions run several times per sample.
+        warmup: Number of untimed calls made first, so caches and lazy tables are built.
+
+    Returns:
+        Tuple[List[float], int]: Seconds per call of each sample, and the number of calls per sample.
+    """
+    for _ in range(warmup):
+        func()
+    number = calibrate(func, min_time) if min_time > 0 else 1
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number)
+    return samples, number
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Summarize timing samples.
+
+    Args:
+        samples: Seconds per call of each sample.
+
+    Returns:
+        Dict[str, float]: The min, median, mean and standard deviation of the samples.
+    """
+    return {
+        'min': min(samples),
+        'median': statistics.median(samples),
+        'mean': statistics.fmean(samples),
+        'stdev': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+    }
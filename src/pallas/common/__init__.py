@@ -1,4 +1,5 @@
-from pallas.common.charsets import ASCII_CHARSET, EXTENDED_ASCII_CHARSET, OCTAL_CHARSET, DECIMAL_CHARSET, BASE64_CHARSET, HEX_CHARSET
+from pallas.common.charsets import ASCII_CHARSET, EXTENDED_ASCII_CHARSET, OCTAL_CHARSET, DECIMAL_CHARSET, BASE64_CHARSET, HEX_CHARSET, charset_mask
+from pallas.common.codec_tables import HEX_TOKENS, OCTAL_TOKENS, DECIMAL_TOKENS
 
 __all__ = [
     'ASCII_CHARSET',
@@ -6,5 +7,9 @@ __all__ = [
     'OCTAL_CHARSET',
     'DECIMAL_CHARSET',
     'BASE64_CHARSET',
-    'HEX_CHARSET'
+    'HEX_CHARSET',
+    'charset_mask',
+    'HEX_TOKENS',
+    'OCTAL_TOKENS',
+    'DECIMAL_TOKENS'
 ]
\ No newline at end of file
@@ -1,3 +1,5 @@
+from typing import Optional
+
 ASCII_CHARSET = set("".join(chr(i) for i in range(128)))
 EXTENDED_ASCII_CHARSET = set("".join(chr(i) for i in range(256)))
 
@@ -7,4 +9,21 @@ DECIMAL_CHARSET = set("0123456789")
 BASE64_CHARSET = set('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/=')
 
 # Hex charset is case-insensitive, so we only include lowercase
-HEX_CHARSET = set('0123456789abcdef')
\ No newline at end of file
+HEX_CHARSET = set('0123456789abcdef')
+
+def charset_mask(chars) -> Optional[int]:
+    """Build the bitmap of a set of characters, with bit i standing for chr(i).
+
+    Args:
+        chars: The characters, as a string or any iterable of characters.
+
+    Returns:
+        Optional[int]: The bitmap, or None if a character is above U+00FF and cannot be represented.
+    """
+    mask = 0
+    for c in set(chars):
+        code = ord(c)
+        if code > 255:
+            return None
+        mask |= 1 << code
+    return mask
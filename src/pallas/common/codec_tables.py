@@ -0,0 +1,27 @@
+# Token of every extended ASCII code in each radix, indexed by code. These are exactly the
+# strings the encoders emit, so they double as lookup tables for the decoders.
+HEX_TOKENS = [f"{i:02x}" for i in range(256)]
+OCTAL_TOKENS = [f"{i:o}" for i in range(256)]
+DECIMAL_TOKENS = [str(i) for i in range(256)]
+
+def decoding_table(tokens: list[str]) -> dict[str, str]:
+    """Map each token of a radix back to its character.
+
+    Args:
+        tokens: The tokens of a radix, indexed by code.
+
+    Returns:
+        dict[str, str]: Token to character.
+    """
+    return {token: chr(code) for code, token in enumerate(tokens)}
+
+def decoding_table_bytes(tokens: list[str]) -> dict[bytes, int]:
+    """Map the ASCII encoding of each token of a radix back to its code.
+
+    Args:
+        tokens: The tokens of a radix, indexed by code.
+
+    Returns:
+        dict[bytes, int]: Encoded token to code.
+    """
+    return {token.encode(): code for code, token in enumerate(tokens)}
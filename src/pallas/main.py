@@ -1,18 +1,29 @@
 import argparse
+import mmap
+import re
 import sys
+from contextlib import ExitStack
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Union
 import uuid
 
 from pallas.toolchain.ToolChainer import ToolChainer
 from pallas.toolchain.ToolProvider import ToolProvider
 from pallas.toolrun.ToolRunner import ToolRunner
+from pallas.toolrun.FusedRunner import FusedRunner
+from pallas.toolrun.BeamSearch import BeamSearch
+from pallas.toolrun.ResultCache import ResultCache
+from pallas.toolrun.PersistentCache import DEFAULT_CACHE_PATH, PersistentCache
+from pallas.scorers import CombinedScorer, RegexScorer, Scorer
+from pallas.scorers.scorer_map import get_available_scorers, get_scorer_help, scorers as scorer_map
 from pallas.toolchain.rules.rule_map import get_available_rules, get_rule_help, rules as rule_map
 from pallas.tools.tool_map import get_available_tools, get_tool_help, tools as tool_map
 from pallas.toolchain.rules.RuleEnforcer import RuleEnforcer
+from pallas.utils.input_file import open_input_file
+from pallas.utils.logging_helpers import TRACE_LIMIT
 
-def parse_args() -> argparse.Namespace:
-    """Parse command line arguments."""
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command line parser."""
     parser = argparse.ArgumentParser(description='Pallas Tool Chain Generator and Runner')
 
     # Tool chain generation options
@@ -26,25 +37,155 @@ def parse_args() -> argparse.Namespace:
                        help=f'Rules to apply to chains. Available rules:\n{get_rule_help()}\n')
     parser.add_argument('--tools', nargs='+', choices=get_available_tools(),
                        help=f'Tools to use in chains. Available tools:\n{get_tool_help()}\n')
+    parser.add_argument('-w', '--workers', type=int, default=1,
+                       help='Number of processes to generate chains with (default 1)')
+    parser.add_argument('--count', action='store_true',
+                       help='Print the number of valid chains without generating them')
+    parser.add_argument('--unrank', type=int, metavar='INDEX',
+                       help='Print the chain at a zero-based position of the generation order')
+    parser.add_argument('--sample', type=int, metavar='K',
+                       help='Generate a uniform random sample of K chains instead of all of them')
+    parser.add_argument('--seed', type=int, help='Seed for --sample')
+    parser.add_argument('--format', choices=['text', 'binary'], default='text', dest='output_format',
+                       help='Toolchain file format (default text). Runs detect the format automatically')
+    parser.add_argument('--sample-violations', type=int, metavar='N',
+                       help='With --verbose, log every Nth rule violation in full next to the periodic summaries')
+    parser.add_argument('--stats-json', type=str, metavar='PATH',
+                       help='Write per-depth search statistics (nodes, candidates, rejections per rule, '
+                            'branching factor) to PATH as JSON')
 
     # Tool chain running options
     parser.add_argument('-r', '--run', type=str, help='Run tool chains from a provided toolchain output file')
     parser.add_argument('-i', '--input', type=str, help='Input text to process through tool chain runs')
+    parser.add_argument('--input-file', type=str, metavar='PATH',
+                       help="File whose bytes, read as latin-1 text, are the input of --run or --all. "
+                            "The file is memory-mapped; use '-' to read standard input. Without --bytes or "
+                            "--stream the whole file is decoded into one string, so use one of them for large files")
+    parser.add_argument('--trie', action='store_true',
+                       help='Run chains through a prefix trie so each shared prefix is executed only once')
+    parser.add_argument('--bytes', action='store_true', dest='use_bytes',
+                       help='Pass latin-1 encoded buffers between tools instead of str, decoding only final outputs')
+    parser.add_argument('--stream', action='store_true',
+                       help='Stream each chain through its tools in chunks, so memory stays bounded for very large inputs')
+    parser.add_argument('--threads', type=int, default=1, metavar='N',
+                       help='Run chains on N threads sharing the tool instances (default 1)')
+    parser.add_argument('--trace', nargs='?', type=int, const=TRACE_LIMIT, metavar='CHARS',
+                       help='Log every step of every chain, cutting outputs to CHARS characters '
+                            f'(default {TRACE_LIMIT}). Slows long runs down')
+    parser.add_argument('--compile', action='store_true', dest='compile_chains',
+                       help='Compile each chain into an optimized callable before running it, cancelling tools '
+                            'followed by their inverse and fusing runs of encoders. Only pays off when many '
+                            'chains cancel or fuse')
+    parser.add_argument('--cache-size', type=int, metavar='MB',
+                       help='Cache tool results in memory, evicting the least recently used beyond MB megabytes')
+    parser.add_argument('--cache-db', nargs='?', const=str(DEFAULT_CACHE_PATH), metavar='PATH',
+                       help=f'Share tool results across runs through an SQLite cache (default path {DEFAULT_CACHE_PATH})')
+    parser.add_argument('--cache-db-size', type=int, default=1024, metavar='MB',
+                       help='Size limit of the --cache-db results in megabytes (default 1024)')
 
     # Full workflow option
-    parser.add_argument('-a', '--all', type=str, help='Run full workflow with input text. Specify --length (default 3)')
+    parser.add_argument('-a', '--all', nargs='?', const=True, metavar='TEXT',
+                       help='Run full workflow with input text, or with --input-file when TEXT is omitted. '
+                            'Specify --length (default 3)')
+    parser.add_argument('--fused', action='store_true',
+                       help='With --all, run each tool while generating and prune prefixes that fail')
 
+    # Plaintext search options
+    parser.add_argument('--search', type=str, help='Search for the tool chains that turn the input text into plaintext')
+    parser.add_argument('--beam-width', type=int, default=100, help='Number of outputs kept at each search depth (default 100)')
+    parser.add_argument('--max-depth', type=int, default=10, help='Maximum number of tools in a searched chain (default 10)')
+    parser.add_argument('--top-k', type=int, default=10, help='Number of best search results to write (default 10)')
+    parser.add_argument('--scorer', nargs='+', choices=get_available_scorers(),
+                       help=f'Plaintext scorers to search with (default ngram). Available scorers:\n{get_scorer_help()}\n')
+    parser.add_argument('--match', type=str, help='Regular expression the plaintext is expected to contain')
+
+    return parser
+
+def parse_args(parser: argparse.ArgumentParser) -> argparse.Namespace:
+    """Parse and validate command line arguments.
+
+    Args:
+        parser: The parser built by build_parser, whose error method reports bad input.
+    """
     args = parser.parse_args()
 
     # Validate argument combinations
-    if args.run and not args.input:
-        parser.error("--input is required when using --run")
+    if args.run and not (args.input or args.input_file):
+        parser.error("--input or --input-file is required when using --run")
+    if args.input and args.input_file:
+        parser.error("--input cannot be used with --input-file")
+    if args.input_file and not (args.all or args.run):
+        parser.error("--input-file requires --all or --run")
     if args.all and (args.run or args.input):
         parser.error("--all cannot be used with --run or --input")
+    if args.all is True and not args.input_file:
+        parser.error("--all needs input text or --input-file")
+    if isinstance(args.all, str) and args.input_file:
+        parser.error("--all cannot take input text together with --input-file")
     if args.all and not args.length:
         parser.error("--length is required when using --all")
-    if not args.all and not args.run and not args.length:
+    if args.cache_size is not None and args.cache_size < 1:
+        parser.error("--cache-size must be at least 1")
+    if args.cache_db_size < 1:
+        parser.error("--cache-db-size must be at least 1")
+    if (args.cache_size is not None or args.cache_db) and not (args.all or args.run):
+        parser.error("--cache-size and --cache-db require --all or --run")
+    if args.use_bytes and not (args.all or args.run):
+        parser.error("--bytes requires --all or --run")
+    if args.use_bytes and (args.fused or args.cache_size is not None or args.cache_db):
+        parser.error("--bytes cannot be used with --fused, --cache-size or --cache-db")
+    if args.threads < 1:
+        parser.error("--threads must be at least 1")
+    if args.trace is not None and args.trace < 0:
+        parser.error("--trace must be at least 0")
+    if args.threads > 1 and not (args.all or args.run):
+        parser.error("--threads requires --all or --run")
+    if args.threads > 1 and (args.fused or args.trie or args.stream or args.cache_size is not None or args.cache_db):
+        parser.error("--threads cannot be used with --fused, --trie, --stream, --cache-size or --cache-db")
+    if args.stream and not (args.all or args.run):
+        parser.error("--stream requires --all or --run")
+    if args.stream and (args.fused or args.trie or args.cache_size is not None or args.cache_db):
+        parser.error("--stream cannot be used with --fused, --trie, --cache-size or --cache-db")
+    if args.compile_chains and not (args.all or args.run):
+        parser.error("--compile requires --all or --run")
+    if args.compile_chains and (args.fused or args.trie or args.stream or args.cache_size is not None or args.cache_db):
+        parser.error("--compile cannot be used with --fused, --trie, --stream, --cache-size or --cache-db")
+    if args.search and (args.all or args.run or args.input or args.input_file):
+        parser.error("--search cannot be used with --all, --run, --input or --input-file")
+    if args.search and (args.beam_width < 1 or args.max_depth < 1 or args.top_k < 1):
+        parser.error("--beam-width, --max-depth and --top-k must be at least 1")
+    if not args.search and (args.scorer or args.match):
+        parser.error("--scorer and --match require --search")
+    if args.match:
+        try:
+            re.compile(args.match)
+        except re.error as e:
+            parser.error(f"--match is not a valid regular expression: {e}")
+    if not args.all and not args.run and not args.search and not args.length:
         parser.error("--length is required for chain generation")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.sample_violations is not None and args.sample_violations < 1:
+        parser.error("--sample-violations must be at least 1")
+    if args.sample_violations is not None and not args.verbose:
+        parser.error("--sample-violations requires --verbose")
+    if args.stats_json and (args.run or args.search or args.count or args.unrank is not None or args.fused or
+                            args.sample is not None):
+        parser.error("--stats-json cannot be used with --run, --search, --count, --unrank, --fused or --sample")
+    if (args.count or args.unrank is not None) and (args.all or args.run):
+        parser.error("--count and --unrank cannot be used with --all or --run")
+    if (args.count or args.unrank is not None) and args.sample is not None:
+        parser.error("--count and --unrank cannot be used with --sample")
+    if args.sample is not None and (args.run or args.search):
+        parser.error("--sample requires --all or chain generation")
+    if args.seed is not None and args.sample is None:
+        parser.error("--seed requires --sample")
+    if args.sample is not None and args.sample < 0:
+        parser.error("--sample must be at least 0")
+    if args.fused and not args.all:
+        parser.error("--fused requires --all")
+    if args.fused and (args.workers > 1 or args.sample is not None or args.trie):
+        parser.error("--fused cannot be used with --workers, --sample or --trie")
 
     return args
 
@@ -61,15 +202,87 @@ def create_rule_enforcer(rule_names: Optional[list[str]] = None) -> RuleEnforcer
         return RuleEnforcer([])
     return RuleEnforcer([rule_map[rule] for rule in rule_names])
 
-def run_full_workflow(input_text: str, length: int, verbose: bool, rules: list[str] = None, tool_names: list[str] = None) -> None:
+def create_scorer(scorer_names: Optional[list[str]] = None, match: Optional[str] = None) -> Scorer:
+    """Create the scorer for a plaintext search.
+
+    Args:
+        scorer_names: Optional list of scorer names. If None, uses the n-gram scorer unless a match is given.
+        match: Optional regular expression the plaintext is expected to contain.
+
+    Returns:
+        Scorer instance, combining all requested scorers with equal weights.
+    """
+    scorers = [scorer_map[name]() for name in scorer_names or ([] if match else ['ngram'])]
+    if match:
+        scorers.append(RegexScorer(match))
+    if len(scorers) == 1:
+        return scorers[0]
+    return CombinedScorer(scorers)
+
+def run_search(input_text: str, verbose: bool, tool_names: list[str] = None, scorer_names: list[str] = None,
+               match: Optional[str] = None, beam_width: int = 100, max_depth: int = 10, top_k: int = 10) -> None:
+    """Search for the tool chains that turn the input text into plaintext.
+
+    Args:
+        input_text: The text to decode.
+        verbose: Whether to enable verbose logging.
+        tool_names: Optional list of tool names to use. If None, uses all available tools.
+        scorer_names: Optional list of scorer names to rate outputs with.
+        match: Optional regular expression the plaintext is expected to contain.
+        beam_width: Number of outputs kept at each depth.
+        max_depth: Maximum number of tools in a chain.
+        top_k: Number of best results to write.
+    """
+    tools = ToolProvider(tool_names=tool_names).discover_tools()
+    search = BeamSearch(tools, create_scorer(scorer_names, match), beam_width=beam_width, max_depth=max_depth,
+                        top_k=top_k, verbose=verbose)
+    search.run(input_text)
+
+def create_cache(cache_size: Optional[int] = None, cache_db: Optional[str] = None,
+                 cache_db_size: int = 1024) -> Optional[ResultCache]:
+    """Create the tool result cache.
+
+    Args:
+        cache_size: Optional in-memory cache size in megabytes. Defaults to 64 when only a database is given.
+        cache_db: Optional path of the SQLite database shared across runs.
+        cache_db_size: Size limit of the database results in megabytes.
+
+    Returns:
+        ResultCache instance, or None if caching is disabled.
+    """
+    if cache_size is None and cache_db is None:
+        return None
+    backend = PersistentCache(Path(cache_db), max_bytes=cache_db_size * 1024 * 1024) if cache_db else None
+    return ResultCache((64 if cache_size is None else cache_size) * 1024 * 1024, backend=backend)
+
+def run_full_workflow(input_text: Union[str, bytes, mmap.mmap], length: int, verbose: bool, rules: list[str] = None, tool_names: list[str] = None,
+                      use_trie: bool = False, workers: int = 1, sample: Optional[int] = None,
+                      seed: Optional[int] = None, output_format: str = 'text', fused: bool = False,
+                      cache: Optional[ResultCache] = None, use_bytes: bool = False, streaming: bool = False,
+                      threads: int = 1, compile_chains: bool = False, trace: Optional[int] = None,
+                      violation_sample: Optional[int] = None, stats_file: Optional[str] = None) -> None:
     """Run the full workflow: generate chains and execute them.
 
     Args:
-        input_text: The input text to process through the chains.
+        input_text: The input text to process through the chains, or a buffer of its latin-1 codes.
         length: Maximum length of tool chains to generate.
         verbose: Whether to enable verbose logging.
         rules: List of rule names to apply.
         tool_names: Optional list of tool names to use. If None, uses all available tools.
+        use_trie: Whether to execute the chains through a prefix trie.
+        workers: Number of processes to generate chains with.
+        sample: Optional number of chains to sample instead of running all of them.
+        seed: Optional seed for the sample.
+        output_format: Format of the generated toolchain file, 'text' or 'binary'.
+        fused: Whether to run tools during generation and prune failing prefixes.
+        cache: Optional cache to run tools through.
+        use_bytes: Whether to pass latin-1 encoded buffers between tools.
+        streaming: Whether to stream each chain through its tools in chunks.
+        threads: Number of threads to run the chains on.
+        compile_chains: Whether to compile each chain before running it.
+        trace: Optional number of characters of each payload to write in per-step trace logs.
+        violation_sample: In verbose mode, log one rule violation in this many in full.
+        stats_file: Optional path to write the per-depth search statistics to as JSON.
     """
     # Generate a UUID for this run
     run_id = str(uuid.uuid4())
@@ -79,48 +292,119 @@ def run_full_workflow(input_text: str, length: int, verbose: bool, rules: list[s
     rule_enforcer = create_rule_enforcer(rules)
 
     # Generate tool chains
-    chainer = ToolChainer(tool_provider=tool_provider, max_tree_size=length, verbose=verbose, rule_enforcer=rule_enforcer)
-    toolchains_dir = chainer.generate_chains(run_id=run_id)
+    chainer = ToolChainer(tool_provider=tool_provider, max_tree_size=length, verbose=verbose, rule_enforcer=rule_enforcer,
+                          workers=workers, output_format=output_format, violation_sample=violation_sample,
+                          stats_file=stats_file)
+
+    if fused:
+        if not isinstance(input_text, str):
+            input_text = str(input_text, 'latin1')
+        FusedRunner(chainer, input_text, verbose=verbose, run_id=run_id, cache=cache, trace=trace).run()
+        return
+
+    chainer.generate_chains(run_id=run_id, sample=sample, seed=seed)
 
     # Execute the chains
     runner = ToolRunner(
-        toolchains_file=toolchains_dir / f'toolchain_{run_id}.txt',
+        toolchains_file=chainer.output_file,
         input_text=input_text,
         tool_provider=tool_provider,
         verbose=verbose,
-        output_filename=f'toolrun_{run_id}.txt'
+        output_filename=f'toolrun_{run_id}.txt',
+        use_trie=use_trie,
+        cache=cache,
+        use_bytes=use_bytes,
+        streaming=streaming,
+        threads=threads,
+        compile_chains=compile_chains,
+        trace=trace
     )
     runner.run()
 
-def run_tool_chains(toolchains_file: str, input_text: str, verbose: bool, tool_names: list[str] = None) -> None:
+def run_tool_chains(toolchains_file: str, input_text: Union[str, bytes, mmap.mmap], verbose: bool, tool_names: list[str] = None,
+                    use_trie: bool = False, cache: Optional[ResultCache] = None, use_bytes: bool = False,
+                    streaming: bool = False, threads: int = 1, compile_chains: bool = False,
+                    trace: Optional[int] = None) -> None:
     """Run tool chains from a file.
 
     Args:
         toolchains_file: Path to the file containing tool chains.
-        input_text: The input text to process.
+        input_text: The input text to process, or a buffer of its latin-1 codes.
         verbose: Whether to enable verbose output.
         tool_names: Optional list of tool names to use. If None, uses all available tools.
+        use_trie: Whether to execute the chains through a prefix trie.
+        cache: Optional cache to run tools through.
+        use_bytes: Whether to pass latin-1 encoded buffers between tools.
+        streaming: Whether to stream each chain through its tools in chunks.
+        threads: Number of threads to run the chains on.
+        compile_chains: Whether to compile each chain before running it.
+        trace: Optional number of characters of each payload to write in per-step trace logs.
     """
     tool_provider = ToolProvider(tool_names=tool_names)
-    runner = ToolRunner(toolchains_file, input_text, tool_provider=tool_provider, verbose=verbose)
+    runner = ToolRunner(toolchains_file, input_text, tool_provider=tool_provider, verbose=verbose, use_trie=use_trie,
+                        cache=cache, use_bytes=use_bytes, streaming=streaming,
+                        threads=threads, compile_chains=compile_chains, trace=trace)
     runner.run()
 
 def main() -> None:
-    """Main entry point."""
-    args = parse_args()
+    """Main entry point. `pallas bench ...` runs the benchmark suite instead."""
+    if sys.argv[1:2] == ['bench']:
+        from pallas.benchmarks.cli import main as bench_main
+        sys.exit(bench_main(sys.argv[2:]))
+
+    parser = build_parser()
+    args = parse_args(parser)
+
+    if args.sample is not None:
+        total = ToolChainer(tool_provider=ToolProvider(tool_names=args.tools), max_tree_size=args.length,
+                            rule_enforcer=create_rule_enforcer(args.rules)).count()
+        if args.sample > total:
+            parser.error(f"--sample {args.sample} is larger than the {total} valid chains")
 
-    if args.all:
-        run_full_workflow(args.all, args.length, args.verbose, args.rules, args.tools)
-    elif args.run:
-        run_tool_chains(args.run, args.input, args.verbose, args.tools)
+    if args.all or args.run:
+        cache = create_cache(args.cache_size, args.cache_db, args.cache_db_size)
+        try:
+            with ExitStack() as stack:
+                if args.input_file:
+                    try:
+                        input_text = stack.enter_context(open_input_file(args.input_file))
+                    except OSError as e:
+                        parser.error(f"cannot read --input-file: {e}")
+                else:
+                    input_text = args.all if args.all else args.input
+                if args.all:
+                    run_full_workflow(input_text, args.length, args.verbose, args.rules, args.tools, args.trie,
+                                      args.workers, args.sample, args.seed, args.output_format, args.fused, cache,
+                                      args.use_bytes, args.stream, args.threads, args.compile_chains, args.trace,
+                                      args.sample_violations, args.stats_json)
+                else:
+                    run_tool_chains(args.run, input_text, args.verbose, args.tools, args.trie, cache, args.use_bytes,
+                                    args.stream, args.threads, args.compile_chains, args.trace)
+        finally:
+            if cache is not None:
+                cache.close()
+    elif args.search:
+        run_search(args.search, args.verbose, args.tools, args.scorer, args.match, args.beam_width, args.max_depth,
+                   args.top_k)
     else:
         # Generate tool chains
         tool_provider = ToolProvider(tool_names=args.tools)
         rule_enforcer = create_rule_enforcer(args.rules)
 
-        chainer = ToolChainer(tool_provider=tool_provider, max_tree_size=args.length, verbose=args.verbose, rule_enforcer=rule_enforcer)
-        run_id = str(uuid.uuid4())
-        chainer.generate_chains(run_id=run_id)
+        chainer = ToolChainer(tool_provider=tool_provider, max_tree_size=args.length, verbose=args.verbose, rule_enforcer=rule_enforcer,
+                              workers=args.workers, output_format=args.output_format,
+                              violation_sample=args.sample_violations, stats_file=args.stats_json)
+        if args.count:
+            print(chainer.count())
+        elif args.unrank is not None:
+            try:
+                chain = chainer.unrank(args.unrank)
+            except IndexError as e:
+                parser.error(f"--unrank: {e}")
+            print(' -> '.join(chainer.tools[i].name for i in chain))
+        else:
+            run_id = str(uuid.uuid4())
+            chainer.generate_chains(run_id=run_id, sample=args.sample, seed=args.seed)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -0,0 +1,23 @@
+from abc import ABC, abstractmethod
+
+class Scorer(ABC):
+    """Abstract base class for plaintext scorers.
+
+    A scorer rates how much a string looks like the plaintext being searched for.
+    Scores range from 0.0 (certainly not plaintext) to 1.0 (certainly plaintext), so
+    scorers can be combined and compared across search modes.
+    """
+    name: str = "scorer"
+    description: str = "A scorer"
+
+    @abstractmethod
+    def score(self, text: str) -> float:
+        """Score a candidate plaintext.
+
+        Args:
+            text: The string to score.
+
+        Returns:
+            float: A score between 0.0 and 1.0.
+        """
+        pass
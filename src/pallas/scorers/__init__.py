@@ -0,0 +1,7 @@
+from pallas.scorers.Scorer import Scorer
+from pallas.scorers.printable import PrintableScorer
+from pallas.scorers.ngram import NgramScorer
+from pallas.scorers.regex import RegexScorer
+from pallas.scorers.combined import CombinedScorer
+
+__all__ = ['Scorer', 'PrintableScorer', 'NgramScorer', 'RegexScorer', 'CombinedScorer']
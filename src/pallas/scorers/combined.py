@@ -0,0 +1,21 @@
+from typing import List, Optional
+from pallas.scorers.Scorer import Scorer
+
+class CombinedScorer(Scorer):
+    name = "combined"
+    description = "Weighted average of several scorers"
+
+    def __init__(self, scorers: List[Scorer], weights: Optional[List[float]] = None):
+        """Initialize the scorer.
+
+        Args:
+            scorers: The scorers to combine.
+            weights: Optional weight per scorer. If None, all scorers weigh the same.
+        """
+        self.scorers = scorers
+        self.weights = weights or [1.0] * len(scorers)
+        self.total_weight = sum(self.weights)
+
+    def score(self, text: str) -> float:
+        """Score the text by the weighted average of all scorers."""
+        return sum(weight * scorer.score(text) for scorer, weight in zip(self.scorers, self.weights)) / self.total_weight
@@ -0,0 +1,59 @@
+import math
+from pallas.scorers.Scorer import Scorer
+from pallas.common.english import BIGRAM_FREQUENCIES, LETTER_FREQUENCIES
+
+LETTERS = 'abcdefghijklmnopqrstuvwxyz'
+
+class NgramScorer(Scorer):
+    """Scores text with the bundled English letter-bigram model.
+
+    Bigrams missing from the bundled table fall back to the product of their letter
+    frequencies, discounted so listed bigrams stay more likely. Pairs across a space are word
+    boundaries and are not scored. Pairs holding any other character than a letter, such as
+    the digits of hex output, get a floor log-probability below that of the rarest letter
+    bigram. The mean log-probability of the text's bigrams is placed between that of uniformly
+    random letters (0.0) and that of text drawn from the model itself (1.0), then weighted by
+    the share of letters and spaces.
+    """
+    name = "ngram"
+    description = "Likelihood of the text under a bundled English letter-bigram model"
+
+    def __init__(self):
+        letter_total = sum(LETTER_FREQUENCIES.values())
+        weights = {}
+        for first in LETTERS:
+            for second in LETTERS:
+                pair = first + second
+                if pair in BIGRAM_FREQUENCIES:
+                    weights[pair] = BIGRAM_FREQUENCIES[pair]
+                else:
+                    weights[pair] = 0.5 * LETTER_FREQUENCIES[first] * LETTER_FREQUENCIES[second] / letter_total
+        total = sum(weights.values())
+        self.log_probs = {pair: math.log10(weight / total) for pair, weight in weights.items()}
+        # Ten times less likely than the rarest letter bigram
+        self.floor = min(self.log_probs.values()) - 1.0
+
+        self.random_mean = sum(self.log_probs.values()) / len(self.log_probs)
+        self.english_mean = sum(weight / total * self.log_probs[pair] for pair, weight in weights.items())
+
+    def score(self, text: str) -> float:
+        """Score the text by how English its letter bigrams are."""
+        if not text:
+            return 0.0
+
+        lowered = text.lower()
+        log_probs = self.log_probs
+        floor = self.floor
+        total = 0.0
+        count = 0
+        for pair in map(str.__add__, lowered, lowered[1:]):
+            if ' ' in pair:
+                continue
+            total += log_probs.get(pair, floor)
+            count += 1
+        if count == 0:
+            return 0.0
+
+        letters = sum(1 for c in lowered if c in LETTER_FREQUENCIES or c == ' ')
+        likeness = (total / count - self.random_mean) / (self.english_mean - self.random_mean)
+        return min(max(likeness, 0.0), 1.0) * letters / len(text)
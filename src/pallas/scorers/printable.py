@@ -0,0 +1,15 @@
+import string
+from pallas.scorers.Scorer import Scorer
+
+# Translation table deleting every printable ASCII character
+_PRINTABLE_DELETE = str.maketrans('', '', string.printable)
+
+class PrintableScorer(Scorer):
+    name = "printable"
+    description = "Ratio of printable ASCII characters in the text"
+
+    def score(self, text: str) -> float:
+        """Score the text by the share of its characters that are printable ASCII."""
+        if not text:
+            return 0.0
+        return 1.0 - len(text.translate(_PRINTABLE_DELETE)) / len(text)
@@ -0,0 +1,14 @@
+import re
+from pallas.scorers.Scorer import Scorer
+
+class RegexScorer(Scorer):
+    name = "regex"
+    description = "1.0 if the text matches a user-supplied regular expression, 0.0 otherwise"
+
+    def __init__(self, pattern: str):
+        """Initialize the scorer with the pattern to search for."""
+        self.pattern = re.compile(pattern)
+
+    def score(self, text: str) -> float:
+        """Score the text by whether the pattern occurs in it."""
+        return 1.0 if self.pattern.search(text) else 0.0
@@ -0,0 +1,22 @@
+from pallas.scorers.printable import PrintableScorer
+from pallas.scorers.ngram import NgramScorer
+
+# Map of scorer names to their classes
+scorers = {
+    'printable': PrintableScorer,
+    'ngram': NgramScorer,
+}
+
+# Help text for each scorer
+scorer_help = {
+    'printable': "Ratio of printable ASCII characters.",
+    'ngram': "Likelihood under a bundled English letter-bigram model.",
+}
+
+def get_available_scorers() -> list[str]:
+    """Get a list of available scorer names."""
+    return list(scorers.keys())
+
+def get_scorer_help() -> str:
+    """Get formatted help text for all available scorers."""
+    return "\n".join(f"  {name}: {help_text}" for name, help_text in scorer_help.items())
@@ -0,0 +1,138 @@
+import random
+from typing import Dict, Hashable, Iterator, List, Optional, Tuple
+from pallas.toolchain.rules.RuleEnforcer import RuleEnforcer
+
+class ChainCounter:
+    """Counts, samples and unranks valid chains without enumerating them.
+
+    The number of valid completions of a prefix only depends on its length, its last tool,
+    the set of tools already used and the state keys of the stateful rules. Memoizing on that
+    search state turns counting into a dynamic program over at most
+    length x tools x 2^tools x rule states entries instead of one visit per chain.
+
+    Chains are ranked in the same depth-first order ToolChainer.iter_chains yields them.
+    """
+
+    def __init__(self, tool_count: int, max_tree_size: int, rule_enforcer: RuleEnforcer):
+        """Initialize the counter.
+
+        Args:
+            tool_count: Number of tools chains are built from.
+            max_tree_size: Length of the chains to count.
+            rule_enforcer: A RuleEnforcer already compiled for the tools.
+        """
+        self.tool_count = tool_count
+        self.max_tree_size = max_tree_size
+        self.rule_enforcer = rule_enforcer
+        self.memo: Dict[Tuple[int, Optional[int], int, Hashable], int] = {}
+
+    def count(self) -> int:
+        """Count all valid chains.
+
+        Returns:
+            int: The number of chains ToolChainer would generate.
+        """
+        if self.max_tree_size <= 0:
+            return 0
+        self.rule_enforcer.start([])
+        return self._count([], self._all_tools())
+
+    def unrank(self, index: int) -> List[int]:
+        """Get the chain at a position of the depth-first generation order.
+
+        Args:
+            index: Zero-based position of the chain.
+
+        Returns:
+            List[int]: Indices of the tools in the chain.
+
+        Raises:
+            IndexError: If the index is outside the range of valid chains.
+        """
+        total = self.count()
+        if not 0 <= index < total:
+            raise IndexError(f"Chain index {index} out of range for {total} chains")
+
+        chain: List[int] = []
+        available = self._all_tools()
+        while len(chain) < self.max_tree_size:
+            for tool_index in self._candidates(chain, available):
+                chain.append(tool_index)
+                self.rule_enforcer.push(tool_index)
+                subtree = self._count(chain, available & ~(1 << tool_index))
+                if index < subtree:
+                    available &= ~(1 << tool_index)
+                    break
+                index -= subtree
+                self.rule_enforcer.pop()
+                chain.pop()
+        return chain
+
+    def sample(self, k: int, seed: Optional[int] = None) -> List[List[int]]:
+        """Draw a uniform random sample of distinct chains.
+
+        Args:
+            k: Number of chains to draw.
+            seed: Optional seed for reproducible samples.
+
+        Returns:
+            List[List[int]]: The sampled chains, in generation order.
+
+        Raises:
+            ValueError: If k is larger than the number of valid chains.
+        """
+        total = self.count()
+        if not 0 <= k <= total:
+            raise ValueError(f"Cannot sample {k} chains out of {total}")
+        indices = sorted(random.Random(seed).sample(range(total), k))
+        return [self.unrank(index) for index in indices]
+
+    def _count(self, chain: List[int], available: int) -> int:
+        """Count the valid completions of a prefix whose tools are pushed into the rules.
+
+        Args:
+            chain: The prefix, as tool indices.
+            available: Bitmask of tools not used by the prefix.
+
+        Returns:
+            int: Number of valid chains starting with the prefix.
+        """
+        if len(chain) == self.max_tree_size:
+            return 1
+
+        key = (len(chain), chain[-1] if chain else None, available, self.rule_enforcer.state_key(chain))
+        if key in self.memo:
+            return self.memo[key]
+
+        total = 0
+        for tool_index in self._candidates(chain, available):
+            chain.append(tool_index)
+            self.rule_enforcer.push(tool_index)
+            total += self._count(chain, available & ~(1 << tool_index))
+            self.rule_enforcer.pop()
+            chain.pop()
+
+        self.memo[key] = total
+        return total
+
+    def _candidates(self, chain: List[int], available: int) -> Iterator[int]:
+        """Yield the valid next tools of a prefix in ascending index order.
+
+        Args:
+            chain: The prefix, as tool indices.
+            available: Bitmask of tools not used by the prefix.
+
+        Yields:
+            int: Index of each valid next tool.
+        """
+        mask = self.rule_enforcer.allowed_mask(chain[-1] if chain else None, available)
+        while mask:
+            lowest = mask & -mask
+            tool_index = lowest.bit_length() - 1
+            mask ^= lowest
+            if self.rule_enforcer.check_next(chain, tool_index, record=False) is None:
+                yield tool_index
+
+    def _all_tools(self) -> int:
+        """Bitmask with every tool available."""
+        return (1 << self.tool_count) - 1
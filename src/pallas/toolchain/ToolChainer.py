@@ -1,40 +1,63 @@
+import itertools
+import json
+import shutil
 import time
-from typing import List, Set, Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Type
 from pallas.tools.Tool import Tool
 from pathlib import Path
 from pallas.toolchain.ToolProvider import ToolProvider
-from pallas.toolchain.ChainContext import ChainContext
+from pallas.toolchain.ChainCounter import ChainCounter
 from pallas.toolchain.rules.RuleEnforcer import RuleEnforcer
+from pallas.toolchain.rules.ViolationTelemetry import ViolationTelemetry
 from pallas.utils.tree_utils import calculate_max_tree_size
 from pallas.utils.logging_config import get_logger
+from pallas.utils.chain_file import encode_record, write_binary_header
 
 class ToolChainer:
     """Class responsible for generating valid tool chains."""
 
     def __init__(self, tool_provider: ToolProvider, max_tree_size: int = 3,
                  output_filename: Optional[str] = None, verbose: bool = False,
-                 rule_enforcer: Optional['RuleEnforcer'] = None):
+                 rule_enforcer: Optional['RuleEnforcer'] = None, workers: int = 1,
+                 output_format: Optional[str] = None, violation_sample: Optional[int] = None,
+                 stats_file: Optional[str] = None):
         """Initialize the tool chainer.
 
         Args:
             tool_provider: ToolProvider instance to use for loading tools.
             max_tree_size: Maximum number of tools in a chain.
             output_filename: Optional filename for the output file. If None, uses 'toolchain.txt'.
-            verbose: Whether to enable verbose logging.
+            verbose: Whether to enable verbose logging. Rule violations are then aggregated per
+                rule, tool pair and depth and logged in periodic summary tables.
             rule_enforcer: Optional RuleEnforcer instance to use for chain validation.
+            workers: Number of processes to generate chains with. Values above 1 split the
+                search by its first tools and run the subtrees in a process pool.
+            output_format: 'text' or 'binary'. If None, binary is used when the output filename
+                ends in '.bin' and text otherwise.
+            violation_sample: In verbose mode, log one rule violation in this many in full.
+            stats_file: Optional path to write the search statistics to as JSON after generating.
         """
         self.tool_provider = tool_provider
         self.max_tree_size = max_tree_size
         self.verbose = verbose
         self.tools: List[Tool] = []
-        self.valid_chains: List[List[str]] = []
+        self.chain_count: int = 0
         self.visited_nodes: int = 0
+        # Nodes the search reached, indexed by chain length from the root to the leaves
+        self.depth_nodes: List[int] = []
+        self.stats_file = Path(stats_file) if stats_file else None
+        self.write_batch_size = 4096
+        self.workers = workers
         self.output_file = Path('out') / (output_filename or 'toolchain.txt')
+        self.output_format = output_format or ('binary' if self.output_file.suffix == '.bin' else 'text')
         self.output_file.parent.mkdir(parents=True, exist_ok=True)
         self.pruned_chains: List[List[Tool]] = []
         self.phase_times = {}
         self.rule_enforcer = rule_enforcer or RuleEnforcer([])
         self.logger = get_logger(__name__, verbose)
+        if verbose:
+            self.rule_enforcer.enable_telemetry(ViolationTelemetry(self.logger, sample_every=violation_sample))
 
     def _log(self, message: str, level: str = 'info') -> None:
         """Log a message with the specified level.
@@ -46,65 +69,325 @@ class ToolChainer:
         log_func = getattr(self.logger, level.lower())
         log_func(message)
 
-    def generate_chains(self, run_id: Optional[str] = None) -> Path:
-        """Generate all valid tool chains and write them to a file.
+    def generate_chains(self, run_id: Optional[str] = None, sample: Optional[int] = None,
+                        seed: Optional[int] = None) -> Path:
+        """Generate all valid tool chains and stream them to a file.
 
         Args:
             run_id: Optional UUID to use in the output filename. If None, uses 'toolchain.txt'.
+            sample: Optional number of chains to draw uniformly at random instead of writing all.
+            seed: Optional seed for the random sample.
 
         Returns:
             Path: The output directory path.
         """
-        # Reset state
         self.logger.run_id = run_id
-        self.valid_chains = []
-        self.visited_nodes = 0
-
-        self._load_tools()
-
-        available_tools = set(range(len(self.tools)))
-        self._generate_chains([], available_tools)
 
         if run_id:
-            self.output_file = self.output_file.parent / f'toolchain_{run_id}.txt'
+            suffix = '.bin' if self.output_format == 'binary' else '.txt'
+            self.output_file = self.output_file.parent / f'toolchain_{run_id}{suffix}'
 
-        with open(self.output_file, 'w') as f:
-            for chain in self.valid_chains:
-                f.write(' -> '.join(self.tools[i].name for i in chain) + '\n')
+        if sample is not None:
+            self.chain_count = self.write_chains(self.output_file, self.sample(sample, seed))
+        elif self.workers > 1 and self.max_tree_size > 1:
+            self._generate_chains_parallel()
+        else:
+            self.write_chains(self.output_file, self.iter_chains())
 
         if self.verbose:
             max_possible_nodes = calculate_max_tree_size(self.tools, self.max_tree_size)
             self._log(self.rule_enforcer.format_stats(max_possible_nodes, self.visited_nodes))
+            self._log(self.format_search_stats())
+
+        if self.stats_file is not None:
+            self.write_search_stats(self.stats_file)
 
         return self.output_file.parent
 
-    def _generate_chains(self, current_chain: List[str], available_tools: Set[str]) -> None:
-        """Recursively generate valid tool chains.
+    def get_search_stats(self) -> Dict[str, Any]:
+        """Get the shape of the last search, depth by depth.
+
+        Depth d describes the nodes holding chains of d tools: how many the search reached, how
+        many candidates it tested to extend them, how many of those each rule rejected and how
+        many nodes of the complete tree that cut, and how many children survived per node.
+
+        Returns:
+            Dict holding the totals of the search and a list of per-depth entries.
+        """
+        depth_stats = self.rule_enforcer.get_depth_stats()
+        rule_names = list(depth_stats['rejections'])
+        depths = []
+        for depth, nodes in enumerate(self.depth_nodes):
+            def at(counters: List[int]) -> int:
+                return counters[depth] if depth < len(counters) else 0
+
+            children = self.depth_nodes[depth + 1] if depth + 1 < len(self.depth_nodes) else 0
+            depths.append({
+                'depth': depth,
+                'nodes': nodes,
+                'candidates': at(depth_stats['candidates']),
+                'rejections': {rule_name: at(depth_stats['rejections'][rule_name]) for rule_name in rule_names},
+                'pruned_nodes': {rule_name: at(depth_stats['pruned_nodes'][rule_name]) for rule_name in rule_names},
+                'branching_factor': children / nodes if nodes else 0.0,
+            })
+        return {
+            'tools': [tool.name for tool in self.tools],
+            'max_tree_size': self.max_tree_size,
+            'chain_count': self.chain_count,
+            'max_possible_nodes': calculate_max_tree_size(self.tools, self.max_tree_size),
+            'rule_stats': self.rule_enforcer.get_rule_stats(),
+            'depths': depths,
+        }
+
+    def format_search_stats(self) -> str:
+        """Format the per-depth search statistics as a table.
+
+        Returns:
+            str: One row per depth with its nodes, candidates, rejections per rule and
+            surviving branching factor.
+        """
+        stats = self.get_search_stats()
+        rule_names = list(stats['rule_stats'])
+        widths = [max(len(rule_name), 10) for rule_name in rule_names]
+        header = f"  {'depth':>5} {'nodes':>12} {'candidates':>12} {'branching':>9}"
+        header += ''.join(f" {rule_name:>{width}}" for rule_name, width in zip(rule_names, widths))
+        lines = ["Search tree by depth (rejections per rule):", header]
+        for entry in stats['depths']:
+            row = (f"  {entry['depth']:>5} {entry['nodes']:>12} {entry['candidates']:>12} "
+                   f"{entry['branching_factor']:>9.2f}")
+            row += ''.join(f" {entry['rejections'][rule_name]:>{width}}" for rule_name, width in zip(rule_names, widths))
+            lines.append(row)
+        return "\n".join(lines)
+
+    def write_search_stats(self, path: Path) -> None:
+        """Write the per-depth search statistics to a JSON file.
 
         Args:
-            current_chain: Current chain being built.
-            available_tools: Set of tool names available for the next step.
+            path: File to write.
         """
-        self.visited_nodes += 1
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(self.get_search_stats(), f, indent=2)
+            f.write('\n')
+
+    def iter_chains(self, expand: Optional[Callable[[List[int]], bool]] = None) -> Iterator[List[int]]:
+        """Yield every valid tool chain as a list of tool indices.
+
+        Tools are loaded eagerly; chains are then produced lazily in depth-first order, so
+        memory stays proportional to the chain length no matter how many chains are emitted.
+
+        Args:
+            expand: Optional callback invoked with the chain each time a tool passes the rules
+                and is appended. Returning False prunes that node and its whole subtree.
+
+        Returns:
+            Iterator[List[int]]: Indices into `self.tools` for each tool in the chain.
+        """
+        self.chain_count = 0
+        self.visited_nodes = 0
+        self._load_tools()
+        self.rule_enforcer.compile(self.tools, self.max_tree_size)
+        self.depth_nodes = [0] * (self.max_tree_size + 1)
+        return self._iter_chains([], self.max_tree_size, expand)
+
+    def count(self) -> int:
+        """Count the valid chains without enumerating them.
+
+        Returns:
+            int: The number of chains generate_chains would write.
+        """
+        return self._chain_counter().count()
+
+    def sample(self, k: int, seed: Optional[int] = None) -> List[List[int]]:
+        """Draw a uniform random sample of distinct valid chains.
+
+        Args:
+            k: Number of chains to draw.
+            seed: Optional seed for reproducible samples.
+
+        Returns:
+            List[List[int]]: The sampled chains as tool indices, in generation order.
+        """
+        return self._chain_counter().sample(k, seed)
+
+    def unrank(self, index: int) -> List[int]:
+        """Get the chain at a position of the generation order without enumerating the others.
+
+        Args:
+            index: Zero-based position of the chain.
 
-        if len(current_chain) >= self.max_tree_size:
+        Returns:
+            List[int]: Indices into `self.tools` for each tool in the chain.
+        """
+        return self._chain_counter().unrank(index)
+
+    def _chain_counter(self) -> ChainCounter:
+        """Load the tools, compile the rules and create a counter over them."""
+        self._load_tools()
+        self.rule_enforcer.compile(self.tools, self.max_tree_size)
+        return ChainCounter(len(self.tools), self.max_tree_size, self.rule_enforcer)
+
+    def _generate_chains_parallel(self) -> None:
+        """Generate chains in a process pool, partitioned by chain prefix.
+
+        The parent walks the first one or two levels of the tree itself and hands contiguous
+        runs of the resulting prefixes to the workers. Each worker builds its own
+        RuleEnforcer and writes its chains to a part file. Part files and statistics are merged
+        in prefix order, so the output matches a serial run.
+        """
+        self.chain_count = 0
+        self.visited_nodes = 0
+        self._load_tools()
+        self.rule_enforcer.compile(self.tools, self.max_tree_size)
+        self.depth_nodes = [0] * (self.max_tree_size + 1)
+
+        split_depth = 1 if len(self.tools) >= 2 * self.workers else 2
+        split_depth = min(split_depth, self.max_tree_size - 1)
+        prefixes = list(self._iter_chains([], split_depth))
+        self.chain_count = 0
+
+        task_count = min(len(prefixes), self.workers * 4)
+        tasks = []
+        for task_index in range(task_count):
+            start = len(prefixes) * task_index // task_count
+            end = len(prefixes) * (task_index + 1) // task_count
+            part_file = self.output_file.parent / f'.{self.output_file.name}.part{task_index}'
+            tasks.append((prefixes[start:end], part_file))
+        self._log(f"Generating chains with {self.workers} workers over {len(prefixes)} prefixes of length {split_depth}", 'debug')
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            results = executor.map(_generate_partition,
+                                   [self.tool_provider] * task_count,
+                                   [self.rule_enforcer.rules] * task_count,
+                                   [self.rule_enforcer.telemetry is not None] * task_count,
+                                   [self.max_tree_size] * task_count,
+                                   [self.output_format] * task_count,
+                                   [prefixes for prefixes, _ in tasks],
+                                   [part_file for _, part_file in tasks])
+
+            with open(self.output_file, 'wb') as f:
+                if self.output_format == 'binary':
+                    write_binary_header(f, [tool.name for tool in self.tools], self.max_tree_size)
+                for (_, part_file), result in zip(tasks, results):
+                    with open(part_file, 'rb') as part:
+                        shutil.copyfileobj(part, f)
+                    part_file.unlink()
+                    self.chain_count += result['chain_count']
+                    self.visited_nodes += result['visited_nodes']
+                    for depth, nodes in enumerate(result['depth_nodes']):
+                        self.depth_nodes[depth] += nodes
+                    self.rule_enforcer.merge_stats(result['rule_enforcer'])
+
+    def write_chains(self, output_file: Path, chains: Iterable[List[int]], include_header: bool = True) -> int:
+        """Stream chains to a file in buffered batches.
+
+        Args:
+            output_file: Path of the file to write.
+            chains: Iterable of chains as lists of tool indices.
+            include_header: Whether to start a binary file with its header. Part files that
+                are concatenated after a header leave it out.
+
+        Returns:
+            int: The number of chains written.
+        """
+        names = [tool.name for tool in self.tools]
+        binary = self.output_format == 'binary'
+        written = 0
+        batch = []
+        with open(output_file, 'wb' if binary else 'w') as f:
+            if binary and include_header:
+                write_binary_header(f, names, self.max_tree_size)
+            for chain in chains:
+                if binary:
+                    batch.append(encode_record(chain))
+                else:
+                    batch.append(' -> '.join(names[i] for i in chain) + '\n')
+                if len(batch) >= self.write_batch_size:
+                    f.write((b'' if binary else '').join(batch))
+                    written += len(batch)
+                    batch.clear()
+            f.write((b'' if binary else '').join(batch))
+            written += len(batch)
+        return written
+
+    def _iter_chains(self, chain: List[int], max_length: int,
+                     expand: Optional[Callable[[List[int]], bool]] = None) -> Iterator[List[int]]:
+        """Iteratively walk the chain tree depth-first and yield valid chains.
+
+        A single chain list is extended and shrunk in place while a stack holds the
+        remaining candidates for each level, so no recursion is involved.
+
+        Each node is counted in depth_nodes when it is appended, and the root only when it is
+        the empty chain, so a prefix yielded by one walk and continued by another counts once.
+
+        Args:
+            chain: Prefix to start from. It is extended in place and restored on return.
+            max_length: Length of the chains to yield.
+            expand: Optional callback that can prune a node after it passed the rules.
+
+        Yields:
+            List[int]: A copy of each valid chain of length `max_length`.
+        """
+        base_depth = len(chain)
+        self.rule_enforcer.start(chain)
+        self.visited_nodes += 1
+        depth_nodes = self.depth_nodes
+        if base_depth == 0:
+            depth_nodes[0] += 1
+        if base_depth >= max_length:
             return
 
-        for tool_name in available_tools:
-            # Check if the next tool follows all rules
-            if not self._is_valid_next_tool(current_chain, tool_name):
-                continue
+        available = (1 << len(self.tools)) - 1
+        for tool_index in chain:
+            available &= ~(1 << tool_index)
+        stack = [self._candidates(chain, available)]
+        while stack:
+            for tool_index in stack[-1]:
+                # Check if the next tool follows the rules that could not be compiled
+                if not self._is_valid_next_tool(chain, tool_index):
+                    continue
+
+                chain.append(tool_index)
+                if expand is not None and not expand(chain):
+                    chain.pop()
+                    continue
 
-            new_chain = current_chain + [tool_name]
+                depth_nodes[len(chain)] += 1
+                if len(chain) == max_length:
+                    self.chain_count += 1
+                    yield list(chain)
+                    chain.pop()
+                    continue
 
-            # Only add to valid_chains if at max_tree_size
-            if len(new_chain) == self.max_tree_size:
-                self.valid_chains.append(new_chain)
+                self.visited_nodes += 1
+                self.rule_enforcer.push(tool_index)
+                available &= ~(1 << tool_index)
+                stack.append(self._candidates(chain, available))
+                break
             else:
-                self._generate_chains(new_chain, available_tools - {tool_name})
+                stack.pop()
+                if len(chain) > base_depth:
+                    available |= 1 << chain.pop()
+                    self.rule_enforcer.pop()
 
-    def _is_valid_next_tool(self, current_chain: List[str], next_tool: str) -> bool:
-        """Check if the next tool is valid according to all rules.
+    def _candidates(self, chain: List[int], available: int) -> Iterator[int]:
+        """Yield the tools allowed next by the compiled rules, in ascending index order.
+
+        Args:
+            chain: Current chain being built.
+            available: Bitmask of tools not yet used in the chain.
+
+        Yields:
+            int: Index of each candidate tool.
+        """
+        mask = self.rule_enforcer.allowed_next(chain[-1] if chain else None, available, len(chain), chain)
+        while mask:
+            lowest = mask & -mask
+            yield lowest.bit_length() - 1
+            mask ^= lowest
+
+    def _is_valid_next_tool(self, current_chain: List[int], next_tool: int) -> bool:
+        """Check if the next tool is valid according to the rules that could not be compiled.
 
         Args:
             current_chain: Current chain being built.
@@ -113,20 +396,46 @@ class ToolChainer:
         Returns:
             bool: True if the next tool is valid, False otherwise.
         """
-        context = ChainContext(
-            current_chain=current_chain,
-            next_tool=next_tool,
-            target_length=self.max_tree_size,
-            tools=self.tools
-        )
+        if not self.rule_enforcer.dynamic_rules:
+            return True
 
-        if error := self.rule_enforcer.validate_chain_against_rules(context):
-            if self.verbose:
-                self._log(f"Rule violation: {error.message}", 'warning')
-            return False
-
-        return True
+        return self.rule_enforcer.check_next(current_chain, next_tool) is None
 
     def _load_tools(self) -> None:
         """Load all available tools."""
-        self.tools = self.tool_provider.discover_tools()
\ No newline at end of file
+        self.tools = self.tool_provider.discover_tools()
+
+def _generate_partition(tool_provider: ToolProvider, rules: List[Type], telemetry: bool, max_tree_size: int,
+                        output_format: str, prefixes: List[List[int]], part_file: Path) -> Dict[str, Any]:
+    """Generate the chains below a run of prefixes in a worker process.
+
+    Args:
+        tool_provider: ToolProvider to load the tools from.
+        rules: Rule classes to build the worker's own RuleEnforcer from.
+        telemetry: Whether to aggregate violations, which the parent merges and reports.
+        max_tree_size: Length of the chains to generate.
+        output_format: Format of the part file, 'text' or 'binary'.
+        prefixes: Chain prefixes, as tool indices, whose subtrees this worker covers.
+        part_file: File to write this partition's chains to.
+
+    Returns:
+        Dict with the chain count, visited nodes, nodes per depth and rule statistics of the partition.
+    """
+    rule_enforcer = RuleEnforcer(rules)
+    if telemetry:
+        rule_enforcer.enable_telemetry()
+    chainer = ToolChainer(tool_provider=tool_provider, max_tree_size=max_tree_size, rule_enforcer=rule_enforcer,
+                          output_format=output_format)
+    chainer._load_tools()
+    rule_enforcer.compile(chainer.tools, max_tree_size)
+    chainer.depth_nodes = [0] * (max_tree_size + 1)
+
+    chains = itertools.chain.from_iterable(chainer._iter_chains(list(prefix), max_tree_size) for prefix in prefixes)
+    chainer.write_chains(part_file, chains, include_header=False)
+
+    return {
+        'chain_count': chainer.chain_count,
+        'visited_nodes': chainer.visited_nodes,
+        'depth_nodes': chainer.depth_nodes,
+        'rule_enforcer': rule_enforcer.get_stats(),
+    }
@@ -10,6 +10,12 @@ class AlternatingRule(ChainRule):
     - If the current tool is a decoder, the next tool must be an encoder
     """
 
+    pairwise = True
+    messages = {
+        'encoder_after_encoder': "Non-alternating chain: {last} -> {next}. Encoder must be followed by decoder",
+        'decoder_after_decoder': "Non-alternating chain: {last} -> {next}. Decoder must be followed by encoder",
+    }
+
     @staticmethod
     def validate(chain_context: ChainContext) -> ChainRuleException | None:
         """Validate that tools alternate between encoder and decoder.
@@ -34,12 +40,10 @@ class AlternatingRule(ChainRule):
 
         # If current tool is an encoder, next must be a decoder
         if current_is_encoder and next_is_encoder:
-            return ChainRuleException(chain_context=chain_context, message=f"Non-alternating chain: {current_tool.name} -> {next_tool.name}. \
-Encoder must be followed by decoder")
+            return AlternatingRule.violation(chain_context, 'encoder_after_encoder')
 
         # If current tool is a decoder, next must be an encoder
         if current_is_decoder and next_is_decoder:
-            return ChainRuleException(chain_context=chain_context, message=f"Non-alternating chain: {current_tool.name} -> {next_tool.name}. \
-Decoder must be followed by encoder")
+            return AlternatingRule.violation(chain_context, 'decoder_after_decoder')
 
         return None
\ No newline at end of file
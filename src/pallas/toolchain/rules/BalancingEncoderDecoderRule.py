@@ -1,3 +1,4 @@
+from typing import Hashable, List
 from pallas.toolchain.rules.ChainRule import ChainRule
 from pallas.toolchain.ChainContext import ChainContext
 from pallas.toolchain.rules.ChainRuleException import ChainRuleException
@@ -10,6 +11,14 @@ class BalancingEncoderDecoderRule(ChainRule):
     - For odd-length chains: difference between encoders and decoders is at most 1
     """
 
+    stateful = True
+    messages = {
+        'unbalanced_even': "Unbalanced chain: {encoders} encoders, {decoders} decoders. Even-length chains must have "
+                           "equal numbers of encoders and decoders for chain: {chain} and next tool: {next}",
+        'unbalanced_odd': "Unbalanced chain: {encoders} encoders, {decoders} decoders. Odd-length chains must have "
+                          "at most 1 more encoder than decoder or vice versa for chain: {chain} and next tool: {next}",
+    }
+
     @staticmethod
     def validate(chain_context: ChainContext) -> ChainRuleException | None:
         """Validate that the chain has balanced encoder/decoder operations.
@@ -36,15 +45,83 @@ class BalancingEncoderDecoderRule(ChainRule):
                 decode_count += 1
 
         total_length = len(chain_context.current_chain) + (1 if chain_context.next_tool is not None else 0) - other_count
+        return BalancingEncoderDecoderRule._check_counts(chain_context, encode_count, decode_count, total_length % 2 == 0)
+
+    def reset(self, tools: List, target_length: int) -> None:
+        """Reset the running encoder/decoder counts."""
+        super().reset(tools, target_length)
+        self.kinds = [1 if '_encoder' in tool.name else -1 if '_decoder' in tool.name else 0 for tool in tools]
+        self.encode_count = 0
+        self.decode_count = 0
+
+    def push(self, tool: int) -> None:
+        """Add the pushed tool to the running counts."""
+        super().push(tool)
+        if self.kinds[tool] > 0:
+            self.encode_count += 1
+        elif self.kinds[tool] < 0:
+            self.decode_count += 1
+
+    def pop(self) -> None:
+        """Remove the popped tool from the running counts."""
+        tool = self.chain[-1]
+        super().pop()
+        if self.kinds[tool] > 0:
+            self.encode_count -= 1
+        elif self.kinds[tool] < 0:
+            self.decode_count -= 1
+
+    def state_key(self) -> Hashable:
+        """Key the state on emptiness, encoder/decoder difference and parity."""
+        return (bool(self.chain), self.encode_count - self.decode_count, (self.encode_count + self.decode_count) % 2)
+
+    def check(self, next_tool: int) -> ChainRuleException | None:
+        """Check a candidate against the running counts in constant time."""
+        if not self.chain:
+            return None
+
+        encode_count = self.encode_count
+        decode_count = self.decode_count
+        # Mirrors validate, where tools that are neither encoders nor decoders add an even
+        # amount to the computed length, so only encoders and decoders decide its parity.
+        is_even = (encode_count + decode_count + 1) % 2 == 0
+        if self.kinds[next_tool] > 0:
+            encode_count += 1
+        elif self.kinds[next_tool] < 0:
+            decode_count += 1
+
+        if is_even and encode_count == decode_count:
+            return None
+        if not is_even and abs(encode_count - decode_count) <= 1:
+            return None
+
+        context = ChainContext(current_chain=self.chain, next_tool=next_tool,
+                               target_length=self.target_length, tools=self.tools)
+        return self._check_counts(context, encode_count, decode_count, is_even)
+
+    @staticmethod
+    def _check_counts(chain_context: ChainContext, encode_count: int, decode_count: int,
+                      is_even: bool) -> ChainRuleException | None:
+        """Check encoder/decoder counts that already include the next tool.
+
+        Args:
+            chain_context: The context containing information about the chain.
+            encode_count: Number of encoders including the next tool.
+            decode_count: Number of decoders including the next tool.
+            is_even: Whether the chain counts as even-length.
+
+        Returns:
+            ChainRuleException if the counts are unbalanced, None otherwise.
+        """
         diff = abs(encode_count - decode_count)
 
-        if total_length % 2 == 0:
+        if is_even:
             if encode_count != decode_count:
-                return ChainRuleException(chain_context=chain_context, message=f"Unbalanced chain: {encode_count} encoders, {decode_count} decoders. \
-Even-length chains must have equal numbers of encoders and decoders for chain: {chain_context.print_chain()} and next tool: {chain_context.print_next_tool()}")
+                return BalancingEncoderDecoderRule.violation(chain_context, 'unbalanced_even',
+                                                             encoders=encode_count, decoders=decode_count)
         else:
             if diff > 1:
-                return ChainRuleException(chain_context=chain_context, message=f"Unbalanced chain: {encode_count} encoders, {decode_count} decoders. \
-Odd-length chains must have at most 1 more encoder than decoder or vice versa for chain: {chain_context.print_chain()} and next tool: {chain_context.print_next_tool()}")
+                return BalancingEncoderDecoderRule.violation(chain_context, 'unbalanced_odd',
+                                                             encoders=encode_count, decoders=decode_count)
 
-        return None
\ No newline at end of file
+        return None
@@ -1,7 +1,7 @@
 from abc import ABC, abstractmethod
 from pallas.toolchain.ChainContext import ChainContext
 from pallas.toolchain.rules.ChainRuleException import ChainRuleException
-from typing import Optional
+from typing import Dict, Hashable, List, Optional
 
 class ChainRule(ABC):
     """Abstract base class for chain rules.
@@ -9,8 +9,24 @@ class ChainRule(ABC):
     Any class implementing ChainRule must implement the validate method.
     The validate method should return None if the chain is valid according to the rule,
     and a ChainRuleException otherwise.
+
+    Rules whose verdict depends only on the last tool of the chain and the next tool should
+    set `pairwise = True`. Such rules never reject the first tool of a chain and are compiled
+    into a transition table once per tool set instead of being validated per candidate.
+
+    Rules that depend on the whole chain can set `stateful = True` and override the push, pop
+    and check hooks. The chainer pushes each tool as its search descends and pops it when
+    it backtracks, so the rule can keep running counts and check a candidate in O(1).
+
+    Violations are returned as structured records carrying a reason code. Their messages are
+    rendered from the rule's `messages` templates only when read, see describe.
     """
 
+    pairwise: bool = False
+    stateful: bool = False
+    # Message template of each reason code, formatted by describe
+    messages: Dict[str, str] = {}
+
     @staticmethod
     @abstractmethod
     def validate(chain_context: ChainContext) -> Optional[ChainRuleException]:
@@ -22,4 +38,116 @@ class ChainRule(ABC):
         Returns:
             Optional[ChainRuleException]: An exception if the chain is invalid, None otherwise.
         """
-        return
\ No newline at end of file
+        return
+
+    @classmethod
+    def violation(cls, chain_context: ChainContext, reason: str, **details) -> ChainRuleException:
+        """Make a violation of this rule without rendering its message.
+
+        Args:
+            chain_context: The context of the rejected candidate.
+            reason: Key of the rule's message template.
+            details: Values the rule computed while checking, available to the template.
+
+        Returns:
+            ChainRuleException: The structured violation.
+        """
+        return ChainRuleException(chain_context, rule=cls, reason=reason, details=details)
+
+    @classmethod
+    def describe(cls, error: ChainRuleException) -> str:
+        """Render the message of a violation of this rule.
+
+        The template of the violation's reason is formatted with `last` and `next`, the names of
+        the last tool of the chain and of the candidate, `chain`, the names of the whole chain,
+        and the violation's details.
+
+        Args:
+            error: A violation made by this rule.
+
+        Returns:
+            str: The human-readable message.
+        """
+        tools = error.tools
+        fields = {
+            'last': tools[error.chain[-1]].name if error.chain else None,
+            'next': tools[error.next_tool].name if error.next_tool is not None else None,
+            'chain': " -> ".join(tools[i].name for i in error.chain),
+            **error.details,
+        }
+        return cls.messages[error.reason].format(**fields)
+
+    @classmethod
+    def compile(cls, tools: List, target_length: int) -> Optional[List[int]]:
+        """Compile the rule into a transition table of allowed next tools.
+
+        Args:
+            tools: The tools chains are built from.
+            target_length: Length of the chains being generated.
+
+        Returns:
+            Optional[List[int]]: Entry i is a bitmask of the tool indices allowed to follow
+            tool i, or None if the rule is not pairwise and must be validated per candidate.
+        """
+        if not cls.pairwise:
+            return None
+
+        table = []
+        for last_tool in range(len(tools)):
+            mask = 0
+            for next_tool in range(len(tools)):
+                context = ChainContext(current_chain=[last_tool], next_tool=next_tool,
+                                       target_length=target_length, tools=tools)
+                if cls.validate(context) is None:
+                    mask |= 1 << next_tool
+            table.append(mask)
+        return table
+
+    def reset(self, tools: List, target_length: int) -> None:
+        """Reset the incremental state before a search starts.
+
+        Args:
+            tools: The tools chains are built from.
+            target_length: Length of the chains being generated.
+        """
+        self.tools = tools
+        self.target_length = target_length
+        self.chain: List[int] = []
+
+    def push(self, tool: int) -> None:
+        """Record that a tool was appended to the chain.
+
+        Args:
+            tool: Index of the appended tool.
+        """
+        self.chain.append(tool)
+
+    def pop(self) -> None:
+        """Record that the last tool was removed from the chain."""
+        self.chain.pop()
+
+    def state_key(self) -> Hashable:
+        """Summarize the incremental state for memoized counting.
+
+        Two chains with the same last tool, the same used tools and equal state keys must
+        accept exactly the same continuations. The default key is the whole chain, which is
+        always correct; stateful rules should return something smaller.
+
+        Returns:
+            Hashable: A key describing everything future checks depend on.
+        """
+        return tuple(self.chain)
+
+    def check(self, next_tool: int) -> Optional[ChainRuleException]:
+        """Check a candidate next tool against the current incremental state.
+
+        The default implementation falls back to validate on the tracked chain.
+
+        Args:
+            next_tool: Index of the candidate tool.
+
+        Returns:
+            Optional[ChainRuleException]: An exception if the candidate is invalid, None otherwise.
+        """
+        return self.validate(ChainContext(current_chain=self.chain, next_tool=next_tool,
+                                          target_length=self.target_length, tools=self.tools))
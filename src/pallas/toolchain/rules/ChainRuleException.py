@@ -1,9 +1,60 @@
+from typing import Any, Dict, List, Optional, Tuple, Type
 from pallas.toolchain.ChainContext import ChainContext
 
 class ChainRuleException(ValueError):
-    """Exception raised when a chain rule is violated."""
+    """Exception raised when a chain rule is violated.
 
-    def __init__(self, chain_context: ChainContext, message: str):
-        self.chain_context = chain_context
-        self.message = message
-        super().__init__(self.message)
\ No newline at end of file
+    A violation is a lightweight structured record: the rule that raised it, a reason code, the
+    tool indices of the chain and the candidate next tool, and any values the rule computed. The
+    human-readable message is only rendered, by the rule's describe method, when it is read, so a
+    search rejecting millions of candidates builds no strings. The chain is copied when the
+    violation is made, so its message stays correct after the search moves on.
+    """
+
+    def __init__(self, chain_context: ChainContext, message: Optional[str] = None, rule: Optional[Type] = None,
+                 reason: Optional[str] = None, details: Optional[Dict[str, Any]] = None):
+        """Initialize the violation.
+
+        Args:
+            chain_context: The context of the rejected candidate.
+            message: A message given up front, for rules that do not use reason codes.
+            rule: The rule class that rejected the candidate, used to render the message.
+            reason: Code identifying why the candidate was rejected.
+            details: Values the rule computed while checking, used to render the message.
+        """
+        super().__init__()
+        self.tools: List = chain_context.tools
+        self.chain: Tuple[int, ...] = tuple(chain_context.current_chain or ())
+        self.next_tool: Optional[int] = chain_context.next_tool
+        self.target_length: int = chain_context.target_length
+        self.rule = rule
+        self.reason = reason
+        self.details = details or {}
+        self._message = message
+
+    @property
+    def rule_id(self) -> Optional[str]:
+        """Name of the rule that rejected the candidate, as used in the rule statistics."""
+        return self.rule.__name__ if self.rule is not None else None
+
+    @property
+    def chain_context(self) -> ChainContext:
+        """The context of the rejected candidate, rebuilt from the recorded tool indices."""
+        return ChainContext(current_chain=list(self.chain), next_tool=self.next_tool,
+                            target_length=self.target_length, tools=self.tools)
+
+    @property
+    def message(self) -> str:
+        """The human-readable message, rendered on first access."""
+        if self._message is None:
+            if self.rule is not None:
+                self._message = self.rule.describe(self)
+            else:
+                self._message = f"Rule violation ({self.reason}) for chain: {self.chain_context.print_chain_with_next_tool()}"
+        return self._message
+
+    def __str__(self) -> str:
+        return self.message
+
+    def __reduce__(self):
+        return (type(self), (self.chain_context, self._message, self.rule, self.reason, self.details))
@@ -14,6 +14,12 @@ class CharacterSetRule(ChainRule):
       - Range chars equal domain chars
     """
 
+    pairwise = True
+    messages = {
+        'charset_mismatch': "Character set mismatch: {last} -> {next}. "
+                            "Range chars ({range_chars}) incompatible with domain chars ({domain_chars})",
+    }
+
     @staticmethod
     def validate(chain_context: ChainContext) -> ChainRuleException | None:
         """Validate that adjacent tools have compatible character sets.
@@ -38,7 +44,14 @@ class CharacterSetRule(ChainRule):
                    range_chars == domain_chars)
 
         if not is_valid:
-            return ChainRuleException(chain_context=chain_context, message=f"Character set mismatch: {current_tool.name} -> {next_tool.name}. \
-Range chars ({sorted(range_chars)}) incompatible with domain chars ({sorted(domain_chars)})")
+            return CharacterSetRule.violation(chain_context, 'charset_mismatch')
+
+        return None
 
-        return None
\ No newline at end of file
+    @classmethod
+    def describe(cls, error: ChainRuleException) -> str:
+        """Render a mismatch with the sorted character sets of both tools."""
+        return cls.messages[error.reason].format(
+            last=error.tools[error.chain[-1]].name, next=error.tools[error.next_tool].name,
+            range_chars=sorted(error.tools[error.chain[-1]].range_chars),
+            domain_chars=sorted(error.tools[error.next_tool].domain_chars))
\ No newline at end of file
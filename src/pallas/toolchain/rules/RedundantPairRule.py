@@ -10,6 +10,11 @@ class RedundantPairRule(ChainRule):
     - This prevents chains that would effectively cancel out their own operations
     """
 
+    pairwise = True
+    messages = {
+        'cancelling_pair': "Redundant pair: {last} -> {next}. Operation {last} followed by {next} would cancel out",
+    }
+
     @staticmethod
     def validate(chain_context: ChainContext) -> ChainRuleException | None:
         """Validate that the chain does not contain redundant encode-decode pairs anywhere.
@@ -43,7 +48,6 @@ class RedundantPairRule(ChainRule):
             return None
 
         if invalid_pairs[last_chain_tool] == next_chain_tool:
-            return ChainRuleException(chain_context=chain_context, message=f"Redundant pair: {last_chain_tool} -> {next_chain_tool}. \
-Operation {last_chain_tool} followed by {next_chain_tool} would cancel out")
+            return RedundantPairRule.violation(chain_context, 'cancelling_pair')
 
         return None
\ No newline at end of file
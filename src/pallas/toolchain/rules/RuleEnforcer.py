@@ -1,14 +1,20 @@
-from typing import List, Dict, Optional, Type
+import itertools
+from typing import Any, Hashable, List, Dict, Optional, Tuple, Type
 from pallas.toolchain.rules.ChainRule import ChainRule
 from pallas.toolchain.ChainContext import ChainContext
 from pallas.toolchain.rules.ChainRuleException import ChainRuleException
+from pallas.toolchain.rules.ViolationTelemetry import ViolationTelemetry
+from pallas.utils.tree_utils import calculate_subtree_sizes
 
 class RuleEnforcer:
     """Class responsible for enforcing chain rules and collecting statistics.
 
     This class:
     - Validates chains against a set of rules
-    - Tracks statistics about rule violations
+    - Compiles pairwise rules into a transition table of allowed next tools
+    - Drives the incremental state of stateful rules during a search
+    - Tracks statistics about rule violations, optionally aggregated per tool pair and depth
+    - Counts the nodes each rule cut from the search tree, per depth
     - Provides methods to analyze pruning effectiveness
     """
 
@@ -23,6 +29,233 @@ class RuleEnforcer:
         self.rule_stats: Dict[str, int] = {rule_class.__name__: 0 for rule_class in rules}
         self.total_validations = 0
         self.total_violations = 0
+        # Per-depth counters, indexed by the length of the chain candidates are checked against:
+        # candidates tested, candidates each rule rejected and nodes of the complete tree each
+        # rule cut with them
+        self.depth_candidates: List[int] = []
+        self.depth_rejections: Dict[str, List[int]] = {rule_class.__name__: [] for rule_class in rules}
+        self.pruned_nodes: Dict[str, List[int]] = {rule_class.__name__: [] for rule_class in rules}
+        self.subtree_sizes: List[int] = []
+        self.compiled_rules: List[Tuple[Type[ChainRule], List[int]]] = []
+        self.dynamic_rules: List[Tuple[Type[ChainRule], Optional[ChainRule]]] = [(rule_class, None) for rule_class in rules]
+        # Every rule in the order given, with its transition table if it was compiled and its
+        # state if it is stateful, used to attribute rejections to the first rule that makes them
+        self.ordered_rules: List[Tuple[Type[ChainRule], Optional[List[int]], Optional[ChainRule]]] = []
+        self.tools: List = []
+        self.target_length = 0
+        self.telemetry: Optional[ViolationTelemetry] = None
+
+    def enable_telemetry(self, telemetry: Optional[ViolationTelemetry] = None) -> ViolationTelemetry:
+        """Aggregate violations per rule, last tool, next tool and depth.
+
+        Recording every rejected candidate costs time, so telemetry is off unless enabled.
+
+        Args:
+            telemetry: The telemetry to record into. If None, one that only counts is created.
+
+        Returns:
+            ViolationTelemetry: The telemetry violations are recorded into.
+        """
+        self.telemetry = telemetry or ViolationTelemetry()
+        if self.tools:
+            self.telemetry.reset(self.tools)
+        return self.telemetry
+
+    def compile(self, tools: List, target_length: int) -> None:
+        """Prepare the rules for a search over the given tools.
+
+        Pairwise rules are compiled into transition tables. Stateful rules are instantiated
+        so the search can drive their push/pop hooks. All other rules keep being validated
+        per candidate by check_next.
+
+        Args:
+            tools: The tools chains are built from.
+            target_length: Length of the chains being generated.
+        """
+        self.tools = tools
+        self.target_length = target_length
+        if self.telemetry is not None:
+            self.telemetry.reset(tools)
+        # A tool appears at most once per chain, so every node at a depth has the same number
+        # of tools left and a rejected candidate cuts a subtree of known size
+        self.subtree_sizes = calculate_subtree_sizes(len(tools), target_length)
+        for depths in (self.depth_candidates, *self.depth_rejections.values(), *self.pruned_nodes.values()):
+            depths.extend([0] * (target_length - len(depths)))
+        self.compiled_rules = []
+        self.dynamic_rules = []
+        self.ordered_rules = []
+        for rule_class in self.rules:
+            table = rule_class.compile(tools, target_length)
+            state = None
+            if table is not None:
+                self.compiled_rules.append((rule_class, table))
+            else:
+                if rule_class.stateful:
+                    state = rule_class()
+                self.dynamic_rules.append((rule_class, state))
+            self.ordered_rules.append((rule_class, table, state))
+        self.start([])
+
+    def start(self, prefix: List[int]) -> None:
+        """Reset the stateful rules and replay a chain prefix into them.
+
+        Args:
+            prefix: Tool indices the search starts from.
+        """
+        for _, state in self.dynamic_rules:
+            if state is not None:
+                state.reset(self.tools, self.target_length)
+                for tool in prefix:
+                    state.push(tool)
+
+    def push(self, tool: int) -> None:
+        """Notify the stateful rules that the search descended into a tool.
+
+        Args:
+            tool: Index of the tool appended to the chain.
+        """
+        for _, state in self.dynamic_rules:
+            if state is not None:
+                state.push(tool)
+
+    def pop(self) -> None:
+        """Notify the stateful rules that the search backtracked out of the last tool."""
+        for _, state in self.dynamic_rules:
+            if state is not None:
+                state.pop()
+
+    def state_key(self, current_chain: List[int]) -> Hashable:
+        """Summarize everything the rules still depend on for a chain prefix.
+
+        Compiled rules only depend on the last tool, which callers key on themselves.
+
+        Args:
+            current_chain: Current chain, already pushed into the stateful rules.
+
+        Returns:
+            Hashable: The combined state keys of the stateful rules, or the whole chain when
+            a stateless rule could not be compiled.
+        """
+        if any(state is None for _, state in self.dynamic_rules):
+            return tuple(current_chain)
+        return tuple(state.state_key() for _, state in self.dynamic_rules)
+
+    def allowed_mask(self, last_tool: Optional[int], available: int) -> int:
+        """Filter candidate next tools through the compiled rules without recording statistics.
+
+        Args:
+            last_tool: Index of the last tool in the chain, or None for an empty chain.
+            available: Bitmask of candidate tool indices.
+
+        Returns:
+            int: Bitmask of the candidates allowed by every compiled rule.
+        """
+        if last_tool is None:
+            return available
+        for _, table in self.compiled_rules:
+            available &= table[last_tool]
+        return available
+
+    def allowed_next(self, last_tool: Optional[int], available: int, depth: int = 0,
+                     current_chain: Optional[List[int]] = None) -> int:
+        """Filter candidate next tools through the compiled rules.
+
+        Every candidate counts as one validation. A rejected candidate, and the subtree below
+        it, is attributed to the first rule in the order the rules were given that rejects it,
+        as validate_chain_against_rules would. A rule that could not be compiled but is listed
+        before a compiled one is therefore checked against the candidates the compiled rules
+        reject; the candidates they allow are left to check_next.
+
+        Args:
+            last_tool: Index of the last tool in the chain, or None for an empty chain.
+            available: Bitmask of candidate tool indices.
+            depth: Length of the chain, used to size the pruned subtrees.
+            current_chain: Current chain, already pushed into the stateful rules. Without it,
+                stateless rules that could not be compiled are skipped when attributing.
+
+        Returns:
+            int: Bitmask of the candidates allowed by every compiled rule.
+        """
+        candidates = available.bit_count()
+        self.total_validations += candidates
+        if depth < len(self.depth_candidates):
+            self.depth_candidates[depth] += candidates
+        if last_tool is None:
+            return available
+
+        allowed = self.allowed_mask(last_tool, available)
+        rejected = available & ~allowed
+        for rule_class, table, state in self.ordered_rules:
+            if not rejected:
+                break
+            if table is not None:
+                caught = rejected & ~table[last_tool]
+                if caught and self.telemetry is not None:
+                    self._record_rejected(rule_class, last_tool, caught, depth)
+            else:
+                caught = self._check_rejected(rule_class, state, current_chain, last_tool, rejected, depth)
+            if caught:
+                rejected &= ~caught
+                violations = caught.bit_count()
+                self.rule_stats[rule_class.__name__] += violations
+                self.total_violations += violations
+                self.depth_rejections[rule_class.__name__][depth] += violations
+                self.pruned_nodes[rule_class.__name__][depth] += violations * self.subtree_sizes[depth]
+        return allowed
+
+    def _check_rejected(self, rule_class: Type[ChainRule], state: Optional[ChainRule],
+                        current_chain: Optional[List[int]], last_tool: int, rejected: int, depth: int) -> int:
+        """Check candidates a compiled rule rejected against a rule that could not be compiled.
+
+        Args:
+            rule_class: The rule that could not be compiled.
+            state: The rule's incremental state if it is stateful, None otherwise.
+            current_chain: Current chain, or None if the caller did not pass it.
+            last_tool: Index of the last tool in the chain.
+            rejected: Bitmask of the candidates rejected by a compiled rule.
+            depth: Length of the chain.
+
+        Returns:
+            int: Bitmask of the candidates this rule rejects too.
+        """
+        if state is None and current_chain is None:
+            return 0
+        caught = 0
+        while rejected:
+            lowest = rejected & -rejected
+            next_tool = lowest.bit_length() - 1
+            rejected ^= lowest
+            if state is not None:
+                error = state.check(next_tool)
+            else:
+                error = rule_class.validate(ChainContext(current_chain=current_chain, next_tool=next_tool,
+                                                         target_length=self.target_length, tools=self.tools))
+            if error:
+                caught |= lowest
+                if self.telemetry is not None and self.telemetry.record(rule_class.__name__, last_tool, next_tool, depth):
+                    self.telemetry.log_sample(error)
+        return caught
+
+    def _record_rejected(self, rule_class: Type[ChainRule], last_tool: int, rejected: int, depth: int) -> None:
+        """Record the candidates a compiled rule rejected in the telemetry.
+
+        Compiled rules make no violations, so a sampled one is made again by validating it.
+
+        Args:
+            rule_class: The compiled rule.
+            last_tool: Index of the last tool in the chain.
+            rejected: Bitmask of the rejected candidates.
+            depth: Length of the chain.
+        """
+        while rejected:
+            lowest = rejected & -rejected
+            next_tool = lowest.bit_length() - 1
+            rejected ^= lowest
+            if self.telemetry.record(rule_class.__name__, last_tool, next_tool, depth):
+                # Pairwise rules only look at the last tool, which stands in for the chain
+                context = ChainContext(current_chain=[last_tool], next_tool=next_tool,
+                                       target_length=self.target_length, tools=self.tools)
+                self.telemetry.log_sample(rule_class.validate(context))
 
     def validate_chain_against_rules(self, chain_context: ChainContext) -> Optional[ChainRuleException]:
         """Validate a chain against all rules.
@@ -39,10 +272,73 @@ class RuleEnforcer:
             if error := rule_class.validate(chain_context):
                 self.rule_stats[rule_class.__name__] += 1
                 self.total_violations += 1
+                self._record_rejection(rule_class.__name__, len(chain_context.current_chain or ()))
+                if self.telemetry is not None:
+                    self._record_error(rule_class, chain_context.current_chain, chain_context.next_tool, error)
+                return error
+
+        return None
+
+    def check_next(self, current_chain: List[int], next_tool: int, record: bool = True) -> Optional[ChainRuleException]:
+        """Check a candidate that already passed allowed_next against the remaining rules.
+
+        Stateful rules answer from their incremental state; a ChainContext is only built
+        for stateless rules that could not be compiled.
+
+        Args:
+            current_chain: Current chain being built.
+            next_tool: Index of the candidate tool.
+            record: Whether to count a violation in the statistics.
+
+        Returns:
+            ChainRuleException if any rule is violated, None otherwise.
+        """
+        context = None
+        for rule_class, state in self.dynamic_rules:
+            if state is not None:
+                error = state.check(next_tool)
+            else:
+                if context is None:
+                    context = ChainContext(current_chain=current_chain, next_tool=next_tool,
+                                           target_length=self.target_length, tools=self.tools)
+                error = rule_class.validate(context)
+            if error and not record:
+                return error
+            if error:
+                self.rule_stats[rule_class.__name__] += 1
+                self.total_violations += 1
+                self._record_rejection(rule_class.__name__, len(current_chain))
+                if self.telemetry is not None:
+                    self._record_error(rule_class, current_chain, next_tool, error)
                 return error
 
         return None
 
+    def _record_rejection(self, rule_name: str, depth: int) -> None:
+        """Attribute a rejected candidate and the subtree below it to a rule.
+
+        Args:
+            rule_name: Name of the rule that rejected the candidate.
+            depth: Length of the chain the candidate was checked against.
+        """
+        if depth < len(self.subtree_sizes):
+            self.depth_rejections[rule_name][depth] += 1
+            self.pruned_nodes[rule_name][depth] += self.subtree_sizes[depth]
+
+    def _record_error(self, rule_class: Type[ChainRule], current_chain: List[int], next_tool: int,
+                      error: ChainRuleException) -> None:
+        """Record a violation in the telemetry, logging it if it is sampled.
+
+        Args:
+            rule_class: The rule that made the violation.
+            current_chain: Chain the candidate was checked against.
+            next_tool: Index of the rejected candidate.
+            error: The violation.
+        """
+        last_tool = current_chain[-1] if current_chain else None
+        if self.telemetry.record(rule_class.__name__, last_tool, next_tool, len(current_chain)):
+            self.telemetry.log_sample(error)
+
     def get_rule_stats(self) -> Dict[str, int]:
         """Get statistics about rule violations.
 
@@ -51,6 +347,64 @@ class RuleEnforcer:
         """
         return self.rule_stats.copy()
 
+    def get_pruned_nodes(self) -> Dict[str, List[int]]:
+        """Get the nodes each rule cut from the complete tree.
+
+        Returns:
+            Dict mapping rule names to their pruned nodes, indexed by the length of the chain
+            the rejected candidates were checked against.
+        """
+        return {rule_name: list(depths) for rule_name, depths in self.pruned_nodes.items()}
+
+    def get_depth_stats(self) -> Dict[str, Any]:
+        """Get the per-depth counters, indexed by the length of the chain candidates were checked against.
+
+        Returns:
+            Dict holding the candidates tested at each depth, and the candidates each rule
+            rejected and the nodes it cut at each depth.
+        """
+        return {
+            'candidates': list(self.depth_candidates),
+            'rejections': {rule_name: list(depths) for rule_name, depths in self.depth_rejections.items()},
+            'pruned_nodes': self.get_pruned_nodes(),
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get all counters of this enforcer, e.g. to send them back from a worker process.
+
+        Returns:
+            Dict holding the rule violations, total validations, total violations and per-depth
+            counters, and the telemetry's counts if it is enabled.
+        """
+        stats = {
+            'rule_stats': self.get_rule_stats(),
+            'total_validations': self.total_validations,
+            'total_violations': self.total_violations,
+            'depths': self.get_depth_stats(),
+        }
+        if self.telemetry is not None:
+            stats['violations'] = self.telemetry.get_stats()
+        return stats
+
+    def merge_stats(self, stats: Dict[str, Any]) -> None:
+        """Add counters produced by another enforcer with the same rules.
+
+        Args:
+            stats: Counters as returned by get_stats.
+        """
+        for rule_name, violations in stats['rule_stats'].items():
+            self.rule_stats[rule_name] += violations
+        self.total_validations += stats['total_validations']
+        self.total_violations += stats['total_violations']
+        depth_stats = stats['depths']
+        _add_depths(self.depth_candidates, depth_stats['candidates'])
+        for rule_name, rejections in depth_stats['rejections'].items():
+            _add_depths(self.depth_rejections[rule_name], rejections)
+        for rule_name, pruned in depth_stats['pruned_nodes'].items():
+            _add_depths(self.pruned_nodes[rule_name], pruned)
+        if self.telemetry is not None and 'violations' in stats:
+            self.telemetry.merge_stats(stats['violations'])
+
     def get_violation_rate(self) -> float:
         """Get the rate of rule violations.
 
@@ -61,70 +415,90 @@ class RuleEnforcer:
             return 0.0
         return self.total_violations / self.total_validations
 
-    def get_pruning_effectiveness(self, max_possible_nodes: int, actual_nodes: int) -> Dict[str, float]:
-        """Calculate pruning effectiveness metrics.
+    def get_pruning_effectiveness(self, max_possible_nodes: int) -> Dict[str, Any]:
+        """Calculate pruning effectiveness metrics from the subtrees the rules cut.
+
+        Every rejected candidate cuts itself and its whole subtree from the complete tree, and
+        nothing below it is checked again, so the pruned nodes are counted exactly.
 
         Args:
-            max_possible_nodes: Maximum number of nodes that could have been visited.
-            actual_nodes: Actual number of nodes visited.
+            max_possible_nodes: Number of nodes of the complete tree, see calculate_max_tree_size.
 
         Returns:
             Dict containing:
-            - pruning_rate: Proportion of nodes that were pruned
-            - rule_contribution: Dict mapping rule names to their contribution to pruning
+            - pruned_nodes: Number of nodes the rules cut
+            - pruning_rate: Proportion of the complete tree's nodes that were cut
+            - rule_pruned_nodes: Dict mapping rule names to the nodes they cut
+            - rule_contribution: Dict mapping rule names to the proportion of nodes they cut
+            - depth_pruned_nodes: Nodes cut below chains of each length
         """
+        rule_pruned_nodes = {rule_name: sum(depths) for rule_name, depths in self.pruned_nodes.items()}
+        depth_pruned_nodes = [sum(depths) for depths in itertools.zip_longest(*self.pruned_nodes.values(), fillvalue=0)]
+        pruned_nodes = sum(rule_pruned_nodes.values())
         if max_possible_nodes == 0:
             return {
+                'pruned_nodes': pruned_nodes,
                 'pruning_rate': 0.0,
-                'rule_contribution': {rule_class.__name__: 0.0 for rule_class in self.rules}
-            }
-
-        # Calculate how many nodes we would have visited without pruning
-        # This is based on the violation rate - if 60% of nodes violate rules,
-        # then we would have visited 60% more nodes without pruning
-        expected_nodes_without_pruning = int(actual_nodes * (1 + self.get_violation_rate()))
-
-        # Calculate pruning rate based on how many nodes we avoided visiting
-        pruning_rate = 1 - (actual_nodes / expected_nodes_without_pruning)
-
-        # Calculate each rule's contribution to pruning
-        total_violations = sum(self.rule_stats.values())
-        if total_violations == 0:
-            rule_contribution = {rule_class.__name__: 0.0 for rule_class in self.rules}
-        else:
-            rule_contribution = {
-                rule_name: (violations / total_violations) * pruning_rate
-                for rule_name, violations in self.rule_stats.items()
+                'rule_pruned_nodes': rule_pruned_nodes,
+                'rule_contribution': {rule_name: 0.0 for rule_name in rule_pruned_nodes},
+                'depth_pruned_nodes': depth_pruned_nodes,
             }
 
         return {
-            'pruning_rate': pruning_rate,
-            'rule_contribution': rule_contribution
+            'pruned_nodes': pruned_nodes,
+            'pruning_rate': pruned_nodes / max_possible_nodes,
+            'rule_pruned_nodes': rule_pruned_nodes,
+            'rule_contribution': {rule_name: nodes / max_possible_nodes for rule_name, nodes in rule_pruned_nodes.items()},
+            'depth_pruned_nodes': depth_pruned_nodes,
         }
 
     def format_stats(self, max_possible_nodes: int, actual_nodes: int) -> str:
         """Format statistics into a human-readable string.
 
         Args:
-            max_possible_nodes: Maximum number of nodes that could have been visited.
+            max_possible_nodes: Number of nodes of the complete tree.
             actual_nodes: Actual number of nodes visited.
 
         Returns:
             Formatted string containing all statistics.
         """
-        effectiveness = self.get_pruning_effectiveness(max_possible_nodes, actual_nodes)
+        effectiveness = self.get_pruning_effectiveness(max_possible_nodes)
 
         stats = [
             "Rule Enforcement Statistics:",
             f"Total validations: {self.total_validations}",
             f"Total violations: {self.total_violations}",
             f"Violation rate: {self.get_violation_rate():.2%}",
+            f"Visited nodes: {actual_nodes}",
+            f"Pruned nodes: {effectiveness['pruned_nodes']} of {max_possible_nodes}",
             f"Pruning rate: {effectiveness['pruning_rate']:.2%}",
             "\nRule violations:"
         ]
 
         for rule_name, violations in self.rule_stats.items():
             contribution = effectiveness['rule_contribution'][rule_name]
-            stats.append(f"  {rule_name}: {violations} violations ({contribution:.2%} of pruning)")
+            stats.append(f"  {rule_name}: {violations} violations, "
+                         f"{effectiveness['rule_pruned_nodes'][rule_name]} nodes pruned ({contribution:.2%} of the tree)")
+
+        if effectiveness['pruned_nodes']:
+            stats.append("\nPruned nodes by chain length:")
+            for depth, nodes in enumerate(effectiveness['depth_pruned_nodes']):
+                if nodes:
+                    stats.append(f"  {depth}: {nodes} nodes")
+
+        if self.telemetry is not None:
+            stats.append("")
+            stats.append(self.telemetry.format_summary())
 
-        return "\n".join(stats)
\ No newline at end of file
+        return "\n".join(stats)
+
+def _add_depths(depths: List[int], other: List[int]) -> None:
+    """Add per-depth counters into another list of them, growing it as needed.
+
+    Args:
+        depths: Counters to add to, updated in place.
+        other: Counters to add.
+    """
+    depths.extend([0] * (len(other) - len(depths)))
+    for depth, count in enumerate(other):
+        depths[depth] += count
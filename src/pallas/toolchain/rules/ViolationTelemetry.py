@@ -0,0 +1,130 @@
+import logging
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+from pallas.toolchain.rules.ChainRuleException import ChainRuleException
+
+# Seconds between the summaries logged while a search runs
+SUMMARY_INTERVAL = 10.0
+# Rows of the summary table
+SUMMARY_TOP = 20
+# Violations recorded between two looks at the clock
+_CLOCK_EVERY = 4096
+
+# (rule name, last tool index or None, next tool index, depth of the next tool)
+ViolationKey = Tuple[str, Optional[int], int, int]
+
+class ViolationTelemetry:
+    """Aggregates rule violations in memory instead of logging each of them.
+
+    Violations are counted per rule, last tool, next tool and depth, where the depth is the
+    position the next tool would take in the chain. With a logger, a summary table of the most
+    frequent keys is logged every `summary_interval` seconds, and every `sample_every`-th
+    violation is logged in full at DEBUG level.
+    """
+
+    def __init__(self, logger: Optional[logging.Logger] = None, sample_every: Optional[int] = None,
+                 summary_interval: Optional[float] = SUMMARY_INTERVAL, top: int = SUMMARY_TOP):
+        """Initialize the telemetry.
+
+        Args:
+            logger: Logger for the periodic summaries and sampled violations, or None to only count.
+            sample_every: Log one violation in this many in full, or None to log none.
+            summary_interval: Seconds between periodic summaries, or None for no periodic summaries.
+            top: Number of keys listed in a summary.
+        """
+        self.logger = logger
+        self.sample_every = sample_every
+        self.summary_interval = summary_interval
+        self.top = top
+        self.counts: Counter = Counter()
+        self.recorded = 0
+        self.tool_names: List[str] = []
+        self._until_sample = sample_every or 0
+        self._until_clock = _CLOCK_EVERY
+        self._last_summary = time.monotonic()
+
+    def reset(self, tools: List) -> None:
+        """Name the tools whose indices the keys hold, restarting the summary clock.
+
+        Args:
+            tools: The tools chains are built from.
+        """
+        self.tool_names = [tool.name for tool in tools]
+        self._last_summary = time.monotonic()
+
+    def record(self, rule_name: str, last_tool: Optional[int], next_tool: int, depth: int) -> bool:
+        """Count a violation, logging a summary if one is due.
+
+        Args:
+            rule_name: Name of the rule that rejected the candidate.
+            last_tool: Index of the last tool of the chain, or None for an empty chain.
+            next_tool: Index of the rejected candidate.
+            depth: Position the candidate would take in the chain.
+
+        Returns:
+            bool: Whether this violation is sampled and should be passed to log_sample.
+        """
+        self.counts[(rule_name, last_tool, next_tool, depth)] += 1
+        self.recorded += 1
+
+        self._until_clock -= 1
+        if self._until_clock == 0:
+            self._until_clock = _CLOCK_EVERY
+            if (self.logger is not None and self.summary_interval is not None and
+                    time.monotonic() - self._last_summary >= self.summary_interval):
+                self.logger.info("%s", self.format_summary())
+                self._last_summary = time.monotonic()
+
+        if self._until_sample:
+            self._until_sample -= 1
+            if self._until_sample == 0:
+                self._until_sample = self.sample_every
+                return self.logger is not None
+        return False
+
+    def log_sample(self, error: ChainRuleException) -> None:
+        """Log a sampled violation in full; its message is only rendered if the record is written.
+
+        Args:
+            error: The sampled violation.
+        """
+        self.logger.debug("Rule violation %d: %s", self.recorded, error)
+
+    def format_summary(self) -> str:
+        """Format the most frequent violation keys as a table.
+
+        Returns:
+            str: The summary table.
+        """
+        names = self.tool_names
+
+        def name(tool: Optional[int]) -> str:
+            if tool is None:
+                return '-'
+            return names[tool] if tool < len(names) else str(tool)
+
+        lines = [f"Rule violations: {self.recorded} over {len(self.counts)} (rule, last, next, depth) keys",
+                 f"  {'count':>10}  {'rule':<28} {'last tool':>16} -> {'next tool':<16} depth"]
+        for (rule_name, last_tool, next_tool, depth), count in self.counts.most_common(self.top):
+            lines.append(f"  {count:>10}  {rule_name:<28} {name(last_tool):>16} -> {name(next_tool):<16} {depth:>5}")
+        if len(self.counts) > self.top:
+            lines.append(f"  ... {len(self.counts) - self.top} more keys")
+        return "\n".join(lines)
+
+    def get_stats(self) -> Dict[ViolationKey, int]:
+        """Get the violation counts, e.g. to send them back from a worker process.
+
+        Returns:
+            Dict mapping each violation key to its count.
+        """
+        return dict(self.counts)
+
+    def merge_stats(self, counts: Dict[ViolationKey, Any]) -> None:
+        """Add violation counts produced by another telemetry over the same tools.
+
+        Args:
+            counts: Counts as returned by get_stats.
+        """
+        self.counts.update(counts)
+        self.recorded += sum(counts.values())
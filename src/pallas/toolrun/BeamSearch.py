@@ -0,0 +1,161 @@
+import hashlib
+import heapq
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Tuple
+from pallas.tools.Tool import Tool
+from pallas.scorers.Scorer import Scorer
+from pallas.utils.logging_helpers import LoggingHelper
+from pallas.utils.chain_utils import format_chain
+
+@dataclass
+class SearchResult:
+    """A chain found by the search, with its output and score."""
+    chain: List[str]
+    output: str
+    score: float
+
+class BeamSearch:
+    """Class responsible for searching tool chains that turn an input into plaintext.
+
+    Unlike chain generation, the search does not enumerate chains of a fixed length. Each
+    level applies every tool to every output in the beam, scores the new outputs and keeps
+    only the `beam_width` best of them for the next level, so a depth of 10 or more costs
+    `max_depth * beam_width * len(tools)` tool runs at most. Tools may repeat within a chain,
+    and outputs already seen at any depth are dropped, which stops cycles such as
+    reverse -> reverse from filling the beam.
+    """
+
+    def __init__(self, tools: List[Tool], scorer: Scorer, beam_width: int = 100, max_depth: int = 10,
+                 top_k: int = 10, max_output_length: int = 1 << 20, verbose: bool = False,
+                 run_id: Optional[str] = None):
+        """Initialize the search.
+
+        Args:
+            tools: The tools to build chains from.
+            scorer: The scorer rating how much an output looks like plaintext.
+            beam_width: Number of outputs kept at each depth.
+            max_depth: Maximum number of tools in a chain.
+            top_k: Number of best results to keep.
+            max_output_length: Outputs longer than this are dropped, bounding the memory of encoders
+                that grow their input at every step.
+            verbose: Whether to enable verbose logging.
+            run_id: Optional UUID to use in the output filename.
+        """
+        if beam_width < 1 or max_depth < 1 or top_k < 1:
+            raise ValueError("beam_width, max_depth and top_k must be at least 1")
+
+        self.tools = tools
+        self.scorer = scorer
+        self.beam_width = beam_width
+        self.max_depth = max_depth
+        self.top_k = top_k
+        self.max_output_length = max_output_length
+        self.verbose = verbose
+        self.run_id = run_id or str(uuid.uuid4())
+        self.output_dir = Path('out')
+        self.stats = {
+            'tools_run': 0,
+            'tool_errors': 0,
+            'duplicates': 0,
+            'depth_reached': 0,
+        }
+        self.logger = LoggingHelper(__name__, verbose, self.run_id)
+
+    def search(self, input_text: str) -> List[SearchResult]:
+        """Search for the chains whose outputs score best.
+
+        Args:
+            input_text: The text to decode.
+
+        Returns:
+            List[SearchResult]: Up to `top_k` results, best first. Ties keep discovery order.
+        """
+        seen = {self._digest(input_text)}
+        beam: List[Tuple[float, List[int], str]] = [(self.scorer.score(input_text), [], input_text)]
+        # Min-heap of (score, -discovery order, chain, output) holding the best results so far
+        results: List[Tuple[float, int, List[int], str]] = []
+        discovered = 0
+
+        for depth in range(1, self.max_depth + 1):
+            candidates: List[Tuple[float, List[int], str]] = []
+            for _, chain, text in beam:
+                for index, tool in enumerate(self.tools):
+                    output = self._run_tool(tool, text)
+                    if output is None:
+                        continue
+
+                    digest = self._digest(output)
+                    if digest in seen:
+                        self.stats['duplicates'] += 1
+                        continue
+                    seen.add(digest)
+
+                    score = self.scorer.score(output)
+                    candidate = chain + [index]
+                    candidates.append((score, candidate, output))
+
+                    discovered += 1
+                    entry = (score, -discovered, candidate, output)
+                    if len(results) < self.top_k:
+                        heapq.heappush(results, entry)
+                    elif entry > results[0]:
+                        heapq.heapreplace(results, entry)
+
+            if not candidates:
+                break
+            self.stats['depth_reached'] = depth
+            # Expand the most promising outputs first at the next depth
+            beam = heapq.nlargest(self.beam_width, candidates, key=lambda candidate: candidate[0])
+            self.logger.log("Depth %d: %d new outputs, best score %.4f", depth, len(candidates), beam[0][0])
+
+        return [
+            SearchResult([self.tools[i].name for i in chain], output, score)
+            for score, _, chain, output in sorted(results, reverse=True)
+        ]
+
+    def run(self, input_text: str) -> Path:
+        """Search and write the results to a file.
+
+        Args:
+            input_text: The text to decode.
+
+        Returns:
+            Path: The file the results were written to.
+        """
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        output_file = self.output_dir / f'search_{self.run_id}.txt'
+        self.logger.log("Search results will be written to %s", output_file)
+
+        results = self.search(input_text)
+        with open(output_file, 'w') as f:
+            for result in results:
+                f.write(f"{result.score:.4f} {format_chain(result.chain)} = {result.output}\n")
+
+        if self.verbose:
+            self.logger.log("\nBeamSearch Statistics:")
+            self.logger.log("Tools run: %d", self.stats['tools_run'])
+            self.logger.log("Tool errors: %d", self.stats['tool_errors'])
+            self.logger.log("Duplicate outputs dropped: %d", self.stats['duplicates'])
+            self.logger.log("Depth reached: %d", self.stats['depth_reached'])
+        return output_file
+
+    def _run_tool(self, tool: Tool, text: str) -> Optional[str]:
+        """Run a tool, returning None if it fails or its output is too long to keep."""
+        self.stats['tools_run'] += 1
+        try:
+            result, sep, error = tool.run(text)
+        except Exception:
+            error = True
+        if error:
+            self.stats['tool_errors'] += 1
+            return None
+        if len(result) > self.max_output_length:
+            return None
+        return result
+
+    @staticmethod
+    def _digest(text: str) -> bytes:
+        """Hash an output so the set of seen outputs does not hold the outputs themselves."""
+        return hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
@@ -0,0 +1,360 @@
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from pallas.tools.Tool import Tool, ToolError
+from pallas.tools.transformers.reverse import Reverse
+from pallas.common.charsets import charset_mask
+
+# Bitmap of every latin-1 code
+ALL_CODES = (1 << 256) - 1
+
+# Runs one named tool of a chain: (tool name, input, input mask) -> (output, error, output mask)
+StepRunner = Callable[[str, Any, Optional[int]], Tuple[Any, Optional[ToolError], Optional[int]]]
+
+def _deletion_table(mask: int) -> bytes:
+    """Turn a bitmap of valid codes into a bytes.translate deletion table."""
+    return bytes(code for code in range(256) if mask >> code & 1)
+
+class _Step:
+    """One step of a compiled chain, standing for one or more tools of the source chain."""
+
+    def __init__(self, names: Tuple[str, ...]):
+        self.names = names
+
+    def run(self, value: Any, mask: Optional[int], run_step: StepRunner) -> Tuple[Any, Optional[ToolError], Optional[int]]:
+        """Run the step.
+
+        Args:
+            value: The input, as str or as latin-1 encoded bytes.
+            mask: Bitmap of the characters the input can contain, or None if unknown.
+            run_step: Runs a single tool of the source chain.
+
+        Returns:
+            The output, any error and the bitmap of the characters the output can contain.
+        """
+        return self.run_tools(value, mask, run_step)
+
+    def run_tools(self, value: Any, mask: Optional[int], run_step: StepRunner) -> Tuple[Any, Optional[ToolError], Optional[int]]:
+        """Run the tools the step stands for one by one, which gives their exact results and errors."""
+        for name in self.names:
+            value, error, mask = run_step(name, value, mask)
+            if error:
+                return value, error, None
+        return value, None, mask
+
+    def __str__(self) -> str:
+        return self.names[0]
+
+class _CheckedStep(_Step, ABC):
+    """A step with a fast path for inputs whose codes all pass a deletion table.
+
+    Other inputs, including str input outside latin-1, run the source tools one by one, so
+    the fast path never has to reproduce an error.
+    """
+
+    def __init__(self, names: Tuple[str, ...], valid_mask: int):
+        super().__init__(names)
+        self.valid_mask = valid_mask
+        self.valid_table = _deletion_table(valid_mask)
+
+    def run(self, value: Any, mask: Optional[int], run_step: StepRunner) -> Tuple[Any, Optional[ToolError], Optional[int]]:
+        if isinstance(value, str):
+            try:
+                codes = value.encode('latin1')
+            except UnicodeEncodeError:
+                return self.run_tools(value, mask, run_step)
+        elif isinstance(value, bytes):
+            codes = value
+        else:
+            # Buffers such as a mapped input file are streamed by the runner
+            return self.run_tools(value, mask, run_step)
+        if (mask is None or mask & ~self.valid_mask) and codes.translate(None, self.valid_table):
+            return self.run_tools(value, mask, run_step)
+        return self.fast(value, codes, mask)
+
+    @abstractmethod
+    def fast(self, value: Any, codes: bytes, mask: Optional[int]) -> Tuple[Any, Optional[ToolError], Optional[int]]:
+        """Compute the output of a valid input.
+
+        Args:
+            value: The input, as str or bytes.
+            codes: The latin-1 codes of the input.
+            mask: Bitmap of the characters the input can contain, or None if unknown.
+        """
+        pass
+
+class _IdentityStep(_CheckedStep):
+    """Tools that restore their input, such as reverse -> reverse, reduced to a check of the input."""
+
+    def fast(self, value: Any, codes: bytes, mask: Optional[int]) -> Tuple[Any, Optional[ToolError], Optional[int]]:
+        return value, None, self.valid_mask if mask is None else mask & self.valid_mask
+
+    def __str__(self) -> str:
+        return f"identity({' -> '.join(self.names)})"
+
+class _TokenMapStep(_CheckedStep):
+    """A run of token encoders and reversals fused into a single table-driven pass.
+
+    The run maps an input x to sep.join(tokens[c] for c in x), with x reversed first if `flip`.
+    """
+
+    def __init__(self, names: Tuple[str, ...], valid_mask: int, tokens: List[str], separator: str, flip: bool,
+                 use_bytes: bool):
+        super().__init__(names, valid_mask)
+        self.flip = flip
+        if use_bytes:
+            self.tokens: List[Union[str, bytes]] = [token.encode('latin1') for token in tokens]
+            self.separator: Union[str, bytes] = separator.encode('latin1')
+        else:
+            self.tokens = tokens
+            self.separator = separator
+        self.output_mask = charset_mask("".join(tokens) + separator)
+
+    def fast(self, value: Any, codes: bytes, mask: Optional[int]) -> Tuple[Any, Optional[ToolError], Optional[int]]:
+        if self.flip:
+            codes = codes[::-1]
+        return self.separator.join(map(self.tokens.__getitem__, codes)), None, self.output_mask
+
+    def __str__(self) -> str:
+        return f"fused({' -> '.join(self.names)})"
+
+class CompiledChain:
+    """A tool chain compiled into the steps that compute the same results."""
+
+    def __init__(self, chain: Tuple[str, ...], steps: List[_Step], run_step: StepRunner):
+        self.chain = chain
+        self.steps = steps
+        self.run_step = run_step
+
+    def __call__(self, value: Any, mask: Optional[int] = None) -> Tuple[Any, Optional[ToolError]]:
+        """Run the chain.
+
+        Args:
+            value: The chain input, as str or as latin-1 encoded bytes.
+            mask: Bitmap of the characters the input can contain, or None if unknown.
+
+        Returns:
+            Tuple of the final output, or "" if the chain failed, and the error of the first failing tool.
+        """
+        for step in self.steps:
+            value, error, mask = step.run(value, mask, self.run_step)
+            if error:
+                return "", error
+        return value, None
+
+    def __str__(self) -> str:
+        return " -> ".join(map(str, self.steps)) or "identity"
+
+class ChainCompiler:
+    """Compiles tool chains into fewer, cheaper steps before they run.
+
+    Two rewrites keep the results of the source chain, errors included:
+
+    - A tool followed by its `inverse`, such as reverse -> reverse or hex_encoder -> hex_decoder
+      with the same separator, becomes a check that the input is valid for the first tool.
+      Pairs are matched with a stack, so nested pairs cancel as well.
+    - A run of `token_map` tools and reversals, such as decimal_encoder -> reverse, becomes one
+      table lookup per input code with the tokens of all the tools composed.
+
+    Compiled steps check their input with a deletion table and run the source tools one by one
+    for inputs that fail, so only valid inputs take the fast path. Compiled chains are cached by
+    chain, and the composed token tables by run of tools.
+    """
+
+    def __init__(self, tools: Dict[str, Any], run_step: StepRunner, use_bytes: bool = False, max_chains: int = 4096):
+        """Initialize the compiler.
+
+        Args:
+            tools: The loaded tools by name.
+            run_step: Runs a single tool of a chain, used for the steps that are not rewritten.
+            use_bytes: Whether chains run on latin-1 encoded bytes instead of str.
+            max_chains: Number of compiled chains to keep.
+        """
+        self.tools = tools
+        self.run_step = run_step
+        self.use_bytes = use_bytes
+        self.max_chains = max_chains
+        self._chains: OrderedDict = OrderedDict()
+        self._token_maps: Dict[Tuple[str, ...], Optional[_TokenMapStep]] = {}
+        # Threaded runs compile chains concurrently
+        self._lock = threading.Lock()
+        self.stats = {
+            'chains_compiled': 0,
+            'cache_hits': 0,
+            'tools_eliminated': 0,
+            'tools_fused': 0,
+        }
+
+    def compile(self, chain: List[str]) -> CompiledChain:
+        """Compile a chain, reusing the cached form if it was compiled before.
+
+        Args:
+            chain: List of tool names in the chain.
+
+        Returns:
+            CompiledChain: Callable running the chain.
+        """
+        key = tuple(chain)
+        with self._lock:
+            compiled = self._chains.get(key)
+            if compiled is not None:
+                self._chains.move_to_end(key)
+                self.stats['cache_hits'] += 1
+                return compiled
+
+            compiled = CompiledChain(key, self._fuse(self._cancel_inverses(key)), self.run_step)
+            self.stats['chains_compiled'] += 1
+            self._chains[key] = compiled
+            if len(self._chains) > self.max_chains:
+                self._chains.popitem(last=False)
+            return compiled
+
+    def _tool(self, name: str) -> Optional[Tool]:
+        """Get a tool the compiler can reason about, or None for missing tools and tools not derived from Tool."""
+        tool = self.tools.get(name)
+        return tool if isinstance(tool, Tool) else None
+
+    @staticmethod
+    def _valid_mask(tool: Tool) -> int:
+        return tool._valid_codes()[1]
+
+    def _output_mask(self, tool: Optional[Tool], mask: Optional[int]) -> Optional[int]:
+        """Bitmap of the characters a tool can output for an input it accepted, or None if unknown."""
+        if tool is None:
+            return None
+        valid = self._valid_mask(tool)
+        return tool.output_mask(valid if mask is None else mask & valid)
+
+    def _is_inverse_pair(self, first: Optional[Tool], second: Optional[Tool]) -> bool:
+        """Check that `second` restores every input `first` accepts within its inverse_chars."""
+        if first is None or second is None or first.inverse != second.name:
+            return False
+        separator = first._separator()
+        if separator != second._separator():
+            return False
+        if separator is not None and (len(separator) != 1 or separator in first.range_chars):
+            return False
+        # Everything the first tool outputs must pass the second tool's validation
+        output = charset_mask("".join(first.range_chars) + (separator or ''))
+        return output is not None and not output & ~self._valid_mask(second)
+
+    def _cancel_inverses(self, chain: Tuple[str, ...]) -> List[Tuple[Union[str, _Step], Optional[int]]]:
+        """Replace each tool followed by its inverse with a check of its input.
+
+        Returns:
+            The remaining tool names and identity steps, each with the bitmap of the characters
+            its output can contain.
+        """
+        stack: List[Tuple[Union[str, _Step], Optional[int]]] = []
+        for name in chain:
+            tool = self._tool(name)
+            if stack and isinstance(stack[-1][0], str) and self._is_inverse_pair(self._tool(stack[-1][0]), tool):
+                first_name, _ = stack.pop()
+                first = self._tool(first_name)
+                mask = stack[-1][1] if stack else None
+                valid = self._valid_mask(first)
+                if first.inverse_chars is not None:
+                    valid &= charset_mask(first.inverse_chars) or 0
+                self.stats['tools_eliminated'] += 2
+                if mask is not None and not mask & ~valid:
+                    # The input is known to pass, so the pair vanishes
+                    continue
+                # Inputs outside inverse_chars may give other results, so nothing is known of the output
+                output = (valid if mask is None else mask & valid) if first.inverse_chars is None else None
+                stack.append((_IdentityStep((first_name, name), valid), output))
+                continue
+            mask = stack[-1][1] if stack else None
+            stack.append((name, self._output_mask(tool, mask)))
+        return stack
+
+    def _fuse(self, nodes: List[Tuple[Union[str, _Step], Optional[int]]]) -> List[_Step]:
+        """Fuse runs of token maps and reversals into single steps."""
+        steps: List[_Step] = []
+        i = 0
+        while i < len(nodes):
+            node = nodes[i][0]
+            if isinstance(node, str):
+                # Take the longest run starting here that fuses
+                run_end = i
+                while run_end < len(nodes) and self._fusable(nodes[run_end][0]):
+                    run_end += 1
+                for end in range(run_end, i + 1, -1):
+                    names = tuple(nodes[j][0] for j in range(i, end))
+                    fused = self._token_map(names)
+                    if fused is not None:
+                        steps.append(fused)
+                        self.stats['tools_fused'] += len(names)
+                        i = end
+                        break
+                else:
+                    steps.append(_Step((node,)))
+                    i += 1
+            else:
+                steps.append(node)
+                i += 1
+        return steps
+
+    def _fusable(self, node: Union[str, _Step]) -> bool:
+        if not isinstance(node, str):
+            return False
+        tool = self._tool(node)
+        return tool is not None and (tool.token_map or isinstance(tool, Reverse))
+
+    def _token_map(self, names: Tuple[str, ...]) -> Optional[_TokenMapStep]:
+        """Compose a run of token maps and reversals, or return None if the run does not fuse."""
+        if names in self._token_maps:
+            return self._token_maps[names]
+
+        fused = None
+        tools = [self._tool(name) for name in names]
+        if any(tool.token_map for tool in tools):
+            # Start from the identity map: every code is its own token, with no separator
+            tokens = [chr(code) for code in range(256)]
+            separator = ""
+            flip = False
+            # Codes the input must consist of: those valid for every tool up to the first encoder
+            valid = ALL_CODES
+            seen_map = False
+            for tool in tools:
+                tool_valid = self._valid_mask(tool)
+                if not seen_map:
+                    valid &= tool_valid
+                else:
+                    output = charset_mask("".join(tokens) + separator)
+                    if output is None or output & ~tool_valid:
+                        break
+                if isinstance(tool, Reverse):
+                    tokens = [token[::-1] for token in tokens]
+                    separator = separator[::-1]
+                    flip = not flip
+                    continue
+                composed = self._tool_tokens(tool)
+                if composed is None:
+                    break
+                tool_tokens, tool_separator = composed
+                tokens = [tool_separator.join(tool_tokens[ord(c)] for c in token) for token in tokens]
+                if separator:
+                    separator = tool_separator + tool_separator.join(tool_tokens[ord(c)] for c in separator) + tool_separator
+                else:
+                    separator = tool_separator
+                seen_map = True
+            else:
+                if valid:
+                    fused = _TokenMapStep(names, valid, tokens, separator, flip, self.use_bytes)
+        self._token_maps[names] = fused
+        return fused
+
+    @staticmethod
+    def _tool_tokens(tool: Tool) -> Optional[Tuple[List[str], str]]:
+        """Get the token of every code and the separator of a token map tool, or None if it has no usable table."""
+        separator = tool._separator()
+        if separator is None or charset_mask(separator) is None:
+            return None
+        tokens = []
+        for code in range(256):
+            token, error = tool.execute(chr(code))
+            if error or not token or charset_mask(token) is None:
+                return None
+            tokens.append(token)
+        return tokens, separator
@@ -0,0 +1,100 @@
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Tuple
+from pallas.utils.chain_file import iter_chain_file
+
+class TrieNode:
+    """A single prefix in a ChainTrie.
+
+    Each node stands for the chain of tool names on the path from the root to it.
+    `terminal` counts how many chains in the source end exactly at this prefix.
+    """
+    __slots__ = ('children', 'terminal')
+
+    def __init__(self):
+        self.children: Dict[str, 'TrieNode'] = {}
+        self.terminal = 0
+
+    def iter_terminals(self, prefix: List[str]) -> Iterator[List[str]]:
+        """Yield every chain ending at or below this node, in trie order.
+
+        Args:
+            prefix: The tool names on the path from the root to this node.
+
+        Yields:
+            List[str]: One chain per terminal occurrence.
+        """
+        stack: List[Tuple['TrieNode', List[str]]] = [(self, prefix)]
+        while stack:
+            node, chain = stack.pop()
+            for _ in range(node.terminal):
+                yield chain
+            for name, child in reversed(node.children.items()):
+                stack.append((child, chain + [name]))
+
+class ChainTrie:
+    """Prefix trie of tool chains.
+
+    Chains sharing a prefix share the nodes for that prefix, so a runner walking the trie
+    executes every distinct prefix exactly once and can drop a whole subtree when a prefix fails.
+    """
+
+    def __init__(self):
+        self.root = TrieNode()
+        self.chain_count = 0
+        self.node_count = 0
+
+    def insert(self, chain: List[str]) -> None:
+        """Insert a chain of tool names into the trie.
+
+        Args:
+            chain: List of tool names in the chain.
+        """
+        node = self.root
+        for name in chain:
+            child = node.children.get(name)
+            if child is None:
+                child = node.children[name] = TrieNode()
+                self.node_count += 1
+            node = child
+        node.terminal += 1
+        self.chain_count += 1
+
+    @classmethod
+    def from_chains(cls, chains: Iterable[List[str]]) -> 'ChainTrie':
+        """Build a trie from an iterable of chains of tool names.
+
+        Args:
+            chains: Iterable of chains, each a list of tool names.
+
+        Returns:
+            ChainTrie: The populated trie.
+        """
+        trie = cls()
+        for chain in chains:
+            trie.insert(chain)
+        return trie
+
+    @classmethod
+    def from_file(cls, toolchains_file: Path) -> 'ChainTrie':
+        """Build a trie from a toolchain file.
+
+        Args:
+            toolchains_file: Path to a text or binary toolchain file.
+
+        Returns:
+            ChainTrie: The populated trie.
+        """
+        return cls.from_chains(iter_chain_file(toolchains_file))
+
+    @classmethod
+    def from_chainer(cls, chainer) -> 'ChainTrie':
+        """Build a trie directly from the chains a ToolChainer generates.
+
+        Args:
+            chainer: The ToolChainer to draw chains from.
+
+        Returns:
+            ChainTrie: The populated trie.
+        """
+        chains = chainer.iter_chains()
+        return cls.from_chains([chainer.tools[i].name for i in chain] for chain in chains)
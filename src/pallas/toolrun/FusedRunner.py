@@ -0,0 +1,112 @@
+import uuid
+from pathlib import Path
+from typing import List, Optional, TextIO
+from pallas.tools.Tool import ToolError
+from pallas.toolchain.ToolChainer import ToolChainer
+from pallas.toolrun.ResultCache import ResultCache
+from pallas.utils.logging_helpers import TRACE_LIMIT, LoggingHelper
+from pallas.utils.chain_utils import format_chain
+from pallas.common.charsets import charset_mask
+
+class FusedRunner:
+    """Class responsible for generating and executing tool chains in a single search.
+
+    The chain search carries the intermediate output with it and runs each tool as soon as
+    it is appended to the chain. A prefix whose tool returns a ToolError is written to the
+    failed file once and its whole subtree is cut from the search, so extensions of a prefix
+    that cannot decode are never generated.
+    """
+
+    def __init__(self, chainer: ToolChainer, input_text: str, verbose: bool = False, run_id: Optional[str] = None,
+                 cache: Optional[ResultCache] = None, trace: Optional[int] = None):
+        """Initialize the fused runner.
+
+        Args:
+            chainer: ToolChainer defining the tools, rules and chain length to search.
+            input_text: The input text to process through the tool chains.
+            verbose: Whether to enable verbose logging.
+            run_id: Optional UUID to use in the output filenames.
+            cache: Optional result cache to run tools through, so prefixes converging on the same
+                output reuse the results below it.
+            trace: Optional number of characters of each payload to write in per-step trace logs.
+                If None, the per-step messages are not logged.
+        """
+        self.chainer = chainer
+        self.input_text = input_text
+        self.verbose = verbose
+        self.run_id = run_id or str(uuid.uuid4())
+        self.cache = cache
+        self.output_dir = Path('out')
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.outputs: List[str] = []
+        self.masks: List[Optional[int]] = []
+        self._failed_f: Optional[TextIO] = None
+        self.stats = {
+            'chains_succeeded': 0,
+            'prefixes_failed': 0,
+            'tools_run': 0,
+        }
+        self.logger = LoggingHelper(__name__, verbose, self.run_id, trace is not None,
+                                    TRACE_LIMIT if trace is None else trace)
+
+    def run(self) -> None:
+        """Search all valid chains, running each tool as the search descends into it."""
+        success_file = self.output_dir / f'toolrun_succeeded_{self.run_id}.txt'
+        failed_file = self.output_dir / f'toolrun_failed_{self.run_id}.txt'
+
+        self.logger.log("Successful chains will be written to %s", success_file)
+        self.logger.log("Failed prefixes will be written to %s", failed_file)
+
+        self.outputs = [self.input_text]
+        self.masks = [charset_mask(self.input_text)]
+        with open(success_file, 'w') as success_f, open(failed_file, 'w') as self._failed_f:
+            chains = self.chainer.iter_chains(expand=self._expand)
+            names = [tool.name for tool in self.chainer.tools]
+            for chain in chains:
+                success_f.write(f"{format_chain([names[i] for i in chain])} = {self.outputs[len(chain)]}\n")
+                self.stats['chains_succeeded'] += 1
+
+        if self.verbose:
+            self.logger.log("\nFusedRunner Execution Statistics:")
+            self.logger.log("Tools run: %d", self.stats['tools_run'])
+            self.logger.log("Chains succeeded: %d", self.stats['chains_succeeded'])
+            self.logger.log("Prefixes failed: %d", self.stats['prefixes_failed'])
+            self.logger.log("Nodes visited: %d", self.chainer.visited_nodes)
+            if self.cache is not None:
+                self.logger.log("%s", self.cache.format_stats())
+
+    def _expand(self, chain: List[int]) -> bool:
+        """Run the last tool of a chain on the output of its prefix.
+
+        Args:
+            chain: The chain, as tool indices, whose last tool was just appended.
+
+        Returns:
+            bool: True if the tool succeeded and the search should continue below this chain.
+        """
+        depth = len(chain)
+        tool = self.chainer.tools[chain[-1]]
+        self.stats['tools_run'] += 1
+
+        try:
+            if self.cache is not None:
+                result, sep, error = self.cache.run(tool, self.outputs[depth - 1])
+            else:
+                result, sep, error = tool.run(self.outputs[depth - 1], input_mask=self.masks[depth - 1])
+            if error:
+                error = ToolError(tool.name, error.message)
+        except Exception as e:
+            error = str(e)
+
+        if error:
+            self.logger.trace("Error in %s: %s", tool.name, error)
+            names = [self.chainer.tools[i].name for i in chain]
+            self._failed_f.write(f"{format_chain(names)} = Error: {error}\n")
+            self.stats['prefixes_failed'] += 1
+            return False
+
+        del self.outputs[depth:]
+        del self.masks[depth:]
+        self.outputs.append(result)
+        self.masks.append(tool.output_mask(self.masks[depth - 1]))
+        return True
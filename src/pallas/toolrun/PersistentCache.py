@@ -0,0 +1,188 @@
+import hashlib
+import sqlite3
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+from pallas.tools.Tool import Tool, ToolError
+
+DEFAULT_CACHE_PATH = Path('out') / 'cache.db'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key BLOB PRIMARY KEY,
+    tool TEXT NOT NULL,
+    result TEXT,
+    separator TEXT,
+    error TEXT,
+    size INTEGER NOT NULL,
+    accessed INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed);
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+INSERT OR IGNORE INTO meta VALUES ('size', 0);
+"""
+
+class PersistentCache:
+    """Content-addressed tool result cache stored in SQLite, shared across runs.
+
+    Each row is keyed by a digest of the tool name, tool version, tool and input separators
+    and the input digest, and holds the output or the error message of that run. The database
+    runs in WAL mode with a busy timeout, so parallel workers can read while one of them
+    writes. Writes are buffered and flushed in short transactions, each of which evicts the
+    least recently accessed rows once the stored results exceed `max_bytes`.
+    """
+
+    def __init__(self, path: Path = DEFAULT_CACHE_PATH, max_bytes: int = 1 << 30, flush_every: int = 256,
+                 timeout: float = 30.0):
+        """Open or create the cache database.
+
+        Args:
+            path: Path of the SQLite database.
+            max_bytes: Maximum total size of the stored results, in bytes.
+            flush_every: Number of buffered writes after which they are flushed to the database.
+            timeout: Seconds to wait for another process to release the database lock.
+        """
+        if max_bytes < 0:
+            raise ValueError(f"Cache size must not be negative, got {max_bytes}")
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.flush_every = flush_every
+        self._pending: List[tuple] = []
+        self._touched: List[Tuple[int, bytes]] = []
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+        }
+
+        # Transactions are managed explicitly so each flush is a single short write lock
+        self._conn = sqlite3.connect(str(self.path), timeout=timeout, isolation_level=None)
+        self._conn.execute(f"PRAGMA busy_timeout = {int(timeout * 1000)}")
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    @staticmethod
+    def key(tool: Tool, input_separator: Optional[str], digest: bytes) -> bytes:
+        """Build the database key of a tool run.
+
+        Args:
+            tool: The tool to run.
+            input_separator: The separator passed to the tool.
+            digest: Digest of the input string.
+
+        Returns:
+            bytes: The key of the row.
+        """
+        header = repr((tool.name, tool.version, tool.separator, input_separator)).encode()
+        return hashlib.blake2b(header + digest, digest_size=20).digest()
+
+    def get(self, tool: Tool, input_separator: Optional[str], digest: bytes) -> Optional[Tuple[Optional[str], Optional[str], Optional[ToolError]]]:
+        """Look up a stored result.
+
+        Args:
+            tool: The tool to run.
+            input_separator: The separator passed to the tool.
+            digest: Digest of the input string.
+
+        Returns:
+            The stored (result, separator, error), with result None if the run failed, or None on a miss.
+        """
+        key = self.key(tool, input_separator, digest)
+        row = self._conn.execute("SELECT result, separator, error FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.stats['misses'] += 1
+            return None
+
+        self.stats['hits'] += 1
+        self._touched.append((time.time_ns(), key))
+        self._maybe_flush()
+        result, sep, message = row
+        return result, sep, (ToolError(tool.name, message) if message is not None else None)
+
+    def put(self, tool: Tool, input_separator: Optional[str], digest: bytes, result: Optional[str],
+            sep: Optional[str], error: Optional[ToolError]) -> None:
+        """Store a result. The write is buffered until the next flush.
+
+        Args:
+            tool: The tool that was run.
+            input_separator: The separator passed to the tool.
+            digest: Digest of the input string.
+            result: The tool output, or None if the tool failed.
+            sep: The separator returned by the tool.
+            error: The error returned by the tool, if any.
+        """
+        message = error.message if error else None
+        size = len((result or '').encode('utf-8', 'surrogatepass')) + len((message or '').encode('utf-8', 'surrogatepass'))
+        if size > self.max_bytes:
+            return
+        key = self.key(tool, input_separator, digest)
+        self._pending.append((key, tool.name, result, sep, message, size, time.time_ns()))
+        self._maybe_flush()
+
+    def _maybe_flush(self) -> None:
+        if len(self._pending) + len(self._touched) >= self.flush_every:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write buffered results and access times and evict rows beyond the size limit."""
+        if not self._pending and not self._touched:
+            return
+
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            added = 0
+            for row in self._pending:
+                if conn.execute("INSERT OR IGNORE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)", row).rowcount:
+                    added += row[5]
+            conn.executemany("UPDATE results SET accessed = ? WHERE key = ?", self._touched)
+            conn.execute("UPDATE meta SET value = value + ? WHERE name = 'size'", (added,))
+
+            (total,) = conn.execute("SELECT value FROM meta WHERE name = 'size'").fetchone()
+            if total > self.max_bytes:
+                total -= self._evict(total - self.max_bytes)
+                conn.execute("UPDATE meta SET value = ? WHERE name = 'size'", (total,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self._pending.clear()
+        self._touched.clear()
+
+    def _evict(self, excess: int) -> int:
+        """Delete the least recently accessed rows until `excess` bytes are freed.
+
+        Args:
+            excess: Number of bytes to free.
+
+        Returns:
+            int: Number of bytes freed.
+        """
+        freed = 0
+        keys = []
+        for key, size in self._conn.execute("SELECT key, size FROM results ORDER BY accessed"):
+            if freed >= excess:
+                break
+            keys.append((key,))
+            freed += size
+        self._conn.executemany("DELETE FROM results WHERE key = ?", keys)
+        self.stats['evictions'] += len(keys)
+        return freed
+
+    @property
+    def size(self) -> int:
+        """Total size of the stored results, in bytes, excluding unflushed writes."""
+        return self._conn.execute("SELECT value FROM meta WHERE name = 'size'").fetchone()[0]
+
+    def close(self) -> None:
+        """Flush buffered writes and close the database."""
+        self.flush()
+        self._conn.close()
+
+    def __enter__(self) -> 'PersistentCache':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
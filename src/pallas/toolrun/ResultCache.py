@@ -0,0 +1,153 @@
+import hashlib
+import sys
+from collections import OrderedDict
+from typing import Optional, Tuple
+from pallas.tools.Tool import Tool, ToolError
+from pallas.toolrun.PersistentCache import PersistentCache
+
+class ResultCache:
+    """Size-bounded LRU cache of tool results.
+
+    Entries are keyed by the tool class and name, the tool separator, the input separator and
+    a BLAKE2b digest of the input, so the cache never holds the inputs themselves. The size
+    limit counts the memory of the cached outputs and error messages; the least recently used
+    entries are evicted once it is exceeded. A failed run is stored without its output, since
+    Tool.run returns the unchanged input in that case.
+
+    An optional PersistentCache backend is consulted on every miss and receives every newly
+    computed result, so results survive across runs.
+    """
+
+    def __init__(self, max_bytes: int, backend: Optional[PersistentCache] = None):
+        """Initialize the cache.
+
+        Args:
+            max_bytes: Maximum total size of the cached results, in bytes.
+            backend: Optional persistent cache to fall back to on misses.
+        """
+        if max_bytes < 0:
+            raise ValueError(f"Cache size must not be negative, got {max_bytes}")
+        self.max_bytes = max_bytes
+        self.backend = backend
+        self.size = 0
+        self._entries: OrderedDict = OrderedDict()
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+        }
+
+    def run(self, tool: Tool, input_str: str, input_separator: Optional[str] = None) -> Tuple[str, Optional[str], Optional[ToolError]]:
+        """Run a tool through the cache.
+
+        Args:
+            tool: The tool to run.
+            input_str: The input string to process.
+            input_separator: The separator to use for the input string.
+
+        Returns:
+            The same (result, separator, error) tuple as Tool.run.
+        """
+        digest = self.digest(input_str)
+        key = self.key(tool, input_separator, digest)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            result, sep, error, _ = entry
+        else:
+            self.stats['misses'] += 1
+            stored = self.backend.get(tool, input_separator, digest) if self.backend is not None else None
+            if stored is None:
+                result, sep, error = tool.run(input_str, input_separator)
+                if error:
+                    result = None
+                if self.backend is not None:
+                    self.backend.put(tool, input_separator, digest, result, sep, error)
+            else:
+                result, sep, error = stored
+            self.put(key, result, sep, error)
+
+        if input_separator is not None:
+            # Keep the separator side effect of Tool.run
+            tool.separator = input_separator
+        return (input_str if error else result), sep, error
+
+    @staticmethod
+    def digest(input_str: str) -> bytes:
+        """Hash a tool input.
+
+        Args:
+            input_str: The input string to hash.
+
+        Returns:
+            bytes: A 16-byte BLAKE2b digest.
+        """
+        return hashlib.blake2b(input_str.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+
+    @staticmethod
+    def key(tool: Tool, input_separator: Optional[str], digest: bytes) -> tuple:
+        """Build the cache key of a tool run.
+
+        Args:
+            tool: The tool to run.
+            input_separator: The separator to use for the input string.
+            digest: Digest of the input string.
+
+        Returns:
+            tuple: The cache key.
+        """
+        return (type(tool).__qualname__, tool.name, tool.separator, input_separator, digest)
+
+    def put(self, key: tuple, result: Optional[str], sep: Optional[str], error: Optional[ToolError]) -> None:
+        """Store a result, evicting the least recently used entries if the cache is full.
+
+        Args:
+            key: The cache key from `key`.
+            result: The tool output, or None if the tool failed.
+            sep: The separator returned by the tool.
+            error: The error returned by the tool, if any.
+        """
+        size = sys.getsizeof(result) if result is not None else 0
+        if error:
+            size += sys.getsizeof(error.message)
+        if size > self.max_bytes:
+            return
+
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.size -= old[3]
+        self._entries[key] = (result, sep, error, size)
+        self.size += size
+
+        while self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= evicted[3]
+            self.stats['evictions'] += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def format_stats(self) -> str:
+        """Format the cache statistics for logging.
+
+        Returns:
+            str: One line per counter.
+        """
+        lookups = self.stats['hits'] + self.stats['misses']
+        hit_rate = self.stats['hits'] / lookups * 100 if lookups else 0.0
+        return "\n".join([
+            f"Cache hits: {self.stats['hits']} ({hit_rate:.1f}%)",
+            f"Cache misses: {self.stats['misses']}",
+            f"Cache evictions: {self.stats['evictions']}",
+            f"Cache size: {self.size} bytes in {len(self)} entries",
+        ] + ([
+            f"Persistent cache hits: {self.backend.stats['hits']}",
+            f"Persistent cache misses: {self.backend.stats['misses']}",
+            f"Persistent cache evictions: {self.backend.stats['evictions']}",
+        ] if self.backend is not None else []))
+
+    def close(self) -> None:
+        """Flush and close the persistent backend, if any."""
+        if self.backend is not None:
+            self.backend.close()
@@ -1,30 +1,112 @@
+import mmap
 import os
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from itertools import islice
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Any
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple, Any, Union
 from pallas.tools.Tool import Tool, ToolError
+from pallas.tools.streaming import CHUNK_SIZE, iter_chunks, spool
 from pallas.toolchain.ToolProvider import ToolProvider
-from pallas.utils.logging_helpers import LoggingHelper
+from pallas.utils.logging_helpers import TRACE_LIMIT, LoggingHelper
 from pallas.utils.chain_utils import format_chain
+from pallas.utils.chain_file import iter_chain_file
+from pallas.common.charsets import charset_mask
+from pallas.toolrun.ChainTrie import ChainTrie
+from pallas.toolrun.ResultCache import ResultCache
+from pallas.toolrun.ChainCompiler import ChainCompiler
 
 class ToolRunner:
-    """Class responsible for executing tool chains from a file."""
+    """Class responsible for executing tool chains from a file.
 
-    def __init__(self, toolchains_file: str, input_text: str, tool_provider: ToolProvider,
-                 verbose: bool = False, output_filename: Optional[str] = None):
+    Each step hands the bitmap of characters its output can contain to the next tool, so tools
+    whose domain covers that bitmap skip validating their input.
+
+    In bytes mode the input is encoded as latin-1 once, every step runs Tool.run_bytes on the
+    buffer the previous step returned, and only the final output of each chain is decoded.
+
+    In streaming mode each chain is a generator pipeline of Tool.stream calls fed with slices of
+    the encoded input, and the final output is spooled to a temporary file before it is written,
+    so the memory a chain takes is bounded by the chunk buffers rather than the size of the text.
+
+    The input can also be a bytes-like buffer holding latin-1 codes, such as a memory-mapped
+    input file. Streaming mode slices the buffer directly and bytes mode streams it into the
+    first tool of each chain, so neither copies it up front; str mode decodes it once.
+
+    With more than one thread, chains run concurrently on a thread pool. Steps go through
+    Tool.execute, which never changes the shared tool instances, and results are written in
+    chain order by the calling thread.
+
+    When enabled, each chain is compiled before it runs; streaming, a trie and a cache do not
+    support it. Tools followed by their inverse reduce to an input check and runs of token
+    encoders and reversals fuse into one table lookup. See ChainCompiler. Compilation is off
+    by default: a generated file holds each chain once, so a run only pays off when many of its
+    chains cancel or fuse.
+    """
+
+    def __init__(self, toolchains_file: str, input_text: Union[str, bytes, mmap.mmap], tool_provider: ToolProvider,
+                 verbose: bool = False, output_filename: Optional[str] = None, use_trie: bool = False,
+                 cache: Optional[ResultCache] = None, use_bytes: bool = False, streaming: bool = False,
+                 threads: int = 1, compile_chains: bool = False, trace: Optional[int] = None):
         """Initialize the tool runner.
 
         Args:
             toolchains_file: Path to the file containing tool chains to execute.
-            input_text: The input text to process through the tool chains.
+            input_text: The input text to process through the tool chains, or a buffer of its latin-1 codes.
             tool_provider: ToolProvider instance to use for loading tools.
             verbose: Whether to enable verbose logging.
             output_filename: Optional filename for the output file. If None, uses 'toolrun.txt'.
+            use_trie: Whether to execute chains through a prefix trie so shared prefixes run only once.
+            cache: Optional result cache to run tools through, so repeated (tool, input) pairs run once.
+            use_bytes: Whether to pass latin-1 encoded buffers between steps instead of str.
+            streaming: Whether to stream each chain through its tools in chunks.
+            threads: Number of threads to run chains on.
+            compile_chains: Whether to compile each chain into an optimized callable before it runs.
+                Ignored with a cache, which runs every tool through the cache instead.
+            trace: Optional number of characters of each payload to write in per-step trace logs.
+                If None, the per-step messages are not logged.
+
+        Raises:
+            ValueError: If bytes mode is combined with a cache, streaming mode with a cache or a trie,
+                threads with a cache, a trie or streaming, compilation with a cache, a trie or streaming,
+                or either mode gets input that is not latin-1 text.
         """
+        if use_bytes and cache is not None:
+            raise ValueError("The result cache does not support bytes mode")
+        if streaming and (cache is not None or use_trie):
+            raise ValueError("Streaming mode does not support the result cache or the chain trie")
+        if threads < 1:
+            raise ValueError(f"Thread count must be at least 1, got {threads}")
+        if threads > 1 and (cache is not None or use_trie or streaming):
+            raise ValueError("Threads do not support the result cache, the chain trie or streaming mode")
+        if compile_chains and (cache is not None or use_trie or streaming):
+            raise ValueError("Chain compilation does not support the result cache, the chain trie or streaming mode")
+
         self.toolchains_file = Path(toolchains_file)
-        self.input_text = input_text
         self.tool_provider = tool_provider
         self.verbose = verbose
+        self.use_trie = use_trie
+        self.cache = cache
+        self.use_bytes = use_bytes
+        self.streaming = streaming
+        self.threads = threads
+        self.compile_chains = compile_chains
+        self.compiler: Optional[ChainCompiler] = None
+        if not isinstance(input_text, str):
+            # Scanning a large buffer for its character set would cost as much as validating it
+            self.input_bytes = input_text
+            self.input_mask = None
+            self.input_text = None if use_bytes or streaming else str(input_text, 'latin1')
+        else:
+            self.input_text = input_text
+            self.input_mask = charset_mask(input_text)
+            if use_bytes or streaming:
+                try:
+                    self.input_bytes = input_text.encode('latin1')
+                except UnicodeEncodeError as e:
+                    mode = "Streaming" if streaming else "Bytes"
+                    raise ValueError(f"{mode} mode needs input characters in U+0000-U+00FF: {e}")
         self.tools: Dict[str, Tool] = {}
         self.run_id = str(uuid.uuid4())
         self.output_dir = Path('out')
@@ -35,7 +117,8 @@ class ToolRunner:
             'chains_failed': 0,
             'tools_loaded': 0
         }
-        self.logger = LoggingHelper(__name__, verbose, self.run_id)
+        self.logger = LoggingHelper(__name__, verbose, self.run_id, trace is not None,
+                                    TRACE_LIMIT if trace is None else trace)
 
     def _load_tools(self) -> None:
         """Load all available tools and create a name-to-tool mapping."""
@@ -43,7 +126,14 @@ class ToolRunner:
         tools = self.tool_provider.discover_tools()
         self.tools = {tool.name: tool for tool in tools}
         self.stats['tools_loaded'] = len(self.tools)
-        self.logger.log(f"Loaded {len(self.tools)} tools: {', '.join(self.tools.keys())}")
+        self.logger.log("Loaded %d tools: %s", len(self.tools), ', '.join(self.tools.keys()))
+        self.compiler = None
+
+    def _get_compiler(self) -> ChainCompiler:
+        """Get the chain compiler for the loaded tools, creating it on first use."""
+        if self.compiler is None or self.compiler.tools is not self.tools:
+            self.compiler = ChainCompiler(self.tools, self._run_step, self.use_bytes)
+        return self.compiler
 
     def _execute_chain(self, chain: List[str]) -> Tuple[str, Optional[ToolError]]:
         """Execute a single tool chain.
@@ -54,72 +144,323 @@ class ToolRunner:
         Returns:
             Tuple[str, Optional[ToolError]]: The final output and any error that occurred.
         """
-        self.logger.log(f"\nExecuting chain: {' -> '.join(chain)}")
-        self.logger.log(f"Initial input: {self.input_text}")
-
-        current_input = self.input_text
-        for i, tool_name in enumerate(chain, 1):
-            if tool_name not in self.tools:
-                error = ToolError(tool_name, f"Tool not found: {tool_name}")
-                self.logger.log_error(f"Error: {error}")
+        trace = self.logger.trace_enabled()
+        if trace:
+            self.logger.trace("Executing chain: %s", ' -> '.join(chain))
+            if self.input_text is not None:
+                self.logger.trace("Initial input: %s", self.input_text)
+
+        current_input = self.input_bytes if self.use_bytes else self.input_text
+        current_mask = self.input_mask
+        if self.compile_chains:
+            compiled = self._get_compiler().compile(chain)
+            if trace:
+                self.logger.trace("Compiled chain: %s", str(compiled))
+            current_input, error = compiled(current_input, current_mask)
+            if error:
                 return "", error
+        else:
+            for i, tool_name in enumerate(chain, 1):
+                self.logger.trace("Step %d/%d: Running %s", i, len(chain), tool_name)
+                result, error, current_mask = self._run_step(tool_name, current_input, current_mask)
+                if error:
+                    return "", error
+                current_input = result
+
+        if self.use_bytes:
+            current_input = current_input.decode('latin1')
+        self.logger.trace("Chain completed successfully. Final output: %s", current_input)
+        return current_input, None
+
+    def _run_step(self, tool_name: str, current_input: Union[str, bytes],
+                  input_mask: Optional[int] = None) -> Tuple[Union[str, bytes], Optional[ToolError], Optional[int]]:
+        """Run a single tool of a chain.
+
+        Args:
+            tool_name: Name of the tool to run.
+            current_input: The output of the previous step, as bytes in bytes mode.
+            input_mask: Bitmap of the characters the input can contain, or None if unknown.
+
+        Returns:
+            Tuple[Union[str, bytes], Optional[ToolError], Optional[int]]: The tool output, any error that
+                occurred and the bitmap of the characters the output can contain.
+        """
+        if tool_name not in self.tools:
+            error = ToolError(tool_name, f"Tool not found: {tool_name}")
+            self.logger.trace("Error: %s", error)
+            return "", error, None
+
+        tool = self.tools[tool_name]
+        # Tools not derived from Tool take no input mask and describe no output
+        charset_aware = isinstance(tool, Tool)
+        if self.use_bytes and not isinstance(current_input, bytes):
+            # The input buffer is streamed into the first tool rather than copied
+            result, sep, error = self._run_step_stream(tool_name, tool, current_input)
+        elif self.use_bytes:
+            result, error = tool.execute_bytes(current_input, input_mask=input_mask)
+        elif self.cache is not None:
+            result, sep, error = self.cache.run(tool, current_input)
+        elif charset_aware:
+            result, error = tool.execute(current_input, input_mask=input_mask)
+        else:
+            result, sep, error = tool.run(current_input)
+
+        if error:
+            self.logger.trace("Error in %s: %s", tool_name, error)
+            return "", ToolError(tool_name, error.message), None
+
+        self.logger.trace("Output from %s: %s", tool_name, result)
+        return result, None, (tool.output_mask(input_mask) if charset_aware else None)
+
+    @staticmethod
+    def _run_step_stream(tool_name: str, tool: Any, buffer) -> Tuple[bytes, Optional[str], Optional[ToolError]]:
+        """Run a tool on a bytes-like buffer through its stream method.
+
+        Args:
+            tool_name: Name of the tool to run.
+            tool: The tool to run.
+            buffer: The latin-1 encoded input, such as a memory-mapped file.
+
+        Returns:
+            The same (result, separator, error) tuple as Tool.run_bytes.
+        """
+        chunks = iter_chunks(buffer)
+        stream = tool.stream(chunks) if isinstance(tool, Tool) else _buffered_stream(tool_name, tool, chunks)
+        try:
+            return b"".join(stream), tool.separator, None
+        except ToolError as error:
+            return b"", tool.separator, error
+
+    def _stream_chain(self, chain: List[str]) -> Iterator[bytes]:
+        """Compose the tools of a chain into a generator pipeline over the input chunks.
+
+        Args:
+            chain: List of tool names in the chain.
+
+        Returns:
+            Iterator[bytes]: The latin-1 encoded output chunks. Iterating raises a ToolError for the first
+                tool of the chain that fails.
+        """
+        chunks = iter_chunks(self.input_bytes)
+        mask = self.input_mask
+        for tool_name in chain:
+            tool = self.tools.get(tool_name)
+            if tool is None:
+                chunks, mask = _missing_tool_stream(tool_name, chunks), None
+            elif isinstance(tool, Tool):
+                chunks, mask = tool.stream(chunks, input_mask=mask), tool.output_mask(mask)
+            else:
+                # Tools not derived from Tool only run on whole strings
+                chunks, mask = _buffered_stream(tool_name, tool, chunks), None
+        return chunks
+
+    def _execute_chain_stream(self, chain: List[str], output: BinaryIO) -> Optional[ToolError]:
+        """Execute a single tool chain in streaming mode.
+
+        Args:
+            chain: List of tool names in the chain.
+            output: Binary file the latin-1 encoded final output is written to.
+
+        Returns:
+            Optional[ToolError]: The error that stopped the chain, if any.
+        """
+        if self.logger.trace_enabled():
+            self.logger.trace("Streaming chain: %s", ' -> '.join(chain))
+        try:
+            for chunk in self._stream_chain(chain):
+                output.write(chunk)
+        except ToolError as error:
+            self.logger.trace("Error in %s: %s", error.tool_name, error)
+            return error
 
-            self.logger.log(f"Step {i}/{len(chain)}: Running {tool_name}")
-            result, sep, error = self.tools[tool_name].run(current_input)
+        self.logger.trace("Chain completed successfully. Final output: %d bytes", output.tell())
+        return None
 
+    def _record_stream_result(self, chain: List[str], success_f, failed_f) -> None:
+        """Stream one chain and write its outcome without holding its output in memory.
+
+        Args:
+            chain: List of tool names in the chain.
+            success_f: Open file for successful chains.
+            failed_f: Open file for failed chains.
+        """
+        with spool() as output:
+            try:
+                error = self._execute_chain_stream(chain, output)
+            except Exception as e:
+                error = str(e)
             if error:
-                self.logger.log_error(f"Error in {tool_name}: {error}")
-                return "", ToolError(tool_name, error.message)
+                self._record_result(chain, "", error, success_f, failed_f)
+                return
 
-            self.logger.log(f"Output from {tool_name}: {result}")
-            current_input = result
+            output.seek(0)
+            success_f.write(f"{format_chain(chain)} = ")
+            for block in iter(lambda: output.read(CHUNK_SIZE), b""):
+                success_f.write(block.decode('latin1'))
+            success_f.write("\n")
+            self.stats['chains_processed'] += 1
+            self.stats['chains_succeeded'] += 1
 
-        self.logger.log(f"Chain completed successfully. Final output: {current_input}")
-        return current_input, None
+    def _record_result(self, chain: List[str], output: str, error: Optional[Any], success_f, failed_f) -> None:
+        """Write the outcome of one chain to the success or failure file.
+
+        Args:
+            chain: List of tool names in the chain.
+            output: The final output of the chain.
+            error: The error that stopped the chain, if any.
+            success_f: Open file for successful chains.
+            failed_f: Open file for failed chains.
+        """
+        chain_str = format_chain(chain)
+        self.stats['chains_processed'] += 1
+        if error:
+            failed_f.write(f"{chain_str} = Error: {error}\n")
+            self.stats['chains_failed'] += 1
+        else:
+            success_f.write(f"{chain_str} = {output}\n")
+            self.stats['chains_succeeded'] += 1
 
     def run(self) -> None:
         """Execute all tool chains from the input file."""
+        if self.use_trie:
+            self.run_trie()
+            return
+
         # First pass: load all tools
         self._load_tools()
 
         # Second pass: execute chains and write to separate output files
-        self.logger.log(f"\nExecuting chains from {self.toolchains_file}")
+        self.logger.log("\nExecuting chains from %s", self.toolchains_file)
+
+        with self._open_output_files() as (success_f, failed_f):
+            if self.threads > 1:
+                self._run_threaded(success_f, failed_f)
+            else:
+                for chain in iter_chain_file(self.toolchains_file):
+                    if self.streaming:
+                        self._record_stream_result(chain, success_f, failed_f)
+                        continue
+
+                    # Execute the chain
+                    output, error = self._try_execute_chain(chain)
+                    self._record_result(chain, output, error, success_f, failed_f)
+
+        self._log_stats()
+
+    def _try_execute_chain(self, chain: List[str]) -> Tuple[str, Optional[Any]]:
+        """Execute a single tool chain, turning unexpected exceptions into errors."""
+        try:
+            return self._execute_chain(chain)
+        except Exception as e:
+            return "", str(e)
+
+    def _run_threaded(self, success_f, failed_f) -> None:
+        """Execute the chains on a thread pool, recording the results in chain order.
+
+        Chains are submitted in batches so only a bounded number of them and their outputs
+        are held at a time.
+
+        Args:
+            success_f: Open file for successful chains.
+            failed_f: Open file for failed chains.
+        """
+        self.logger.log("Running chains on %d threads", self.threads)
+        chains = iter_chain_file(self.toolchains_file)
+        with ThreadPoolExecutor(max_workers=self.threads) as executor:
+            while True:
+                batch = list(islice(chains, self.threads * 64))
+                if not batch:
+                    break
+                for chain, (output, error) in zip(batch, executor.map(self._try_execute_chain, batch)):
+                    self._record_result(chain, output, error, success_f, failed_f)
 
+    def run_trie(self, trie: Optional[ChainTrie] = None) -> None:
+        """Execute tool chains through a prefix trie.
+
+        Every distinct prefix is executed exactly once and its output is handed down to the
+        child prefixes. When a prefix fails, every chain below it is written as failed with
+        the same error without running anything further.
+
+        Args:
+            trie: Optional prebuilt trie. If None, the trie is built from the toolchains file.
+        """
+        self._load_tools()
+
+        if trie is None:
+            self.logger.log("\nBuilding chain trie from %s", self.toolchains_file)
+            trie = ChainTrie.from_file(self.toolchains_file)
+        self.logger.log("Chain trie holds %d chains over %d distinct prefixes", trie.chain_count, trie.node_count)
+
+        with self._open_output_files() as (success_f, failed_f):
+            # Each entry holds a node, the chain leading to it and the output of its parent
+            root_input = self.input_bytes if self.use_bytes else self.input_text
+            stack = [(child, [name], root_input, self.input_mask) for name, child in reversed(trie.root.children.items())]
+            while stack:
+                node, chain, parent_output, parent_mask = stack.pop()
+                tool_name = chain[-1]
+                if self.logger.trace_enabled():
+                    self.logger.trace("Running %s for prefix: %s", tool_name, ' -> '.join(chain))
+
+                try:
+                    output, error, mask = self._run_step(tool_name, parent_output, parent_mask)
+                except Exception as e:
+                    output, error, mask = "", str(e), None
+
+                if error:
+                    for failed_chain in node.iter_terminals(chain):
+                        self._record_result(failed_chain, "", error, success_f, failed_f)
+                    continue
+
+                if node.terminal:
+                    text = output.decode('latin1') if self.use_bytes else output
+                    for _ in range(node.terminal):
+                        self._record_result(chain, text, None, success_f, failed_f)
+                for name, child in reversed(node.children.items()):
+                    stack.append((child, chain + [name], output, mask))
+
+        self._log_stats()
+
+    @contextmanager
+    def _open_output_files(self):
+        """Open the success and failure output files for this run.
+
+        Yields:
+            Tuple of the open success and failure files.
+        """
         success_file = self.output_dir / f'toolrun_succeeded_{self.run_id}.txt'
         failed_file = self.output_dir / f'toolrun_failed_{self.run_id}.txt'
 
-        self.logger.log(f"Successful chains will be written to {success_file}")
-        self.logger.log(f"Failed chains will be written to {failed_file}")
+        self.logger.log("Successful chains will be written to %s", success_file)
+        self.logger.log("Failed chains will be written to %s", failed_file)
 
         with open(success_file, 'w') as success_f, open(failed_file, 'w') as failed_f:
-            with open(self.toolchains_file) as f:
-                for line in f:
-                    line = line.strip()
-                    if not line or line.startswith('#'):
-                        continue
-
-                    # Parse the chain
-                    chain = [tool.strip() for tool in line.split('->')]
-                    chain_str = format_chain(chain)
-                    self.stats['chains_processed'] += 1
-
-                    # Execute the chain
-                    try:
-                        output, error = self._execute_chain(chain)
-                        if error:
-                            failed_f.write(f"{chain_str} = Error: {error}\n")
-                            self.stats['chains_failed'] += 1
-                        else:
-                            success_f.write(f"{chain_str} = {output}\n")
-                            self.stats['chains_succeeded'] += 1
-                    except Exception as e:
-                        failed_f.write(f"{chain_str} = Error: {str(e)}\n")
-                        self.stats['chains_failed'] += 1
-                        continue
+            yield success_f, failed_f
 
+    def _log_stats(self) -> None:
+        """Log execution statistics in verbose mode."""
         if self.verbose:
             self.logger.log("\nToolRunnerExecution Statistics:")
-            self.logger.log(f"Tools loaded: {self.stats['tools_loaded']}")
-            self.logger.log(f"Chains processed: {self.stats['chains_processed']}")
-            self.logger.log(f"Chains succeeded: {self.stats['chains_succeeded']}")
-            self.logger.log(f"Chains failed: {self.stats['chains_failed']}")
+            self.logger.log("Tools loaded: %d", self.stats['tools_loaded'])
+            self.logger.log("Chains processed: %d", self.stats['chains_processed'])
+            self.logger.log("Chains succeeded: %d", self.stats['chains_succeeded'])
+            self.logger.log("Chains failed: %d", self.stats['chains_failed'])
+            if self.cache is not None:
+                self.logger.log("%s", self.cache.format_stats())
+            if self.compiler is not None:
+                stats = self.compiler.stats
+                self.logger.log("Chains compiled: %d (%d cache hits), tools eliminated: %d, tools fused: %d",
+                                stats['chains_compiled'], stats['cache_hits'], stats['tools_eliminated'], stats['tools_fused'])
+
+def _missing_tool_stream(tool_name: str, chunks: Iterator[bytes]) -> Iterator[bytes]:
+    """Stand in for a tool that is not loaded, failing once the earlier tools have run."""
+    for _ in chunks:
+        pass
+    raise ToolError(tool_name, f"Tool not found: {tool_name}")
+    yield  # Never reached; makes this function a generator
+
+def _buffered_stream(tool_name: str, tool: Any, chunks: Iterator[bytes]) -> Iterator[bytes]:
+    """Run a tool with only the str interface on the joined input chunks."""
+    result, sep, error = tool.run(b"".join(chunks).decode('latin1'))
+    if error:
+        raise ToolError(tool_name, error.message)
+    yield result.encode('latin1')
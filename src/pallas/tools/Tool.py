@@ -1,7 +1,8 @@
 from abc import ABC, abstractmethod
-from typing import Set, Optional, Tuple
+from typing import Dict, FrozenSet, Iterable, Iterator, Set, Optional, Tuple
 from pallas.tools.ToolError import ToolError
 from pallas.features.aggressive_spacing import AGGRESSIVE_SPACING
+from pallas.common.charsets import charset_mask
 
 class Tool(ABC):
     """
@@ -12,6 +13,14 @@ class Tool(ABC):
     The _process method is the core logic that concrete tools should implement.
     The run method is a wrapper around the _process method that provides error handling.
     The run method is the main method that should be used to run the tool.
+    The execute method runs the tool like run but takes the separator for the call only and never changes
+    the tool, so instances shared between threads can run concurrently.
+    The output_mask method describes which characters an output can contain, so that the next tool can
+    be run with that bitmap as input_mask and skip scanning the input when the bitmap fits its domain.
+    The run_bytes method runs the tool on a bytes buffer holding the latin-1 encoding of the text. It falls
+    back to _process unless the concrete tool overrides _process_bytes.
+    The stream method runs the tool on a latin-1 encoded input given as chunks and yields the output in chunks.
+    It buffers the whole input unless the concrete tool overrides _process_stream.
     Always implement the _process method in the concrete tool class.
     Always implement the Tool interface when creating new tools.
     """
@@ -20,6 +29,19 @@ class Tool(ABC):
     domain_chars: str = ""
     range_chars: str = ""
     separator: Optional[str] = None
+    # True if every output character is in range_chars or the separator, which lets output_mask describe the output
+    exact_range: bool = False
+    # Bump when a change to _process alters its output, so persisted results are not reused
+    version: str = "1"
+    # Name of the tool that restores any valid input of this tool when both use the same separator
+    inverse: Optional[str] = None
+    # Characters the inverse restores, if only a subset of the domain round-trips
+    inverse_chars: Optional[str] = None
+    # True if the output is the tokens of the single input characters joined by the separator
+    token_map: bool = False
+    # Deletion table and bitmap of the valid codes, keyed by separator and built on first use
+    _validity: Optional[Dict[Optional[str], Tuple[bytes, int]]] = None
+    _range_mask: Optional[int] = None
 
     def __init__(self, separator: Optional[str] = None):
         """Initialize the tool with an optional custom separator."""
@@ -44,13 +66,36 @@ class Tool(ABC):
         """
         pass
 
-    def run(self, input_str: str, input_separator: Optional[str] = None, error: Optional[ToolError] = None) -> Tuple[str, Optional[str], Optional[ToolError]]:
+    def _process_bytes(self, data: bytes, input_separator: Optional[str] = None) -> bytes:
+        """
+        Process a latin-1 encoded input buffer. Override this in concrete tools that can work on bytes
+        directly; the default converts to str, runs _process and converts back.
+
+        Args:
+            data: The latin-1 encoded input
+            input_separator: The separator to use for the input
+
+        Returns:
+            The latin-1 encoded output
+
+        Raises:
+            Exception: If there is an error during processing, including output characters above U+00FF
+        """
+        return self._process(data.decode('latin1'), input_separator).encode('latin1')
+
+    def run(self, input_str: str, input_separator: Optional[str] = None, error: Optional[ToolError] = None,
+            input_mask: Optional[int] = None) -> Tuple[str, Optional[str], Optional[ToolError]]:
         """Run the tool on the input string.
 
+        A separator passed here replaces self.separator for this and later runs. Use execute to run
+        a tool shared between threads.
+
         Args:
             input_str: The input string to process
             input_separator: The separator to use for the input string
             error: Optional error from a previous tool
+            input_mask: Optional bitmap of the characters the input can contain, as returned by the
+                previous tool's output_mask. Validation is skipped when it fits the domain
 
         Returns:
             A tuple of (result, error) where result is the processed string and error is None if successful
@@ -61,23 +106,227 @@ class Tool(ABC):
         if input_separator is not None:
             self.separator = input_separator
 
+        result, error = self.execute(input_str, input_separator, input_mask)
+        return result, self.separator, error
+
+    def execute(self, input_str: str, input_separator: Optional[str] = None,
+                input_mask: Optional[int] = None) -> Tuple[str, Optional[ToolError]]:
+        """Run the tool on the input string without changing the tool.
+
+        Produces what run would, but the separator only applies to this call, so a single instance
+        can serve concurrent calls from several threads.
+
+        Args:
+            input_str: The input string to process
+            input_separator: The separator to use for this call instead of self.separator
+            input_mask: Optional bitmap of the characters the input can contain
+
+        Returns:
+            A tuple of (result, error) where result is the processed string, or the input if an error occurred
+        """
         # Validate input characters
-        if input_str:
-            invalid_chars = set(input_str) - set(self.domain_chars)
+        valid_table, valid_mask = self._valid_codes(input_separator)
+        if input_str and (input_mask is None or input_mask & ~valid_mask):
+            try:
+                invalid = input_str.encode('latin1').translate(None, valid_table)
+            except UnicodeEncodeError:
+                # Characters above U+00FF are outside the table, so check them exactly
+                invalid = True
+            if invalid:
+                invalid_chars = set(input_str) - self._allowed_chars(input_separator)
+                if invalid_chars:
+                    return input_str, ToolError(self.name, f"Input contains invalid characters: {invalid_chars}")
 
-            if AGGRESSIVE_SPACING:
-                invalid_chars = invalid_chars - set(' ')
+        try:
+            return self._process(input_str, input_separator), None
+        except Exception as e:
+            return input_str, ToolError(self.name, str(e))
 
-            if self.separator and self.separator in invalid_chars:
-                invalid_chars.remove(self.separator)
-            if input_separator and input_separator in invalid_chars:
-                invalid_chars.remove(input_separator)
-            if invalid_chars:
-                return input_str, self.separator, ToolError(self.name, f"Input contains invalid characters: {invalid_chars}")
+    def run_bytes(self, data: bytes, input_separator: Optional[str] = None, error: Optional[ToolError] = None,
+                  input_mask: Optional[int] = None) -> Tuple[bytes, Optional[str], Optional[ToolError]]:
+        """Run the tool on a latin-1 encoded buffer.
+
+        Produces the latin-1 encoding of what run would return for the decoded text, including the same errors.
+
+        Args:
+            data: The latin-1 encoded input, as bytes or any other bytes-like object
+            input_separator: The separator to use for the input
+            error: Optional error from a previous tool
+            input_mask: Optional bitmap of the characters the input can contain
+
+        Returns:
+            A tuple of (result, separator, error) where result is the processed buffer and error is None if successful
+        """
+        if error is not None:
+            return data, self.separator, error
+
+        if input_separator is not None:
+            self.separator = input_separator
+
+        result, error = self.execute_bytes(data, input_separator, input_mask)
+        return result, self.separator, error
+
+    def execute_bytes(self, data: bytes, input_separator: Optional[str] = None,
+                      input_mask: Optional[int] = None) -> Tuple[bytes, Optional[ToolError]]:
+        """Run the tool on a latin-1 encoded buffer without changing the tool.
+
+        Args:
+            data: The latin-1 encoded input, as bytes or any other bytes-like object
+            input_separator: The separator to use for this call instead of self.separator
+            input_mask: Optional bitmap of the characters the input can contain
+
+        Returns:
+            A tuple of (result, error) where result is the processed buffer, or the input if an error occurred
+        """
+        if not isinstance(data, bytes):
+            data = bytes(data)
+
+        # Validate input characters
+        valid_table, valid_mask = self._valid_codes(input_separator)
+        if data and (input_mask is None or input_mask & ~valid_mask) and data.translate(None, valid_table):
+            invalid_chars = set(data.decode('latin1')) - self._allowed_chars(input_separator)
+            return data, ToolError(self.name, f"Input contains invalid characters: {invalid_chars}")
 
         try:
-            result = self._process(input_str, input_separator)
+            return self._process_bytes(data, input_separator), None
+        except Exception as e:
+            return data, ToolError(self.name, str(e))
+
+    def stream(self, chunks: Iterable[bytes], input_separator: Optional[str] = None,
+               input_mask: Optional[int] = None) -> Iterator[bytes]:
+        """Run the tool on a latin-1 encoded input given as chunks, without changing the tool.
+
+        The output chunks join to what run_bytes would return for the joined input. Errors are
+        raised as ToolError while iterating. When one occurs the rest of the input is still read,
+        so an error of an earlier tool later in its output, or invalid characters anywhere in the
+        input, are reported instead, as run reports them.
 
-            return result, self.separator, None
+        Args:
+            chunks: The latin-1 encoded input chunks, such as the output of another tool's stream
+            input_separator: The separator to use for this call instead of self.separator
+            input_mask: Optional bitmap of the characters the input can contain
+
+        Yields:
+            bytes: The latin-1 encoded output chunks
+
+        Raises:
+            ToolError: If the input is invalid or processing fails
+        """
+        valid_table, valid_mask = self._valid_codes(input_separator)
+        checked = iter(chunks)
+        if input_mask is None or input_mask & ~valid_mask:
+            checked = self._validate_stream(checked, valid_table)
+
+        try:
+            yield from self._process_stream(checked, input_separator)
+        except ToolError:
+            raise
         except Exception as e:
-            return input_str, self.separator, ToolError(self.name, str(e))
\ No newline at end of file
+            # run validates the whole input before processing, so invalid characters further on win
+            for _ in checked:
+                pass
+            raise ToolError(self.name, str(e))
+
+    def _validate_stream(self, chunks: Iterator[bytes], valid_table: bytes) -> Iterator[bytes]:
+        """Pass on the non-empty input chunks, raising a ToolError at the first invalid one.
+
+        Args:
+            chunks: The latin-1 encoded input chunks
+            valid_table: The valid codes as a deletion table, from _valid_codes
+
+        Yields:
+            bytes: The input chunks
+        """
+        for chunk in chunks:
+            invalid = chunk.translate(None, valid_table)
+            if invalid:
+                # Collect the invalid characters of the whole input, as run reports them
+                invalid_codes = set(invalid)
+                for rest in chunks:
+                    invalid_codes.update(rest.translate(None, valid_table))
+                invalid_chars = {chr(code) for code in invalid_codes}
+                raise ToolError(self.name, f"Input contains invalid characters: {invalid_chars}")
+            if chunk:
+                yield chunk
+
+    def _process_stream(self, chunks: Iterator[bytes], input_separator: Optional[str] = None) -> Iterator[bytes]:
+        """
+        Process a latin-1 encoded input given as validated, non-empty chunks. Override this in concrete tools
+        that can work in bounded memory; the default joins the whole input and runs _process_bytes.
+
+        Args:
+            chunks: The latin-1 encoded input chunks
+            input_separator: The separator to use for the input
+
+        Yields:
+            bytes: The latin-1 encoded output chunks
+
+        Raises:
+            Exception: If there is an error during processing
+        """
+        yield self._process_bytes(b"".join(chunks), input_separator)
+
+    def _separator(self, input_separator: Optional[str] = None) -> Optional[str]:
+        """Get the separator a call uses: the one passed to it, or self.separator if none was passed."""
+        return self.separator if input_separator is None else input_separator
+
+    def _allowed_chars(self, input_separator: Optional[str] = None) -> FrozenSet[str]:
+        """Get the characters valid in an input to this tool.
+
+        These are the domain characters plus the exemptions: the space when AGGRESSIVE_SPACING is
+        enabled and the separator of the call when it is a single character.
+
+        Args:
+            input_separator: The separator passed to the call, if any.
+
+        Returns:
+            FrozenSet[str]: The valid characters.
+        """
+        separator = self._separator(input_separator)
+        allowed = set(self.domain_chars)
+        if AGGRESSIVE_SPACING:
+            allowed.add(' ')
+        if separator and len(separator) == 1:
+            allowed.add(separator)
+        return frozenset(allowed)
+
+    def _valid_codes(self, input_separator: Optional[str] = None) -> Tuple[bytes, int]:
+        """Get the latin-1 codes valid in an input for the separator of a call.
+
+        Deleting the codes from an encoded input with bytes.translate leaves exactly the invalid
+        characters, so validation is a single table-driven pass. The bitmap holds the same codes.
+        The tables are only ever added to, so concurrent calls at worst build one twice.
+
+        Args:
+            input_separator: The separator passed to the call, if any.
+
+        Returns:
+            Tuple[bytes, int]: The valid codes as a deletion table and as a bitmap.
+        """
+        if self._validity is None:
+            self._validity = {}
+        separator = self._separator(input_separator)
+        codes = self._validity.get(separator)
+        if codes is None:
+            table = bytes(sorted(ord(c) for c in self._allowed_chars(input_separator) if ord(c) < 256))
+            codes = self._validity[separator] = (table, charset_mask(table.decode('latin1')))
+        return codes
+
+    def output_mask(self, input_mask: Optional[int] = None, input_separator: Optional[str] = None) -> Optional[int]:
+        """Describe the characters the output of a run can contain.
+
+        Args:
+            input_mask: Bitmap of the characters the input could contain, or None if unknown.
+            input_separator: The separator passed to the run, if any.
+
+        Returns:
+            Optional[int]: Bitmap of the possible output characters, or None if unknown.
+        """
+        if not self.exact_range:
+            return None
+        if self._range_mask is None:
+            self._range_mask = charset_mask(self.range_chars)
+        separator_mask = charset_mask(self._separator(input_separator) or '')
+        if self._range_mask is None or separator_mask is None:
+            return None
+        return self._range_mask | separator_mask
@@ -2,7 +2,7 @@ from pallas.tools.Tool import Tool
 from pallas.common import EXTENDED_ASCII_CHARSET, BASE64_CHARSET
 from pallas.features.aggressive_spacing import AGGRESSIVE_SPACING
 import base64
-from typing import Optional
+from typing import Iterator, Optional
 
 class Base64Decoder(Tool):
     name = "base64_decoder"
@@ -26,4 +26,64 @@ class Base64Decoder(Tool):
                 input_str += '=' * (4 - len(input_str) % 4)
             return base64.b64decode(input_str.encode()).decode('latin1')
         except Exception as e:
-            raise ValueError(f"Invalid Base64 input: {str(e)}")
\ No newline at end of file
+            raise ValueError(f"Invalid Base64 input: {str(e)}")
+
+    def _process_bytes(self, data: bytes, input_separator: Optional[str] = None) -> bytes:
+        """Convert Base64 representation back to latin-1 encoded text."""
+        if not data:
+            return b""
+        try:
+            if input_separator:
+                data = data.strip().replace(input_separator.encode('latin1'), b'')
+
+            if AGGRESSIVE_SPACING:
+                data = data.strip().replace(b' ', b'')
+
+            if len(data) % 4 != 0:
+                data += b'=' * (4 - len(data) % 4)
+            return base64.b64decode(data)
+        except Exception as e:
+            raise ValueError(f"Invalid Base64 input: {str(e)}")
+
+    def _process_stream(self, chunks: Iterator[bytes], input_separator: Optional[str] = None) -> Iterator[bytes]:
+        """Convert Base64 representation back to latin-1 encoded text in runs of whole 4-character groups.
+
+        The separator and spaces are dropped chunk by chunk. Padding normally only ends the input, so
+        from the first '=' on the rest of the input is gathered and decoded at once, as a whole input
+        would be; base64 treats padding in the middle of the input differently across Python versions.
+        An error describes the rest of the input that was left to decode, not the whole input.
+        """
+        if input_separator and len(input_separator) != 1:
+            yield from super()._process_stream(chunks, input_separator)
+            return
+
+        # A separator outside latin-1 cannot occur in the input
+        removed = (input_separator or '').encode('latin1', 'ignore') + (b' ' if AGGRESSIVE_SPACING else b'')
+        carry = b""
+        tail = None
+        for chunk in chunks:
+            if removed:
+                chunk = chunk.translate(None, removed)
+            if tail is not None:
+                tail.append(chunk)
+                continue
+            if b'=' in chunk:
+                tail = [carry, chunk]
+                continue
+            data = carry + chunk
+            end = len(data) - len(data) % 4
+            carry = data[end:]
+            if end:
+                # Whole groups without padding always decode
+                yield base64.b64decode(data[:end])
+
+        data = b"".join(tail) if tail is not None else carry
+        if not data:
+            return
+        if len(data) % 4 != 0:
+            data += b'=' * (4 - len(data) % 4)
+        try:
+            output = base64.b64decode(data)
+        except Exception as e:
+            raise ValueError(f"Invalid Base64 input: {str(e)}")
+        yield output
@@ -1,6 +1,17 @@
 from pallas.tools.Tool import Tool
-from pallas.common import EXTENDED_ASCII_CHARSET, HEX_CHARSET
-from typing import Optional
+from pallas.common import EXTENDED_ASCII_CHARSET, HEX_CHARSET, HEX_TOKENS
+from pallas.common.codec_tables import decoding_table
+from pallas.tools.streaming import decode_tokens, stream_tokens
+from typing import Iterator, Optional
+
+_HEX_DIGITS = b'0123456789abcdefABCDEF'
+# Lowercase, uppercase and unpadded single-digit tokens
+_DECODE = {
+    **decoding_table(HEX_TOKENS),
+    **decoding_table([token.upper() for token in HEX_TOKENS]),
+    **decoding_table([f"{i:x}" for i in range(16)]),
+}
+_DECODE_BYTES = {token.encode(): ord(char) for token, char in _DECODE.items()}
 
 class HexDecoder(Tool):
     name = "hex_decoder"
@@ -13,12 +24,56 @@ class HexDecoder(Tool):
         """Convert hex representation back to ASCII text."""
         if not input_str:
             return ""
-        result = []
-        for hex_str in input_str.split(self.separator):
-            # Convert to lowercase for consistency
-            hex_str = hex_str.lower()
-            value = int(hex_str, 16)
-            if not 0 <= value <= 255:
-                raise ValueError(f"Hex value {hex_str} is not a valid extended ASCII code (must be 00-FF)")
-            result.append(chr(value))
-        return "".join(result)
\ No newline at end of file
+        sep = self._separator(input_separator)
+        if sep is not None and len(sep) == 1 and len(input_str) % 3 == 2:
+            count = len(input_str) // 3
+            if input_str.count(sep) == count and input_str[2::3] == sep * count:
+                try:
+                    decoded = bytes.fromhex(input_str.replace(sep, ''))
+                except ValueError:
+                    decoded = None
+                # fromhex skips whitespace, so only a full-length result means every token was two hex digits
+                if decoded is not None and len(decoded) == count + 1:
+                    return decoded.decode('latin1')
+
+        tokens = input_str.split(sep)
+        try:
+            return "".join(map(_DECODE.__getitem__, tokens))
+        except KeyError:
+            # Mixed-case, padded or out-of-range values: decode one by one for exact errors
+            pass
+        return "".join(map(self._decode_token, tokens))
+
+    def _decode_token(self, hex_str: str) -> str:
+        """Convert a single hex value back to its character."""
+        # Convert to lowercase for consistency
+        hex_str = hex_str.lower()
+        value = int(hex_str, 16)
+        if not 0 <= value <= 255:
+            raise ValueError(f"Hex value {hex_str} is not a valid extended ASCII code (must be 00-FF)")
+        return chr(value)
+
+    def _process_bytes(self, data: bytes, input_separator: Optional[str] = None) -> bytes:
+        """Convert hex representation back to latin-1 encoded text.
+
+        Input made of two-digit values joined by a single-character separator is decoded in one pass.
+        Anything else goes through _process, which accepts values of other widths and reports errors.
+        """
+        separator = self._separator(input_separator)
+        if separator is not None and len(separator) == 1 and len(data) % 3 == 2:
+            sep = separator.encode('latin1')
+            if data.count(sep) == len(data) // 3 and data[2::3] == sep * (len(data) // 3):
+                digits = data.replace(sep, b'')
+                if not digits.translate(None, _HEX_DIGITS):
+                    return bytes.fromhex(digits.decode('ascii'))
+        return super()._process_bytes(data, input_separator)
+
+    def _process_stream(self, chunks: Iterator[bytes], input_separator: Optional[str] = None) -> Iterator[bytes]:
+        """Decode the input token by token, carrying a token cut by a chunk boundary to the next chunk."""
+        sep = self._separator(input_separator)
+        if sep is None or len(sep) != 1 or ord(sep) > 255:
+            # Whitespace splitting and longer separators need the whole input
+            yield from super()._process_stream(chunks, input_separator)
+            return
+        for tokens in stream_tokens(chunks, sep.encode('latin1')):
+            yield decode_tokens(tokens, _DECODE_BYTES, self._decode_token)
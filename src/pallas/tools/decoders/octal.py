@@ -1,6 +1,11 @@
 from pallas.tools.Tool import Tool
-from pallas.common import EXTENDED_ASCII_CHARSET, OCTAL_CHARSET
-from typing import Optional
+from pallas.common import EXTENDED_ASCII_CHARSET, OCTAL_CHARSET, OCTAL_TOKENS
+from pallas.common.codec_tables import decoding_table, decoding_table_bytes
+from pallas.tools.streaming import decode_tokens, stream_tokens
+from typing import Iterator, Optional
+
+_DECODE = decoding_table(OCTAL_TOKENS)
+_DECODE_BYTES = decoding_table_bytes(OCTAL_TOKENS)
 
 class OctalDecoder(Tool):
     name = "octal_decoder"
@@ -13,10 +18,37 @@ class OctalDecoder(Tool):
         """Convert octal representation back to ASCII text."""
         if not input_str:
             return ""
-        result = []
-        for oct_str in input_str.split(self.separator):
-            value = int(oct_str, 8)
-            if not 0 <= value <= 255:
-                raise ValueError(f"Octal value {oct_str} is not a valid extended ASCII code (must be 000-377)")
-            result.append(chr(value))
-        return "".join(result)
\ No newline at end of file
+        tokens = input_str.split(self._separator(input_separator))
+        try:
+            return "".join(map(_DECODE.__getitem__, tokens))
+        except KeyError:
+            # Padded or out-of-range values: decode one by one for exact errors
+            pass
+        return "".join(map(self._decode_token, tokens))
+
+    def _decode_token(self, oct_str: str) -> str:
+        """Convert a single octal value back to its character."""
+        value = int(oct_str, 8)
+        if not 0 <= value <= 255:
+            raise ValueError(f"Octal value {oct_str} is not a valid extended ASCII code (must be 000-377)")
+        return chr(value)
+
+    def _process_bytes(self, data: bytes, input_separator: Optional[str] = None) -> bytes:
+        """Convert octal representation back to latin-1 encoded text."""
+        sep = self._separator(input_separator)
+        if data and sep and sep.isascii():
+            try:
+                return bytes(map(_DECODE_BYTES.__getitem__, data.split(sep.encode())))
+            except KeyError:
+                pass
+        return super()._process_bytes(data, input_separator)
+
+    def _process_stream(self, chunks: Iterator[bytes], input_separator: Optional[str] = None) -> Iterator[bytes]:
+        """Decode the input token by token, carrying a token cut by a chunk boundary to the next chunk."""
+        sep = self._separator(input_separator)
+        if sep is None or len(sep) != 1 or ord(sep) > 255:
+            # Whitespace splitting and longer separators need the whole input
+            yield from super()._process_stream(chunks, input_separator)
+            return
+        for tokens in stream_tokens(chunks, sep.encode('latin1')):
+            yield decode_tokens(tokens, _DECODE_BYTES, self._decode_token)
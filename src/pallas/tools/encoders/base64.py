@@ -1,7 +1,7 @@
 from pallas.tools.Tool import Tool
-from pallas.common import EXTENDED_ASCII_CHARSET, BASE64_CHARSET
+from pallas.common import ASCII_CHARSET, EXTENDED_ASCII_CHARSET, BASE64_CHARSET
 import base64
-from typing import Optional
+from typing import Iterator, Optional
 
 class Base64Encoder(Tool):
     """Converts ASCII text to Base64 encoding."""
@@ -10,10 +10,36 @@ class Base64Encoder(Tool):
     description = "Converts ASCII text to Base64 encoding"
     domain_chars = EXTENDED_ASCII_CHARSET
     range_chars = BASE64_CHARSET
+    exact_range = True
+    inverse = "base64_decoder"
+    # Other characters are encoded as UTF-8 but decoded as latin-1
+    inverse_chars = ASCII_CHARSET
     separator = None  # Base64 doesn't use separators
 
     def _process(self, input_str: str, input_separator: Optional[str] = None) -> tuple[str, Optional[str]]:
         """Convert ASCII text to Base64 encoding."""
         if not input_str:
             return ""
-        return base64.b64encode(input_str.encode()).decode()
\ No newline at end of file
+        return base64.b64encode(input_str.encode()).decode()
+
+    def _process_bytes(self, data: bytes, input_separator: Optional[str] = None) -> bytes:
+        """Convert latin-1 encoded text to Base64 encoding."""
+        if not data.isascii():
+            # The str path encodes characters above 0x7F as UTF-8
+            data = data.decode('latin1').encode()
+        return base64.b64encode(data)
+
+    def _process_stream(self, chunks: Iterator[bytes], input_separator: Optional[str] = None) -> Iterator[bytes]:
+        """Encode the input in runs of whole 3-byte groups, carrying the remainder to the next chunk."""
+        carry = b""
+        for chunk in chunks:
+            if not chunk.isascii():
+                # Latin-1 codes are single bytes, so UTF-8 encoding each chunk matches encoding the whole input
+                chunk = chunk.decode('latin1').encode()
+            data = carry + chunk
+            end = len(data) - len(data) % 3
+            carry = data[end:]
+            if end:
+                yield base64.b64encode(data[:end])
+        if carry:
+            yield base64.b64encode(carry)
@@ -1,16 +1,45 @@
 from pallas.tools.Tool import Tool
-from pallas.common import EXTENDED_ASCII_CHARSET, HEX_CHARSET
-from typing import Optional
+from pallas.common import EXTENDED_ASCII_CHARSET, HEX_CHARSET, HEX_TOKENS
+from pallas.tools.streaming import stream_joined
+from typing import Iterator, Optional
 
 class HexEncoder(Tool):
     name = "hex_encoder"
     description = "Converts ASCII text to hexadecimal representation"
     domain_chars = EXTENDED_ASCII_CHARSET
     range_chars = HEX_CHARSET
+    exact_range = True
+    inverse = "hex_decoder"
+    token_map = True
     separator = " "  # Default separator is space
 
     def _process(self, input_str: str, input_separator: Optional[str] = None) -> tuple[str, Optional[str]]:
         """Convert input string to hex representation."""
         if not input_str:
             return ""
-        return self.separator.join(hex(ord(c))[2:].zfill(2) for c in input_str)
\ No newline at end of file
+        sep = self._separator(input_separator)
+        try:
+            codes = input_str.encode('latin1')
+        except UnicodeEncodeError:
+            # Characters above U+00FF have no table entry
+            return sep.join(hex(ord(c))[2:].zfill(2) for c in input_str)
+        if sep is not None and len(sep) == 1 and sep.isascii():
+            return codes.hex(sep)
+        return sep.join(map(HEX_TOKENS.__getitem__, codes))
+
+    def _process_bytes(self, data: bytes, input_separator: Optional[str] = None) -> bytes:
+        """Convert latin-1 encoded text to hex representation."""
+        sep = self._separator(input_separator)
+        if sep is None or len(sep) != 1 or not sep.isascii():
+            return super()._process_bytes(data, input_separator)
+        return data.hex(sep).encode()
+
+    def _process_stream(self, chunks: Iterator[bytes], input_separator: Optional[str] = None) -> Iterator[bytes]:
+        """Encode the input piece by piece, joining the pieces with the separator."""
+        try:
+            separator = self._separator(input_separator).encode('latin1')
+        except (AttributeError, UnicodeEncodeError):
+            # No separator, or one the bytes path cannot emit: fail as run_bytes does
+            yield from super()._process_stream(chunks, input_separator)
+            return
+        yield from stream_joined(chunks, lambda piece: self._process_bytes(piece, input_separator), separator)
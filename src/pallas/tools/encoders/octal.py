@@ -1,6 +1,9 @@
 from pallas.tools.Tool import Tool
-from pallas.common import EXTENDED_ASCII_CHARSET, OCTAL_CHARSET
-from typing import Optional
+from pallas.common import EXTENDED_ASCII_CHARSET, OCTAL_CHARSET, OCTAL_TOKENS
+from pallas.tools.streaming import stream_joined
+from typing import Iterator, Optional
+
+_TOKEN_BYTES = [token.encode() for token in OCTAL_TOKENS]
 
 class OctalEncoder(Tool):
     """Converts ASCII text to octal representation."""
@@ -9,10 +12,36 @@ class OctalEncoder(Tool):
     description = "Converts ASCII text to octal representation"
     domain_chars = EXTENDED_ASCII_CHARSET
     range_chars = OCTAL_CHARSET
+    exact_range = True
+    inverse = "octal_decoder"
+    token_map = True
     separator = " "  # Default separator
 
     def _process(self, input_str: str, input_separator: Optional[str] = None) -> tuple[str, Optional[str]]:
         """Convert ASCII text to octal representation."""
         if not input_str:
             return ""
-        return self.separator.join(f"{ord(c):o}" for c in input_str)
\ No newline at end of file
+        sep = self._separator(input_separator)
+        try:
+            codes = input_str.encode('latin1')
+        except UnicodeEncodeError:
+            # Characters above U+00FF have no table entry
+            return sep.join(f"{ord(c):o}" for c in input_str)
+        return sep.join(map(OCTAL_TOKENS.__getitem__, codes))
+
+    def _process_bytes(self, data: bytes, input_separator: Optional[str] = None) -> bytes:
+        """Convert latin-1 encoded text to octal representation."""
+        sep = self._separator(input_separator)
+        if sep is None or not sep.isascii():
+            return super()._process_bytes(data, input_separator)
+        return sep.encode().join(map(_TOKEN_BYTES.__getitem__, data))
+
+    def _process_stream(self, chunks: Iterator[bytes], input_separator: Optional[str] = None) -> Iterator[bytes]:
+        """Encode the input piece by piece, joining the pieces with the separator."""
+        try:
+            separator = self._separator(input_separator).encode('latin1')
+        except (AttributeError, UnicodeEncodeError):
+            # No separator, or one the bytes path cannot emit: fail as run_bytes does
+            yield from super()._process_stream(chunks, input_separator)
+            return
+        yield from stream_joined(chunks, lambda piece: self._process_bytes(piece, input_separator), separator)
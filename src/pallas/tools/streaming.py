@@ -0,0 +1,96 @@
+import tempfile
+from typing import Callable, Dict, Iterable, Iterator, List
+
+# Size of the input slices fed into a streaming chain and of the blocks read back from spill files
+CHUNK_SIZE = 1 << 16
+# Spooled buffers move from memory to a temporary file beyond this size
+SPOOL_SIZE = 1 << 23
+
+def iter_chunks(data, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Slice a buffer into chunks.
+
+    Args:
+        data: The latin-1 encoded input, as bytes or any sliceable buffer such as an mmap.
+        chunk_size: Size of each chunk, in bytes.
+
+    Yields:
+        bytes: Consecutive slices of the buffer.
+    """
+    for start in range(0, len(data), chunk_size):
+        yield bytes(data[start:start + chunk_size])
+
+def spool() -> tempfile.SpooledTemporaryFile:
+    """Create a binary buffer that spills to a temporary file once it outgrows SPOOL_SIZE."""
+    return tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE)
+
+def stream_joined(chunks: Iterable[bytes], process: Callable[[bytes], bytes], separator: bytes,
+                  piece_size: int = CHUNK_SIZE // 4) -> Iterator[bytes]:
+    """Stream an encoder that maps every input code to a token and joins the tokens with a separator.
+
+    The output of such an encoder for a split input is the outputs of the parts joined by the
+    separator, so the input is processed in pieces of `piece_size` bytes, which keeps the output
+    chunks bounded however much the encoding grows the text.
+
+    Args:
+        chunks: The latin-1 encoded input chunks.
+        process: Encodes one piece.
+        separator: The encoded token separator.
+        piece_size: Size of the pieces passed to `process`, in bytes.
+
+    Yields:
+        bytes: The encoded output.
+    """
+    first = True
+    for chunk in chunks:
+        for start in range(0, len(chunk), piece_size):
+            output = process(chunk[start:start + piece_size])
+            yield output if first else separator + output
+            first = False
+
+def stream_tokens(chunks: Iterable[bytes], separator: bytes) -> Iterator[List[bytes]]:
+    """Split a chunked input on a separator without holding more than one token across chunks.
+
+    The tokens are exactly those of splitting the joined input: a token cut by a chunk boundary is
+    carried over to the next chunk, and the last token is yielded on its own, even if empty, once
+    the input ends. Nothing is yielded for an empty input.
+
+    Args:
+        chunks: The latin-1 encoded input chunks.
+        separator: A single-byte separator.
+
+    Yields:
+        List[bytes]: The complete tokens found so far, in input order.
+    """
+    carry: List[bytes] = []
+    seen = False
+    for chunk in chunks:
+        seen = True
+        if separator not in chunk:
+            # Joined only once the token ends, so a long token is not copied once per chunk
+            carry.append(chunk)
+            continue
+        tokens = chunk.split(separator)
+        if carry:
+            carry.append(tokens[0])
+            tokens[0] = b"".join(carry)
+        carry = [tokens.pop()]
+        yield tokens
+    if seen:
+        yield [b"".join(carry)]
+
+def decode_tokens(tokens: List[bytes], table: Dict[bytes, int], decode_token: Callable[[str], str]) -> bytes:
+    """Decode a list of tokens to latin-1 encoded text.
+
+    Args:
+        tokens: The encoded tokens.
+        table: Maps every regular token to its code.
+        decode_token: Decodes a single token given as text, raising on invalid values.
+
+    Returns:
+        bytes: The decoded text.
+    """
+    try:
+        return bytes(map(table.__getitem__, tokens))
+    except KeyError:
+        # Irregular or invalid tokens: decode one by one for exact errors
+        return "".join(decode_token(token.decode('latin1')) for token in tokens).encode('latin1')
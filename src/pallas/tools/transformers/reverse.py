@@ -1,13 +1,34 @@
 from pallas.tools.Tool import Tool
 from pallas.common import EXTENDED_ASCII_CHARSET
-from typing import Optional
+from pallas.tools.streaming import CHUNK_SIZE, spool
+from typing import Iterator, Optional
 
 class Reverse(Tool):
     name = "reverse"
     description = "Reverses the input string"
     domain_chars = EXTENDED_ASCII_CHARSET
     range_chars = EXTENDED_ASCII_CHARSET
+    inverse = "reverse"
     separator = None
 
     def _process(self, input_str: str, input_separator: Optional[str] = None) -> tuple[str, Optional[str]]:
-        return input_str[::-1]
\ No newline at end of file
+        return input_str[::-1]
+
+    def _process_bytes(self, data: bytes, input_separator: Optional[str] = None) -> bytes:
+        return data[::-1]
+
+    def _process_stream(self, chunks: Iterator[bytes], input_separator: Optional[str] = None) -> Iterator[bytes]:
+        """Spill the input to a temporary file and read it back from the end in blocks."""
+        with spool() as buffer:
+            for chunk in chunks:
+                buffer.write(chunk)
+            end = buffer.tell()
+            while end > 0:
+                start = max(0, end - CHUNK_SIZE)
+                buffer.seek(start)
+                yield buffer.read(end - start)[::-1]
+                end = start
+
+    def output_mask(self, input_mask: Optional[int] = None, input_separator: Optional[str] = None) -> Optional[int]:
+        """Reversing keeps the characters of the input."""
+        return input_mask
@@ -0,0 +1,158 @@
+import mmap
+import struct
+from itertools import islice
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Optional
+
+# Binary toolchain files start with this magic, followed by the header struct, the tool
+# name table and then one fixed-width record of tool indices per chain.
+BINARY_MAGIC = b'PALLASCH'
+BINARY_VERSION = 1
+HEADER_STRUCT = struct.Struct('<BBHH')  # version, index width, chain length, tool count
+NAME_LENGTH_STRUCT = struct.Struct('<H')
+
+def write_binary_header(f: BinaryIO, tool_names: List[str], chain_length: int) -> None:
+    """Write the header of a binary toolchain file.
+
+    Args:
+        f: File opened in binary write mode.
+        tool_names: Names of the tools, indexed the same way as the records.
+        chain_length: Number of tools in every chain of the file.
+    """
+    if len(tool_names) > 256:
+        raise ValueError(f"Binary toolchain files hold at most 256 tools, got {len(tool_names)}")
+    f.write(BINARY_MAGIC)
+    f.write(HEADER_STRUCT.pack(BINARY_VERSION, 1, chain_length, len(tool_names)))
+    for name in tool_names:
+        encoded = name.encode()
+        f.write(NAME_LENGTH_STRUCT.pack(len(encoded)))
+        f.write(encoded)
+
+def encode_record(chain: List[int]) -> bytes:
+    """Encode a chain of tool indices as a binary record.
+
+    Args:
+        chain: Indices of the tools in the chain.
+
+    Returns:
+        bytes: One byte per tool index.
+    """
+    return bytes(chain)
+
+def is_binary_chain_file(path: Path) -> bool:
+    """Check whether a toolchain file uses the binary format.
+
+    Args:
+        path: Path of the toolchain file.
+
+    Returns:
+        bool: True if the file starts with the binary magic.
+    """
+    with open(path, 'rb') as f:
+        return f.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+
+class BinaryChainReader:
+    """Random-access reader for binary toolchain files backed by mmap.
+
+    Records have a fixed width, so any chain index is found with a single offset computation
+    and no part of the file is parsed before it is needed.
+    """
+
+    def __init__(self, path: Path):
+        """Map a binary toolchain file and parse its header.
+
+        Args:
+            path: Path of the binary toolchain file.
+        """
+        self._file = open(path, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # An empty file cannot be mapped
+            self._file.close()
+            raise ValueError(f"{path} is not a binary toolchain file") from None
+        except OSError:
+            self._file.close()
+            raise
+
+        if self._mmap[:len(BINARY_MAGIC)] != BINARY_MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a binary toolchain file")
+
+        offset = len(BINARY_MAGIC)
+        version, index_width, self.chain_length, tool_count = HEADER_STRUCT.unpack_from(self._mmap, offset)
+        if version != BINARY_VERSION or index_width != 1:
+            self.close()
+            raise ValueError(f"Unsupported binary toolchain file version {version} with index width {index_width}")
+        offset += HEADER_STRUCT.size
+
+        self.tool_names: List[str] = []
+        for _ in range(tool_count):
+            (name_length,) = NAME_LENGTH_STRUCT.unpack_from(self._mmap, offset)
+            offset += NAME_LENGTH_STRUCT.size
+            self.tool_names.append(self._mmap[offset:offset + name_length].decode())
+            offset += name_length
+        self.records_offset = offset
+
+    def __len__(self) -> int:
+        if self.chain_length == 0:
+            return 0
+        return (len(self._mmap) - self.records_offset) // self.chain_length
+
+    def __getitem__(self, index: int) -> List[str]:
+        """Get the chain at an index as a list of tool names."""
+        if not 0 <= index < len(self):
+            raise IndexError(f"Chain index {index} out of range")
+        start = self.records_offset + index * self.chain_length
+        return [self.tool_names[i] for i in self._mmap[start:start + self.chain_length]]
+
+    def iter_chains(self, start: int = 0, stop: Optional[int] = None) -> Iterator[List[str]]:
+        """Yield the chains in a record range as lists of tool names.
+
+        Args:
+            start: Index of the first chain.
+            stop: Index after the last chain. If None, reads to the end of the file.
+
+        Yields:
+            List[str]: The tool names of each chain.
+        """
+        stop = len(self) if stop is None else min(stop, len(self))
+        names = self.tool_names
+        width = self.chain_length
+        for offset in range(self.records_offset + start * width, self.records_offset + stop * width, width):
+            yield [names[i] for i in self._mmap[offset:offset + width]]
+
+    def close(self) -> None:
+        """Unmap and close the file."""
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self) -> 'BinaryChainReader':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+def iter_chain_file(path: Path, start: int = 0, stop: Optional[int] = None) -> Iterator[List[str]]:
+    """Yield the chains of a toolchain file, detecting its format.
+
+    Binary files seek straight to `start`. Text files are read line by line, skipping blank
+    lines and `#` comments.
+
+    Args:
+        path: Path of the toolchain file.
+        start: Index of the first chain.
+        stop: Index after the last chain. If None, reads to the end of the file.
+
+    Yields:
+        List[str]: The tool names of each chain.
+    """
+    if is_binary_chain_file(path):
+        with BinaryChainReader(path) as reader:
+            yield from reader.iter_chains(start, stop)
+        return
+
+    with open(path) as f:
+        lines = (line.strip() for line in f)
+        chains = ([tool.strip() for tool in line.split('->')] for line in lines if line and not line.startswith('#'))
+        yield from islice(chains, start, stop)
@@ -0,0 +1,41 @@
+import mmap
+import shutil
+import sys
+import tempfile
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, Union
+
+STDIN_PATH = '-'
+
+@contextmanager
+def open_input_file(path: str) -> Iterator[Union[mmap.mmap, bytes]]:
+    """Map an input file into memory for the duration of the context.
+
+    The bytes of the file are the input codes, read as latin-1 text. Standard input, given as
+    '-', is spooled to a temporary file first so pipelines get a mapping as well.
+
+    Args:
+        path: Path of the input file, or '-' for standard input.
+
+    Yields:
+        Union[mmap.mmap, bytes]: A read-only mapping of the file, or b"" for an empty file, which cannot be mapped.
+    """
+    if path == STDIN_PATH:
+        with tempfile.TemporaryFile() as f:
+            shutil.copyfileobj(sys.stdin.buffer, f)
+            f.flush()
+            with _map(f) as data:
+                yield data
+    else:
+        with open(path, 'rb') as f, _map(f) as data:
+            yield data
+
+@contextmanager
+def _map(f: BinaryIO) -> Iterator[Union[mmap.mmap, bytes]]:
+    """Map an open file read-only, closing the mapping on exit."""
+    f.seek(0, 2)
+    if f.tell() == 0:
+        yield b""
+        return
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        yield data
@@ -1,11 +1,66 @@
+import atexit
 import logging
 import os
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional
+
+# Level of the per-step messages, below DEBUG so they are only written when asked for
+TRACE = 5
+logging.addLevelName(TRACE, 'TRACE')
+
+class _Listener(QueueListener):
+    """Queue listener whose thread starts with the first record and can be paused around forks."""
+
+    def __init__(self, records: queue.SimpleQueue, *handlers: logging.Handler):
+        super().__init__(records, *handlers, respect_handler_level=True)
+        self._lock = threading.Lock()
+        self.thread: Optional[threading.Thread] = None
+
+    def ensure_started(self) -> None:
+        if self.thread is None:
+            with self._lock:
+                if self.thread is None:
+                    self.start()
+                    self.thread = self._thread
+
+    def stop(self) -> None:
+        with self._lock:
+            if self.thread is not None:
+                super().stop()
+                self.thread = None
+
+class _DeferredQueueHandler(QueueHandler):
+    """Queue handler that leaves formatting to the listener thread.
+
+    The stock QueueHandler formats every record in the logging thread before queueing it. Records
+    are queued as they are instead, so their arguments must not be mutated after logging.
+    """
+
+    def __init__(self, records: queue.SimpleQueue, listener: _Listener):
+        super().__init__(records)
+        self.listener = listener
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        self.listener.ensure_started()
+        super().enqueue(record)
+
+# Listener writing each configured logger's records, keyed by logger name
+_listeners: Dict[str, _Listener] = {}
 
 def setup_logger(name: str, log_level: int = logging.INFO, log_to_console: bool = False, run_id: Optional[str] = None) -> logging.Logger:
     """Set up a logger with file and optional console handlers.
 
+    The logger only puts records on a queue; a listener thread, started with the first record,
+    formats them and writes them to the handlers, so logging costs the caller little even when
+    the output is slow. Setting up a logger again stops its previous listener and closes its
+    handlers.
+
     Args:
         name: Name of the logger (typically __name__ of the module)
         log_level: Logging level (default: INFO)
@@ -23,43 +78,81 @@ def setup_logger(name: str, log_level: int = logging.INFO, log_to_console: bool
     logger = logging.getLogger(name)
     logger.setLevel(log_level)
 
-    # Remove existing handlers to avoid duplicates
-    logger.handlers = []
+    # Remove existing handlers to avoid duplicates, closing their files
+    close_logger(name)
 
-    # Create file handler with optional run_id in filename
+    # Create file handler with optional run_id in filename, opened on the first record
     base_filename = name.replace('.', '_')
     filename = f"{base_filename}_{run_id}.log" if run_id else f"{base_filename}.log"
     log_file = log_dir / filename
-    file_handler = logging.FileHandler(log_file)
+    file_handler = logging.FileHandler(log_file, delay=True)
     file_handler.setLevel(log_level)
 
+    # Create formatter and add it to the file handler
+    file_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    file_handler.setFormatter(file_formatter)
+    handlers = [file_handler]
+
     # Create console handler if requested
     if log_to_console:
         console_handler = logging.StreamHandler()
         console_handler.setLevel(log_level)
         console_formatter = logging.Formatter('%(message)s')
         console_handler.setFormatter(console_formatter)
-        logger.addHandler(console_handler)
-
-    # Create formatter and add it to the file handler
-    file_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    file_handler.setFormatter(file_formatter)
+        handlers.append(console_handler)
 
-    # Add the handlers to the logger
-    logger.addHandler(file_handler)
+    # Route the records through a queue to a listener thread writing to the handlers
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    listener = _Listener(records, *handlers)
+    _listeners[name] = listener
+    logger.addHandler(_DeferredQueueHandler(records, listener))
 
     return logger
 
-def get_logger(name: str, verbose: bool = False, run_id: Optional[str] = None) -> logging.Logger:
+def close_logger(name: str) -> None:
+    """Flush and close the handlers of a logger set up by setup_logger.
+
+    Args:
+        name: Name of the logger
+    """
+    logger = logging.getLogger(name)
+    listener = _listeners.pop(name, None)
+    if listener is not None:
+        # Stopping drains the queue before the handlers are closed
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+    for handler in logger.handlers:
+        handler.close()
+    logger.handlers = []
+
+def shutdown() -> None:
+    """Flush and close every logger set up by setup_logger."""
+    for name in list(_listeners):
+        close_logger(name)
+
+atexit.register(shutdown)
+
+def _stop_listeners() -> None:
+    for listener in _listeners.values():
+        listener.stop()
+
+# Forking while a listener thread holds a handler lock could deadlock the child, so the listeners
+# drain and stop before each fork; both processes start them again with their next record
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(before=_stop_listeners)
+
+def get_logger(name: str, verbose: bool = False, run_id: Optional[str] = None, trace: bool = False) -> logging.Logger:
     """Get a configured logger instance.
 
     Args:
         name: Name of the logger (typically __name__ of the module)
         verbose: Whether to enable verbose console output (default: False)
         run_id: Optional UUID to include in the log filename
+        trace: Whether to write the per-step TRACE messages (default: False)
 
     Returns:
         logging.Logger: Configured logger instance
     """
-    log_level = logging.DEBUG if verbose else logging.INFO
-    return setup_logger(name, log_level, verbose, run_id)
\ No newline at end of file
+    log_level = TRACE if trace else logging.DEBUG if verbose else logging.INFO
+    return setup_logger(name, log_level, verbose, run_id)
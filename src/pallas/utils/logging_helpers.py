@@ -1,29 +1,63 @@
 import logging
-from typing import Optional
-from pallas.utils.logging_config import get_logger
+from typing import Any, Optional
+from pallas.utils.logging_config import TRACE, get_logger
+
+# Characters of a payload written by trace before it is cut
+TRACE_LIMIT = 200
+
+class Truncated:
+    """A payload rendered with at most `limit` characters, formatted only if its message is written."""
+
+    __slots__ = ('value', 'limit')
+
+    def __init__(self, value: Any, limit: int = TRACE_LIMIT):
+        self.value = value
+        self.limit = limit
+
+    def __str__(self) -> str:
+        value = self.value
+        if isinstance(value, bytes):
+            # Bytes mode payloads are latin-1 text, shown like their str mode counterparts
+            head = value[:self.limit].decode('latin1')
+        else:
+            value = str(value)
+            head = value[:self.limit]
+        if len(value) <= self.limit:
+            return head
+        return f"{head}... ({len(value)} chars)"
 
 class LoggingHelper:
-    """Helper class for logging functionality."""
+    """Helper class for logging functionality.
 
-    def __init__(self, name: str, verbose: bool = False, run_id: Optional[str] = None):
+    Messages take %-style arguments, which are only formatted for records the logger's level lets
+    through, on the logging thread. Per-step messages go through trace, which is off unless
+    enabled and cuts long payloads.
+    """
+
+    def __init__(self, name: str, verbose: bool = False, run_id: Optional[str] = None, trace: bool = False,
+                 trace_limit: int = TRACE_LIMIT):
         """Initialize the logging helper.
 
         Args:
             name: Name of the logger (typically __name__ of the module)
             verbose: Whether to enable verbose logging
             run_id: Optional UUID to include in the log filename
+            trace: Whether to write the per-step trace messages
+            trace_limit: Characters of each payload trace writes
         """
-        self.logger = get_logger(name, verbose, run_id)
+        self.logger = get_logger(name, verbose, run_id, trace)
+        self.trace_limit = trace_limit
 
-    def log(self, message: str, level: str = 'info') -> None:
+    def log(self, message: str, *args: Any, level: str = 'info') -> None:
         """Log a message with the specified level.
 
         Args:
-            message: The message to log
+            message: The message to log, formatted with args
+            args: Arguments of the message
             level: The logging level ('debug', 'info', 'warning', 'error', 'critical')
         """
         log_func = getattr(self.logger, level.lower())
-        log_func(message)
+        log_func(message, *args)
 
     def log_error(self, message: str, error: Optional[Exception] = None) -> None:
         """Log an error message with optional exception details.
@@ -33,6 +67,21 @@ class LoggingHelper:
             error: Optional exception to include in the log
         """
         if error:
-            self.log(f"{message}: {str(error)}", 'error')
+            self.log("%s: %s", message, error, level='error')
         else:
-            self.log(message, 'error')
\ No newline at end of file
+            self.log(message, level='error')
+
+    def trace_enabled(self) -> bool:
+        """Check whether trace messages are written, to skip building their arguments."""
+        return self.logger.isEnabledFor(TRACE)
+
+    def trace(self, message: str, *args: Any) -> None:
+        """Log a per-step message at TRACE level, cutting str and bytes arguments to the trace limit.
+
+        Args:
+            message: The message to log, formatted with args
+            args: Arguments of the message
+        """
+        if self.logger.isEnabledFor(TRACE):
+            self.logger.log(TRACE, message, *(Truncated(arg, self.trace_limit) if isinstance(arg, (str, bytes)) else arg
+                                              for arg in args))
@@ -1,25 +1,38 @@
+from math import perm
 from typing import List
 
 def calculate_max_tree_size(tools: List[str], max_tree_size: int) -> int:
         """
         Calculate the theoretical maximum number of nodes in a complete tree.
-        For a chain of length L with N tools:
+        A tool appears at most once in a chain, so for a chain of length L with N tools:
         - Level 1: N nodes (all tools as starting points)
-        - Level 2: N * N nodes (each tool can connect to any tool, including itself)
-        - Level 3: N * N * N nodes
-        - And so on...
-        Total = N + N² + N³ + ... + N^L
-        This is a geometric series with first term a=N and ratio r=N
-        Sum = N(1 - N^L)/(1 - N)
+        - Level 2: N * (N - 1) nodes (each tool can connect to any tool not used yet)
+        - Level 3: N * (N - 1) * (N - 2) nodes
+        - And so on, until no tools are left...
+        Total = P(N, 1) + P(N, 2) + ... + P(N, L), where P(N, k) = N! / (N - k)!
         """
         n = len(tools)
-        if n == 0:
-            return 0
-        if n == 1:
-            return max_tree_size
+        return sum(perm(n, level) for level in range(1, min(max_tree_size, n) + 1))
 
-        # For a tree of depth L where each node has N children:
-        # Total nodes = N + N² + N³ + ... + N^L
-        # This is a geometric series with first term a=N and ratio r=N
-        # Sum = N(1 - N^L)/(1 - N)
-        return int(n * (1 - n**max_tree_size) / (1 - n))
\ No newline at end of file
+def calculate_subtree_sizes(tool_count: int, max_tree_size: int) -> List[int]:
+        """
+        Calculate the number of nodes cut from the complete tree by pruning a node at each depth.
+        A node appended to a chain of d tools has N - d - 1 tools left to extend it with, so its
+        subtree, the node included, holds P(N - d - 1, 0) + P(N - d - 1, 1) + ... nodes down to
+        level L.
+
+        Args:
+            tool_count: Number of tools N chains are built from.
+            max_tree_size: Length L of the chains.
+
+        Returns:
+            List[int]: Entry d is the size of the subtree of a node appended to a chain of d tools.
+        """
+        sizes = []
+        for depth in range(max_tree_size):
+            remaining = tool_count - depth - 1
+            if remaining < 0:
+                sizes.append(0)
+            else:
+                sizes.append(sum(perm(remaining, level) for level in range(min(max_tree_size - depth - 1, remaining) + 1)))
+        return sizes
@@ -10,6 +10,11 @@ def test_coverage(ctx):
     """Run tests with coverage"""
     ctx.run("pytest --cov=pallas --cov-report=term-missing --cov-report=html")
 
+@task
+def bench(ctx, quick=False):
+    """Run the benchmark suite"""
+    ctx.run(f"python -m pallas.main bench run{' --quick' if quick else ''}")
+
 @task
 def clean(ctx):
     """Clean up build artifacts and cache"""
@@ -0,0 +1,44 @@
+import random
+import pytest
+from pallas.benchmarks.compare import (IMPROVEMENT, REGRESSION, UNCHANGED, compare_results, format_comparisons,
+                                       mann_whitney_u)
+
+def results(**samples):
+    return {'schema': 1, 'benchmarks': [{'name': name, 'samples': values} for name, values in samples.items()]}
+
+def test_mann_whitney_exact_p_value():
+    """Test the exact p-value of fully separated samples: 2 of the C(10, 5) arrangements are as extreme."""
+    u, p_value = mann_whitney_u([1, 2, 3, 4, 5], [6, 7, 8, 9, 10])
+    assert u == 25
+    assert p_value == pytest.approx(2 / 252)
+
+def test_mann_whitney_identical_samples():
+    """Test that identical samples, which are all ties, are not significant."""
+    assert mann_whitney_u([1.0, 2.0, 3.0], [1.0, 2.0, 3.0])[1] == 1.0
+    assert mann_whitney_u([1.0] * 5, [1.0] * 5)[1] == 1.0
+
+def test_mann_whitney_normal_approximation():
+    """Test that large shifted samples are significant and large same-distribution samples are not."""
+    rng = random.Random(0)
+    baseline = [rng.gauss(1.0, 0.05) for _ in range(40)]
+    assert mann_whitney_u(baseline, [rng.gauss(1.2, 0.05) for _ in range(40)])[1] < 1e-6
+    assert mann_whitney_u(baseline, [rng.gauss(1.0, 0.05) for _ in range(40)])[1] > 0.01
+
+def test_mann_whitney_rejects_empty_samples():
+    with pytest.raises(ValueError):
+        mann_whitney_u([], [1.0])
+
+def test_compare_results_verdicts():
+    """Test that only significant changes beyond the threshold get a verdict."""
+    baseline = results(slower=[1.0, 1.01, 1.02, 1.03, 1.04], faster=[1.0, 1.01, 1.02, 1.03, 1.04],
+                       noise=[1.0, 1.01, 1.02, 1.03, 1.04], small=[1.0, 1.001, 1.002, 1.003, 1.004],
+                       removed=[1.0, 1.0])
+    current = results(slower=[1.5, 1.51, 1.52, 1.53, 1.54], faster=[0.5, 0.51, 0.52, 0.53, 0.54],
+                      noise=[1.005, 1.015, 1.025, 1.035, 0.995], small=[1.01, 1.011, 1.012, 1.013, 1.014],
+                      added=[1.0, 1.0])
+    verdicts = {c['name']: c['verdict'] for c in compare_results(baseline, current, alpha=0.05, threshold=0.05)}
+    assert verdicts == {'slower': REGRESSION, 'faster': IMPROVEMENT, 'noise': UNCHANGED, 'small': UNCHANGED}
+
+def test_format_comparisons_counts_verdicts():
+    comparisons = compare_results(results(a=[1.0, 1.1, 1.2, 1.3]), results(a=[2.0, 2.1, 2.2, 2.3]))
+    assert format_comparisons(comparisons).splitlines()[-1] == "1 regressions, 0 improvements, 0 unchanged"
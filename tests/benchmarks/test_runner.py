@@ -0,0 +1,46 @@
+import json
+import pytest
+from pallas.benchmarks.cli import main
+from pallas.benchmarks.runner import SCHEMA_VERSION, load_results, run_benchmarks, save_results
+from pallas.benchmarks.suites import Benchmark
+
+def make_benchmark(name='noop'):
+    return Benchmark(name=name, group='micro', setup=lambda workdir: ((lambda: None), 10), item_unit='chars')
+
+def test_run_benchmarks_writes_results(tmp_path):
+    """Test that results hold the environment, samples, statistics and throughput, and round-trip as JSON."""
+    seen = []
+    results = run_benchmarks([make_benchmark()], repeat=3, min_time=0.001, progress=seen.append)
+
+    assert results['schema'] == SCHEMA_VERSION
+    assert results['environment']['python']
+    [result] = results['benchmarks']
+    assert seen == [result]
+    assert len(result['samples']) == 3
+    assert result['number'] >= 1
+    assert result['stats']['min'] <= result['stats']['median']
+    assert result['items'] == 10 and result['item_unit'] == 'chars'
+
+    path = tmp_path / 'bench.json'
+    save_results(results, path)
+    assert load_results(path) == json.loads(json.dumps(results))
+
+def test_load_results_rejects_other_files(tmp_path):
+    path = tmp_path / 'other.json'
+    path.write_text('{"benchmarks": []}')
+    with pytest.raises(ValueError):
+        load_results(path)
+
+def test_cli_run_and_compare(tmp_path, capsys):
+    """Test `pallas bench run` and `pallas bench compare`, which fails on a significant regression."""
+    baseline = tmp_path / 'baseline.json'
+    assert main(['run', '-k', 'micro/reverse/bytes/64', '--repeat', '4', '--min-time', '0', '-o', str(baseline)]) == 0
+    assert len(load_results(baseline)['benchmarks']) == 1
+
+    current = tmp_path / 'current.json'
+    slower = load_results(baseline)
+    slower['benchmarks'][0]['samples'] = [sample * 10 for sample in slower['benchmarks'][0]['samples']]
+    save_results(slower, current)
+    assert main(['compare', str(baseline), str(baseline)]) == 0
+    assert main(['compare', str(baseline), str(current)]) == 1
+    assert "1 regressions" in capsys.readouterr().out
@@ -0,0 +1,39 @@
+import pytest
+from pallas.benchmarks.suites import (GENERATION, MICRO, RUN, collect_benchmarks, rule_combinations, tool_input)
+from pallas.tools.tool_map import tools as tool_map
+from pallas.toolchain.rules.rule_map import rules as rule_map
+
+@pytest.mark.parametrize("name", list(tool_map))
+def test_tool_input_is_valid(name):
+    """Test that every tool accepts its benchmark input, decoders included."""
+    text = tool_input(name, 100)
+    output, error = tool_map[name]().execute(text)
+    assert error is None
+    assert len(text) >= 100
+
+def test_rule_combinations_cover_every_subset():
+    combos = rule_combinations()
+    assert len(combos) == 2 ** len(rule_map)
+    assert combos[0] == () and set(combos[-1]) == set(rule_map)
+
+def test_collect_benchmarks():
+    """Test that the full suite covers every tool, every length from 3 to 8 and every rule combination."""
+    benchmarks = collect_benchmarks()
+    names = [benchmark.name for benchmark in benchmarks]
+    assert len(names) == len(set(names))
+    assert {b.params['tool'] for b in benchmarks if b.group == MICRO} == set(tool_map)
+    generation = [b for b in benchmarks if b.group == GENERATION]
+    assert len(generation) == 6 * 2 ** len(rule_map)
+    assert {b.params['length'] for b in generation} == set(range(3, 9))
+    assert any(b.group == RUN for b in benchmarks)
+
+def test_collect_benchmarks_filters():
+    benchmarks = collect_benchmarks(quick=True, groups=[MICRO], pattern='reverse/str')
+    assert [b.name for b in benchmarks] == ['micro/reverse/str/64', 'micro/reverse/str/4096']
+
+def test_benchmark_setup_runs(tmp_path):
+    """Test that the quick macro-benchmarks set up and run, reporting the chains they handle."""
+    for benchmark in collect_benchmarks(quick=True, groups=[GENERATION, RUN], pattern='/3/'):
+        func, items = benchmark.setup(tmp_path)
+        func()
+        assert items > 0
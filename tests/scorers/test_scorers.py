@@ -0,0 +1,36 @@
+import pytest
+from pallas.scorers import CombinedScorer, NgramScorer, PrintableScorer, RegexScorer
+
+def test_printable_scorer():
+    """Test that the printable scorer returns the share of printable characters."""
+    scorer = PrintableScorer()
+    assert scorer.score("Hello") == 1.0
+    assert scorer.score("ab\x00\x01") == 0.5
+    assert scorer.score("") == 0.0
+
+def test_ngram_scorer_prefers_english():
+    """Test that English text outscores encoded and random text."""
+    scorer = NgramScorer()
+    english = scorer.score("Hello world, this is a test of the scorer")
+    assert english > 0.8
+    assert scorer.score("48 65 6c 6c 6f") < english
+    assert scorer.score("xqzj vkpw qqqq") < english
+    assert scorer.score("SGVsbG8gd29ybGQ=") < english
+    assert scorer.score("dd dd dd 53 e8 be f9 ea 7e b3 ed 3e cf") == 0.0
+
+@pytest.mark.parametrize("text", ["", "a", "1234 5678", "\x00\xff"])
+def test_ngram_scorer_without_bigrams(text):
+    """Test that text without letter bigrams scores zero."""
+    assert NgramScorer().score(text) == 0.0
+
+def test_regex_scorer():
+    """Test that the regex scorer matches anywhere in the text."""
+    scorer = RegexScorer(r"flag\{\w+\}")
+    assert scorer.score("the flag{abc} is here") == 1.0
+    assert scorer.score("no flag here") == 0.0
+
+def test_combined_scorer_weights():
+    """Test that the combined scorer takes the weighted average of its scorers."""
+    scorer = CombinedScorer([PrintableScorer(), RegexScorer("x")], weights=[3.0, 1.0])
+    assert scorer.score("abc") == pytest.approx(0.75)
+    assert scorer.score("abx") == pytest.approx(1.0)
@@ -1,3 +1,4 @@
+import itertools
 import pytest
 from pallas.toolchain.rules.BalancingEncoderDecoderRule import BalancingEncoderDecoderRule
 from pallas.toolchain.ChainContext import ChainContext
@@ -88,4 +89,24 @@ def test_odd_length_chain_with_diff_two_is_invalid(mock_tools):
     )
     error = BalancingEncoderDecoderRule.validate(context)
     assert isinstance(error, ChainRuleException)
-    assert "Even-length chains must have equal numbers of encoders and decoders" in error.message
\ No newline at end of file
+    assert "Even-length chains must have equal numbers of encoders and decoders" in error.message
+
+def test_incremental_check_matches_validate():
+    """Test that push/pop/check agrees with validate for every chain prefix."""
+    tools = [MockTool(name) for name in ('base64_encoder', 'hex_decoder', 'reverse', 'hex_encoder', 'octal_decoder')]
+    rule = BalancingEncoderDecoderRule()
+    rule.reset(tools, 4)
+    for length in range(4):
+        for chain in itertools.product(range(len(tools)), repeat=length):
+            for tool in chain:
+                rule.push(tool)
+            for next_tool in range(len(tools)):
+                context = ChainContext(current_chain=list(chain), next_tool=next_tool, target_length=4, tools=tools)
+                expected = BalancingEncoderDecoderRule.validate(context)
+                actual = rule.check(next_tool)
+                assert (actual is None) == (expected is None)
+                if expected is not None:
+                    assert actual.message == expected.message
+            for _ in chain:
+                rule.pop()
+            assert rule.encode_count == 0 and rule.decode_count == 0
@@ -55,4 +55,23 @@ def test_mock_chain_rule_failure():
     rule = MockChainRule()
     result = rule.validate(context)
     assert isinstance(result, ChainRuleException)
-    assert result.message == "Test error message"
\ No newline at end of file
+    assert result.message == "Test error message"
+
+class NoRepeatNeighbourRule(ChainRule):
+    """A pairwise rule rejecting a tool followed by its right-hand neighbour."""
+    pairwise = True
+
+    @staticmethod
+    def validate(chain_context: ChainContext) -> ChainRuleException | None:
+        if chain_context.current_chain and chain_context.next_tool == chain_context.current_chain[-1] + 1:
+            return ChainRuleException(chain_context, "neighbour")
+        return None
+
+def test_compile_non_pairwise_rule_returns_none():
+    """Test that rules that are not pairwise cannot be compiled."""
+    assert MockChainRule.compile(['a', 'b'], 3) is None
+
+def test_compile_pairwise_rule_builds_transition_table():
+    """Test that a pairwise rule compiles into one bitmask row per tool."""
+    table = NoRepeatNeighbourRule.compile(['a', 'b', 'c'], 3)
+    assert table == [0b101, 0b011, 0b111]
@@ -0,0 +1,75 @@
+import pickle
+from types import SimpleNamespace
+from pallas.toolchain.ChainContext import ChainContext
+from pallas.toolchain.rules.AlternatingRule import AlternatingRule
+from pallas.toolchain.rules.BalancingEncoderDecoderRule import BalancingEncoderDecoderRule
+from pallas.toolchain.rules.CharacterSetRule import CharacterSetRule
+from pallas.toolchain.rules.ChainRuleException import ChainRuleException
+from pallas.tools.tool_map import tools as tool_map
+
+class CountedTool:
+    """A tool stand-in that counts how often its name is read."""
+
+    def __init__(self, tool):
+        self.tool = tool
+        self.reads = 0
+
+    @property
+    def name(self):
+        self.reads += 1
+        return self.tool.name
+
+    def __getattr__(self, attribute):
+        return getattr(self.tool, attribute)
+
+def make_context(names, chain, next_tool):
+    tools = [CountedTool(tool_map[name]()) for name in names]
+    return ChainContext(current_chain=chain, next_tool=next_tool, target_length=4, tools=tools)
+
+def test_violation_is_structured_and_rendered_lazily():
+    """Test that a violation records the rule, reason and tool indices and formats nothing until read."""
+    context = make_context(['hex_encoder', 'base64_encoder'], [0], 1)
+    error = AlternatingRule.validate(context)
+    reads = [tool.reads for tool in context.tools]
+
+    assert error.rule is AlternatingRule and error.rule_id == 'AlternatingRule'
+    assert error.reason == 'encoder_after_encoder'
+    assert error.chain == (0,) and error.next_tool == 1
+    assert [tool.reads for tool in context.tools] == reads
+
+    assert str(error) == "Non-alternating chain: hex_encoder -> base64_encoder. Encoder must be followed by decoder"
+    assert error.message is error.message
+
+def test_violation_keeps_the_chain_it_was_made_for():
+    """Test that a violation's message does not change when the search mutates its chain afterwards."""
+    rule = BalancingEncoderDecoderRule()
+    rule.reset([tool_map[name]() for name in ('hex_encoder', 'base64_encoder', 'reverse')], 4)
+    rule.push(0)
+    error = rule.check(1)
+    rule.pop()
+    rule.push(2)
+
+    assert error.reason == 'unbalanced_even'
+    assert error.details == {'encoders': 2, 'decoders': 0}
+    assert error.message.endswith("for chain: hex_encoder and next tool: base64_encoder")
+
+def test_character_set_violation_message():
+    tools = [SimpleNamespace(name='letters', domain_chars={'a', 'b'}, range_chars={'b', 'a'}),
+             SimpleNamespace(name='digits', domain_chars={'1', '0'}, range_chars={'0', '1'})]
+    error = CharacterSetRule.validate(ChainContext(current_chain=[0], next_tool=1, target_length=2, tools=tools))
+    assert error.reason == 'charset_mismatch'
+    assert error.message == ("Character set mismatch: letters -> digits. "
+                             "Range chars (['a', 'b']) incompatible with domain chars (['0', '1'])")
+
+def test_violation_round_trips_through_pickle():
+    tools = [tool_map[name]() for name in ('hex_decoder', 'octal_decoder')]
+    error = AlternatingRule.validate(ChainContext(current_chain=[0], next_tool=1, target_length=2, tools=tools))
+    copy = pickle.loads(pickle.dumps(error))
+    assert (copy.rule, copy.reason, copy.chain, copy.next_tool) == (error.rule, error.reason, error.chain, error.next_tool)
+    assert copy.message == error.message
+
+def test_message_given_up_front():
+    context = ChainContext(current_chain=[], next_tool=0, target_length=1, tools=[tool_map['reverse']()])
+    error = ChainRuleException(context, "custom")
+    assert error.message == str(error) == "custom"
+    assert error.rule_id is None
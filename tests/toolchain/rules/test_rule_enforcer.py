@@ -86,20 +86,48 @@ def test_get_violation_rate_with_validations(mock_rules):
 def test_get_pruning_effectiveness_zero_nodes(mock_rules):
     """Test pruning effectiveness with zero nodes."""
     enforcer = RuleEnforcer(mock_rules)
-    result = enforcer.get_pruning_effectiveness(0, 0)
+    result = enforcer.get_pruning_effectiveness(0)
     assert result["pruning_rate"] == 0.0
+    assert result["pruned_nodes"] == 0
     assert result["rule_contribution"] == {"MockRule": 0.0}
 
-def test_get_pruning_effectiveness_with_violations(mock_rules):
-    """Test pruning effectiveness with violations."""
-    enforcer = RuleEnforcer(mock_rules)
-    enforcer.total_validations = 100
-    enforcer.total_violations = 40
-    enforcer.rule_stats["MockRule"] = 25
-    result = enforcer.get_pruning_effectiveness(1000, 600)
-    assert 0.0 <= result["pruning_rate"] <= 1.0
+def test_get_pruning_effectiveness_counts_pruned_subtrees():
+    """Test that each rejected candidate is credited with its whole subtree, per rule and depth."""
+    enforcer = RuleEnforcer([OddAfterEvenRule])
+    enforcer.compile(['t0', 't1', 't2', 't3'], 3)
+    # Each tool appended to a one-tool chain has two tools left, so it roots 1 + 2 nodes
+    assert enforcer.allowed_next(0, 0b1110, 1) == 0b0100
+    # A third tool has no level below it
+    assert enforcer.allowed_next(2, 0b1010, 2) == 0
+
+    result = enforcer.get_pruning_effectiveness(4 + 12 + 24)
+    assert result["pruned_nodes"] == 2 * 3 + 2 * 1
+    assert result["rule_pruned_nodes"] == {"OddAfterEvenRule": 8}
+    assert result["depth_pruned_nodes"] == [0, 6, 2]
+    assert result["pruning_rate"] == pytest.approx(8 / 40)
     assert sum(result["rule_contribution"].values()) == pytest.approx(result["pruning_rate"])
 
+def test_merge_stats_adds_depth_counters():
+    """Test that per-depth candidates, rejections and pruned nodes are merged from other enforcers."""
+    enforcer = RuleEnforcer([OddAfterEvenRule])
+    enforcer.compile(['t0', 't1', 't2', 't3'], 3)
+    enforcer.allowed_next(None, 0b1111, 0)
+    enforcer.allowed_next(0, 0b1110, 1)
+    assert enforcer.get_depth_stats() == {
+        'candidates': [4, 3, 0],
+        'rejections': {"OddAfterEvenRule": [0, 2, 0]},
+        'pruned_nodes': {"OddAfterEvenRule": [0, 6, 0]},
+    }
+
+    other = RuleEnforcer([OddAfterEvenRule])
+    other.merge_stats(enforcer.get_stats())
+    other.merge_stats(enforcer.get_stats())
+    assert other.get_depth_stats() == {
+        'candidates': [8, 6, 0],
+        'rejections': {"OddAfterEvenRule": [0, 4, 0]},
+        'pruned_nodes': {"OddAfterEvenRule": [0, 12, 0]},
+    }
+
 def test_format_stats(mock_rules):
     """Test formatting of statistics."""
     enforcer = RuleEnforcer(mock_rules)
@@ -110,4 +138,75 @@ def test_format_stats(mock_rules):
     assert "Rule Enforcement Statistics:" in stats
     assert "Total validations: 100" in stats
     assert "Total violations: 40" in stats
-    assert "MockRule: 25 violations" in stats
\ No newline at end of file
+    assert "MockRule: 25 violations" in stats
+
+class OddAfterEvenRule(ChainRule):
+    """A pairwise rule rejecting an odd tool after an even tool."""
+    __name__ = "OddAfterEvenRule"
+    pairwise = True
+
+    @staticmethod
+    def validate(chain_context: ChainContext) -> ChainRuleException | None:
+        if chain_context.current_chain and chain_context.current_chain[-1] % 2 == 0 and chain_context.next_tool % 2 == 1:
+            return ChainRuleException(chain_context, "odd after even")
+        return None
+
+def test_compile_splits_pairwise_and_dynamic_rules():
+    """Test that only pairwise rules are compiled."""
+    enforcer = RuleEnforcer([OddAfterEvenRule, MockRule])
+    enforcer.compile(['t0', 't1', 't2', 't3'], 3)
+    assert [rule for rule, _ in enforcer.compiled_rules] == [OddAfterEvenRule]
+    assert enforcer.dynamic_rules == [(MockRule, None)]
+
+def test_allowed_next_filters_candidates_and_records_stats():
+    """Test that allowed_next applies the transition table and counts rejections."""
+    enforcer = RuleEnforcer([OddAfterEvenRule])
+    enforcer.compile(['t0', 't1', 't2', 't3'], 3)
+    assert enforcer.allowed_next(None, 0b1111) == 0b1111
+    assert enforcer.allowed_next(0, 0b1110) == 0b0100
+    assert enforcer.total_validations == 7
+    assert enforcer.total_violations == 2
+    assert enforcer.rule_stats == {"OddAfterEvenRule": 2}
+
+class LengthCapRule(ChainRule):
+    """A stateful rule rejecting any candidate once two tools are in the chain."""
+    __name__ = "LengthCapRule"
+    stateful = True
+
+    @staticmethod
+    def validate(chain_context: ChainContext) -> ChainRuleException | None:
+        if len(chain_context.current_chain) >= 2:
+            return ChainRuleException(chain_context, "too long")
+        return None
+
+def test_stateful_rules_follow_push_and_pop():
+    """Test that stateful rules are instantiated and driven by push/pop."""
+    enforcer = RuleEnforcer([LengthCapRule])
+    enforcer.compile(['t0', 't1', 't2'], 3)
+    _, state = enforcer.dynamic_rules[0]
+    assert isinstance(state, LengthCapRule)
+
+    enforcer.push(0)
+    assert enforcer.check_next([0], 1) is None
+    enforcer.push(1)
+    assert isinstance(enforcer.check_next([0, 1], 2), ChainRuleException)
+    enforcer.pop()
+    assert enforcer.check_next([0], 2) is None
+    assert enforcer.rule_stats == {"LengthCapRule": 1}
+
+    enforcer.start([2, 1])
+    assert state.chain == [2, 1]
+
+def test_allowed_next_attributes_rejections_in_rule_order():
+    """Test that a rule listed before a compiled rule is credited with the candidates both reject."""
+    enforcer = RuleEnforcer([LengthCapRule, OddAfterEvenRule])
+    enforcer.compile(['t0', 't1', 't2', 't3'], 3)
+    enforcer.start([2, 0])
+    assert enforcer.allowed_next(0, 0b1010, 2, [2, 0]) == 0
+    assert enforcer.rule_stats == {"LengthCapRule": 2, "OddAfterEvenRule": 0}
+
+    enforcer = RuleEnforcer([OddAfterEvenRule, LengthCapRule])
+    enforcer.compile(['t0', 't1', 't2', 't3'], 3)
+    enforcer.start([2, 0])
+    assert enforcer.allowed_next(0, 0b1010, 2, [2, 0]) == 0
+    assert enforcer.rule_stats == {"OddAfterEvenRule": 2, "LengthCapRule": 0}
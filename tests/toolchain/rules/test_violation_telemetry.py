@@ -0,0 +1,83 @@
+import logging
+from types import SimpleNamespace
+from pallas.toolchain.rules.AlternatingRule import AlternatingRule
+from pallas.toolchain.rules.BalancingEncoderDecoderRule import BalancingEncoderDecoderRule
+from pallas.toolchain.rules.RuleEnforcer import RuleEnforcer
+from pallas.toolchain.rules import ViolationTelemetry as telemetry_module
+from pallas.toolchain.rules.ViolationTelemetry import ViolationTelemetry
+
+def make_tools(*names):
+    return [SimpleNamespace(name=name, domain_chars=set(), range_chars=set()) for name in names]
+
+def make_logger(name, records):
+    logger = logging.getLogger(name)
+    logger.handlers = []
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    handler = logging.Handler()
+    handler.emit = records.append
+    logger.addHandler(handler)
+    return logger
+
+def test_enforcer_aggregates_violations_by_key():
+    """Test that compiled and dynamic rule violations are counted per rule, tool pair and depth."""
+    tools = make_tools('hex_encoder', 'base64_encoder', 'hex_decoder')
+    enforcer = RuleEnforcer([AlternatingRule, BalancingEncoderDecoderRule])
+    telemetry = enforcer.enable_telemetry()
+    enforcer.compile(tools, 4)
+
+    assert enforcer.allowed_next(0, 0b110, 1) == 0b100
+    enforcer.start([0])
+    assert enforcer.check_next([0], 2) is None
+    assert enforcer.check_next([0], 1) is not None
+
+    assert telemetry.counts == {('AlternatingRule', 0, 1, 1): 1, ('BalancingEncoderDecoderRule', 0, 1, 1): 1}
+    assert telemetry.recorded == enforcer.total_violations == 2
+    summary = telemetry.format_summary()
+    assert "Rule violations: 2 over 2" in summary
+    assert "hex_encoder -> base64_encoder" in summary
+
+def test_sampled_violations_are_logged_in_full():
+    """Test that one violation in N is logged with its rendered message and the rest only counted."""
+    records = []
+    tools = make_tools('hex_encoder', 'base64_encoder', 'octal_encoder')
+    enforcer = RuleEnforcer([AlternatingRule])
+    enforcer.enable_telemetry(ViolationTelemetry(make_logger('test.sampled', records), sample_every=3))
+    enforcer.compile(tools, 2)
+    for last_tool in range(3):
+        enforcer.allowed_next(last_tool, 0b111 & ~(1 << last_tool), 1)
+
+    assert enforcer.telemetry.recorded == 6
+    assert [record.getMessage() for record in records] == [
+        "Rule violation 3: Non-alternating chain: base64_encoder -> hex_encoder. Encoder must be followed by decoder",
+        "Rule violation 6: Non-alternating chain: octal_encoder -> base64_encoder. Encoder must be followed by decoder",
+    ]
+
+def test_summary_is_logged_periodically(monkeypatch):
+    records = []
+    monkeypatch.setattr(telemetry_module, '_CLOCK_EVERY', 2)
+    telemetry = ViolationTelemetry(make_logger('test.summary', records), summary_interval=0)
+    telemetry.reset(make_tools('a', 'b'))
+    for _ in range(4):
+        telemetry.record('Rule', 0, 1, 1)
+    assert len(records) == 2
+    assert records[-1].getMessage().splitlines()[0] == "Rule violations: 4 over 1 (rule, last, next, depth) keys"
+
+def test_summary_lists_the_most_frequent_keys():
+    telemetry = ViolationTelemetry(top=1)
+    telemetry.reset(make_tools('a', 'b'))
+    telemetry.record('Rule', None, 1, 0)
+    for _ in range(2):
+        telemetry.record('Rule', 0, 1, 1)
+    lines = telemetry.format_summary().splitlines()
+    assert lines[2].split() == ['2', 'Rule', 'a', '->', 'b', '1']
+    assert lines[3] == "  ... 1 more keys"
+
+def test_merge_stats():
+    first, second = ViolationTelemetry(), ViolationTelemetry()
+    first.record('Rule', 0, 1, 1)
+    second.record('Rule', 0, 1, 1)
+    second.record('Rule', 1, 0, 2)
+    first.merge_stats(second.get_stats())
+    assert first.counts == {('Rule', 0, 1, 1): 2, ('Rule', 1, 0, 2): 1}
+    assert first.recorded == 3
@@ -0,0 +1,73 @@
+import pytest
+from pallas.toolchain.ToolChainer import ToolChainer
+from pallas.toolchain.ToolProvider import ToolProvider
+from pallas.toolchain.ChainContext import ChainContext
+from pallas.toolchain.rules.RuleEnforcer import RuleEnforcer
+from pallas.toolchain.rules.ChainRule import ChainRule
+from pallas.toolchain.rules.ChainRuleException import ChainRuleException
+from pallas.toolchain.rules.AlternatingRule import AlternatingRule
+from pallas.toolchain.rules.BalancingEncoderDecoderRule import BalancingEncoderDecoderRule
+from pallas.toolchain.rules.RedundantPairRule import RedundantPairRule
+from pallas.toolchain.rules.CharacterSetRule import CharacterSetRule
+
+class NoReverseFirstRule(ChainRule):
+    """A stateless rule that cannot be compiled: reverse may not start a chain."""
+
+    @staticmethod
+    def validate(chain_context: ChainContext) -> ChainRuleException | None:
+        if not chain_context.current_chain and chain_context.tools[chain_context.next_tool].name == 'reverse':
+            return ChainRuleException(chain_context, "reverse first")
+        return None
+
+RULE_SETS = [
+    [],
+    [RedundantPairRule, CharacterSetRule],
+    [AlternatingRule, BalancingEncoderDecoderRule],
+    [BalancingEncoderDecoderRule, RedundantPairRule, NoReverseFirstRule],
+]
+
+def make_chainer(rules, length):
+    return ToolChainer(tool_provider=ToolProvider(), max_tree_size=length, rule_enforcer=RuleEnforcer(rules))
+
+@pytest.mark.parametrize("rules", RULE_SETS)
+@pytest.mark.parametrize("length", [1, 3, 4])
+def test_count_matches_enumeration(rules, length):
+    """Test that the dynamic program counts exactly the chains iter_chains yields."""
+    chainer = make_chainer(rules, length)
+    chains = list(chainer.iter_chains())
+    assert chainer.count() == len(chains)
+
+@pytest.mark.parametrize("rules", RULE_SETS)
+def test_unrank_follows_generation_order(rules):
+    """Test that unrank returns the chain at each position of the generation order."""
+    chainer = make_chainer(rules, 3)
+    chains = list(chainer.iter_chains())
+    for index in range(0, len(chains), 7):
+        assert chainer.unrank(index) == chains[index]
+    assert chainer.unrank(len(chains) - 1) == chains[-1]
+
+def test_unrank_out_of_range():
+    """Test that unranking outside the chain range raises IndexError."""
+    chainer = make_chainer([], 2)
+    with pytest.raises(IndexError):
+        chainer.unrank(9 * 8)
+
+def test_count_zero_length():
+    """Test that no chains exist for length zero."""
+    assert make_chainer([], 0).count() == 0
+
+def test_sample_is_reproducible_and_distinct():
+    """Test that samples are seeded, distinct, valid and in generation order."""
+    chainer = make_chainer([BalancingEncoderDecoderRule, RedundantPairRule], 4)
+    chains = list(chainer.iter_chains())
+    sample = chainer.sample(25, seed=7)
+    assert sample == chainer.sample(25, seed=7)
+    assert len({tuple(chain) for chain in sample}) == 25
+    positions = [chains.index(chain) for chain in sample]
+    assert positions == sorted(positions)
+
+def test_sample_too_large():
+    """Test that asking for more chains than exist raises ValueError."""
+    chainer = make_chainer([], 1)
+    with pytest.raises(ValueError):
+        chainer.sample(10)
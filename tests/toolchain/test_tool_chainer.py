@@ -1,3 +1,4 @@
+import json
 import pytest
 from unittest.mock import patch, MagicMock
 from pallas.toolchain.ToolChainer import ToolChainer
@@ -8,6 +9,7 @@ from pallas.toolchain.rules.RedundantPairRule import RedundantPairRule
 from pallas.toolchain.rules.CharacterSetRule import CharacterSetRule
 from pallas.tools.Tool import Tool
 from pallas.toolchain.ToolProvider import ToolProvider
+from pallas.utils.tree_utils import calculate_max_tree_size
 
 class MockTool(Tool):
     def __init__(self, name, domain_chars, range_chars):
@@ -48,7 +50,7 @@ def test_tool_chainer_initialization(mock_tool_provider):
     assert chainer.verbose is True
     assert chainer.rule_enforcer == enforcer
     assert chainer.tools == []
-    assert chainer.valid_chains == []
+    assert chainer.chain_count == 0
     assert chainer.visited_nodes == 0
 
 def test_generate_chains_with_rules(mock_tool_provider):
@@ -87,4 +89,99 @@ def test_generate_chains_output(mock_tool_provider):
     assert output_file.exists()
     with open(output_file) as f:
         content = f.read()
-        assert len(content.strip().split('\n')) > 0
\ No newline at end of file
+        assert len(content.strip().split('\n')) > 0
+
+def test_iter_chains_yields_lazily(mock_tool_provider):
+    """Test that iter_chains is a generator producing every permutation without repeats."""
+    chainer = ToolChainer(tool_provider=mock_tool_provider, max_tree_size=3)
+    chains = chainer.iter_chains()
+    first = next(chains)
+    assert first == [0, 1, 2]
+    rest = list(chains)
+    # 6 tools, no repeats: 6 * 5 * 4 chains
+    assert len(rest) + 1 == 120
+    assert chainer.chain_count == 120
+    assert all(len(set(chain)) == 3 for chain in rest)
+
+def test_generate_chains_matches_iter_chains(mock_tool_provider):
+    """Test that the streamed file holds exactly the chains from iter_chains, in order."""
+    enforcer = RuleEnforcer([RedundantPairRule, CharacterSetRule])
+    chainer = ToolChainer(tool_provider=mock_tool_provider, max_tree_size=3, rule_enforcer=enforcer)
+    chainer.write_batch_size = 7
+    chainer.generate_chains()
+    expected = [' -> '.join(chainer.tools[i].name for i in chain) for chain in chainer.iter_chains()]
+    with open(chainer.output_file) as f:
+        assert f.read().splitlines() == expected
+
+@pytest.mark.parametrize("max_tree_size", [2, 4])
+def test_parallel_generation_matches_serial(max_tree_size):
+    """Test that multi-process generation writes the same chains and stats as a serial run."""
+    results = []
+    for workers, filename in ((1, 'toolchain_serial.txt'), (3, 'toolchain_parallel.txt')):
+        enforcer = RuleEnforcer([BalancingEncoderDecoderRule, RedundantPairRule, CharacterSetRule])
+        chainer = ToolChainer(tool_provider=ToolProvider(), max_tree_size=max_tree_size, rule_enforcer=enforcer,
+                              output_filename=filename, workers=workers)
+        chainer.generate_chains()
+        with open(chainer.output_file) as f:
+            results.append((f.read(), chainer.chain_count, chainer.visited_nodes, enforcer.get_stats()))
+    assert results[0] == results[1]
+    assert not list(chainer.output_file.parent.glob('.toolchain_parallel.txt.part*'))
+
+def test_verbose_generation_aggregates_violations():
+    """Test that verbose runs count violations per key instead of logging each, merged across workers."""
+    telemetry = []
+    for workers, filename in ((1, 'toolchain_serial.txt'), (3, 'toolchain_parallel.txt')):
+        enforcer = RuleEnforcer([AlternatingRule, BalancingEncoderDecoderRule])
+        chainer = ToolChainer(tool_provider=ToolProvider(), max_tree_size=3, rule_enforcer=enforcer,
+                              output_filename=filename, workers=workers, verbose=True)
+        chainer.generate_chains()
+        telemetry.append(enforcer.telemetry.counts)
+        assert sum(enforcer.telemetry.counts.values()) == enforcer.total_violations
+        assert {key[0] for key in enforcer.telemetry.counts} == {'AlternatingRule', 'BalancingEncoderDecoderRule'}
+    assert telemetry[0] == telemetry[1]
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_pruned_nodes_complete_the_visited_tree(workers):
+    """Test that the nodes the rules cut plus the nodes the search reached add up to the complete tree."""
+    enforcer = RuleEnforcer([AlternatingRule, BalancingEncoderDecoderRule, RedundantPairRule])
+    chainer = ToolChainer(tool_provider=ToolProvider(), max_tree_size=4, rule_enforcer=enforcer, workers=workers,
+                          output_filename=f'toolchain_pruned_{workers}.txt')
+    chainer.generate_chains()
+
+    max_possible_nodes = calculate_max_tree_size(chainer.tools, 4)
+    effectiveness = enforcer.get_pruning_effectiveness(max_possible_nodes)
+    # visited_nodes counts the root and the inner nodes, chain_count the leaves
+    assert effectiveness['pruned_nodes'] + chainer.visited_nodes - 1 + chainer.chain_count == max_possible_nodes
+    assert set(effectiveness['rule_pruned_nodes']) == {'AlternatingRule', 'BalancingEncoderDecoderRule', 'RedundantPairRule'}
+    assert sum(effectiveness['depth_pruned_nodes']) == effectiveness['pruned_nodes']
+
+def test_search_stats_per_depth(tmp_path):
+    """Test that per-depth nodes, candidates and rejections add up, match across workers and are written as JSON."""
+    results = []
+    for workers in (1, 3):
+        enforcer = RuleEnforcer([AlternatingRule, BalancingEncoderDecoderRule, RedundantPairRule])
+        chainer = ToolChainer(tool_provider=ToolProvider(), max_tree_size=4, rule_enforcer=enforcer, workers=workers,
+                              output_filename=f'toolchain_depths_{workers}.txt',
+                              stats_file=str(tmp_path / f'stats_{workers}.json'))
+        chainer.generate_chains()
+        stats = chainer.get_search_stats()
+        with open(tmp_path / f'stats_{workers}.json') as f:
+            assert json.load(f) == stats
+        results.append(stats)
+    assert results[0] == results[1]
+
+    depths = stats['depths']
+    assert [entry['depth'] for entry in depths] == list(range(5))
+    assert depths[0]['nodes'] == 1 and depths[-1]['nodes'] == stats['chain_count']
+    for entry, child in zip(depths, depths[1:]):
+        # Every candidate either survives as a node one level down or is rejected by exactly one rule
+        assert entry['candidates'] - sum(entry['rejections'].values()) == child['nodes']
+        assert entry['branching_factor'] == child['nodes'] / entry['nodes']
+    for rule_name, violations in stats['rule_stats'].items():
+        assert sum(entry['rejections'][rule_name] for entry in depths) == violations
+
+    table = chainer.format_search_stats().splitlines()
+    assert table[1].split() == ['depth', 'nodes', 'candidates', 'branching', 'AlternatingRule',
+                                'BalancingEncoderDecoderRule', 'RedundantPairRule']
+    assert table[2].split()[:3] == ['0', '1', str(depths[0]['candidates'])]
+    assert len(table) == 2 + len(depths)
@@ -0,0 +1,67 @@
+import base64
+import pytest
+from pallas.scorers import NgramScorer, RegexScorer
+from pallas.toolchain.ToolProvider import ToolProvider
+from pallas.toolrun.BeamSearch import BeamSearch
+
+PLAINTEXT = "The quick brown fox jumps over the lazy dog and then reads the morning paper"
+
+def encode(text):
+    """Reverse, base64 encode and then hex encode a text."""
+    encoded = base64.b64encode(text[::-1].encode()).decode()
+    return ' '.join(hex(ord(c))[2:] for c in encoded)
+
+def test_search_finds_deep_chain():
+    """Test that the search recovers a plaintext hidden behind three tools."""
+    tools = ToolProvider().discover_tools()
+    search = BeamSearch(tools, NgramScorer(), beam_width=20, max_depth=5, top_k=3)
+    results = search.search(encode(PLAINTEXT))
+
+    assert results[0].output == PLAINTEXT
+    assert results[0].chain == ['hex_decoder', 'base64_decoder', 'reverse']
+    assert len(results) == 3
+    assert [result.score for result in results] == sorted((result.score for result in results), reverse=True)
+
+def test_default_scorer_ranks_plaintext_above_hex_output():
+    """Test that hex output, whose digits a-f form English bigrams, does not outrank the plaintext."""
+    pangram = "the quick brown fox jumps over the lazy dog"
+    tools = ToolProvider().discover_tools()
+    results = BeamSearch(tools, NgramScorer(), max_depth=4).search(encode(pangram))
+
+    assert results[0].output == pangram
+    assert results[0].chain == ['hex_decoder', 'base64_decoder', 'reverse']
+
+def test_search_is_bounded():
+    """Test that the beam width and depth bound the number of tool runs."""
+    tools = ToolProvider().discover_tools()
+    search = BeamSearch(tools, NgramScorer(), beam_width=5, max_depth=12, top_k=1)
+    search.search(encode(PLAINTEXT))
+
+    assert search.stats['depth_reached'] <= 12
+    assert search.stats['tools_run'] <= len(tools) * (1 + 5 * 11)
+
+def test_search_drops_repeated_outputs():
+    """Test that reverse -> reverse is not kept because it reproduces the input."""
+    tools = ToolProvider(tool_names=['reverse']).discover_tools()
+    search = BeamSearch(tools, RegexScorer("cba"), beam_width=10, max_depth=4)
+    results = search.search("abc")
+
+    assert [(result.chain, result.output, result.score) for result in results] == [(['reverse'], 'cba', 1.0)]
+    assert search.stats['duplicates'] == 1
+    assert search.stats['depth_reached'] == 1
+
+def test_run_writes_results(tmp_path):
+    """Test that run writes one scored line per result."""
+    tools = ToolProvider(tool_names=['reverse', 'hex_decoder']).discover_tools()
+    search = BeamSearch(tools, RegexScorer("Hello"), max_depth=2, top_k=2)
+    search.output_dir = tmp_path
+    output_file = search.run("f6 c6 c6 56 84")
+
+    assert output_file == tmp_path / f'search_{search.run_id}.txt'
+    assert output_file.read_text().splitlines()[0] == "1.0000 reverse -> hex_decoder = Hello"
+
+@pytest.mark.parametrize("kwargs", [{'beam_width': 0}, {'max_depth': 0}, {'top_k': 0}])
+def test_invalid_limits(kwargs):
+    """Test that non-positive limits are rejected."""
+    with pytest.raises(ValueError):
+        BeamSearch([], NgramScorer(), **kwargs)
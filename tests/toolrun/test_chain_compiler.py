@@ -0,0 +1,112 @@
+import itertools
+import pytest
+from pallas.toolrun.ChainCompiler import ALL_CODES, ChainCompiler, _CheckedStep
+from pallas.tools.Tool import ToolError
+from pallas.tools.tool_map import tools as tool_classes
+
+INPUTS = ["", "Hello", "Hell\xf6 \xff", "48 65 6c", "SGVsbG8=", "65 66 67", "101 102", "a b", "Āx", "  "]
+
+@pytest.fixture
+def tools():
+    return {name: cls() for name, cls in tool_classes.items()}
+
+def make_step_runner(tools, calls=None):
+    """Build a step runner that runs the named tool like ToolRunner does, recording the calls."""
+    def run_step(name, value, mask):
+        if calls is not None:
+            calls.append(name)
+        tool = tools[name]
+        if isinstance(value, bytes):
+            result, error = tool.execute_bytes(value, input_mask=mask)
+        else:
+            result, error = tool.execute(value, input_mask=mask)
+        if error:
+            return "", ToolError(name, error.message), None
+        return result, None, tool.output_mask(mask)
+    return run_step
+
+def run_uncompiled(run_step, chain, value):
+    mask = None
+    for name in chain:
+        value, error, mask = run_step(name, value, mask)
+        if error:
+            return "", error
+    return value, None
+
+def normalize(error):
+    """Compare errors by tool and message, with invalid character sets compared as sets."""
+    if error is None:
+        return None
+    if error.message.startswith("Input contains invalid characters"):
+        return error.tool_name, frozenset(eval(error.message.split(": ", 1)[1]))
+    return error.tool_name, error.message
+
+@pytest.mark.parametrize("use_bytes", [False, True])
+def test_compiled_chains_match_step_by_step_runs(tools, use_bytes):
+    """Test that compiled chains return the outputs and errors of running the tools one by one."""
+    run_step = make_step_runner(tools)
+    compiler = ChainCompiler(tools, run_step, use_bytes=use_bytes)
+    for text in INPUTS:
+        if use_bytes:
+            if max(text, default="\0") > "\xff":
+                continue
+            text = text.encode('latin1')
+        for length in range(1, 4):
+            for chain in itertools.product(tools, repeat=length):
+                expected, expected_error = run_uncompiled(run_step, chain, text)
+                output, error = compiler.compile(list(chain))(text)
+                assert (output, normalize(error)) == (expected, normalize(expected_error)), (text, chain)
+
+def test_inverse_pairs_cancel(tools):
+    """Test that nested inverse pairs reduce to a single check that runs no tool."""
+    calls = []
+    compiler = ChainCompiler(tools, make_step_runner(tools, calls))
+    compiled = compiler.compile(['reverse', 'hex_encoder', 'hex_decoder', 'reverse'])
+
+    assert str(compiled) == "identity(reverse -> reverse)"
+    assert compiled("Hello") == ("Hello", None)
+    assert calls == []
+    assert compiler.stats['tools_eliminated'] == 4
+
+def test_inverse_pair_falls_back_outside_inverse_chars(tools):
+    """Test that base64 only cancels for ASCII input and runs the tools for other input."""
+    calls = []
+    compiled = ChainCompiler(tools, make_step_runner(tools, calls)).compile(['base64_encoder', 'base64_decoder'])
+
+    assert compiled("Hello") == ("Hello", None)
+    assert calls == []
+    assert compiled("\xe9") == ("\xc3\xa9", None)
+    assert calls == ['base64_encoder', 'base64_decoder']
+
+def test_token_maps_fuse(tools):
+    """Test that encoders and reversals fuse into one step with composed tokens."""
+    calls = []
+    compiled = ChainCompiler(tools, make_step_runner(tools, calls)).compile(['decimal_encoder', 'reverse', 'hex_encoder'])
+
+    assert str(compiled) == "fused(decimal_encoder -> reverse -> hex_encoder)"
+    assert compiled("AB") == (tools['hex_encoder'].execute(tools['decimal_encoder'].execute("AB")[0][::-1])[0], None)
+    assert calls == []
+
+def test_invalid_input_runs_the_tools(tools):
+    """Test that input failing the fused check gets the error of the tool that rejects it."""
+    compiled = ChainCompiler(tools, make_step_runner(tools)).compile(['reverse', 'hex_encoder'])
+    output, error = compiled("Ā")
+    assert output == ""
+    assert error.tool_name == 'reverse'
+
+def test_compiled_chains_are_cached(tools):
+    """Test that a chain is compiled once and evicted beyond max_chains."""
+    compiler = ChainCompiler(tools, make_step_runner(tools), max_chains=1)
+    first = compiler.compile(['reverse', 'reverse'])
+    assert compiler.compile(['reverse', 'reverse']) is first
+    assert compiler.stats == {'chains_compiled': 1, 'cache_hits': 1, 'tools_eliminated': 2, 'tools_fused': 0}
+
+    compiler.compile(['hex_encoder'])
+    assert compiler.compile(['reverse', 'reverse']) is not first
+
+def test_checked_step_requires_a_fast_path():
+    class NoFastPath(_CheckedStep):
+        pass
+
+    with pytest.raises(TypeError):
+        NoFastPath(('reverse',), ALL_CODES)
@@ -0,0 +1,45 @@
+import pytest
+from pallas.toolrun.ChainTrie import ChainTrie
+
+@pytest.fixture
+def toolchains_file(tmp_path):
+    file_path = tmp_path / "toolchains.txt"
+    with open(file_path, "w") as f:
+        f.write("tool1 -> tool2\n")
+        f.write("# comment\n")
+        f.write("\n")
+        f.write("tool1 -> tool3\n")
+        f.write("tool2 -> tool1\n")
+    return file_path
+
+def test_insert_shares_prefixes():
+    """Test that chains with a common prefix share trie nodes."""
+    trie = ChainTrie.from_chains([['a', 'b', 'c'], ['a', 'b', 'd'], ['a', 'e', 'c']])
+    assert trie.chain_count == 3
+    # a, a->b, a->b->c, a->b->d, a->e, a->e->c
+    assert trie.node_count == 6
+    assert list(trie.root.children) == ['a']
+
+def test_duplicate_chains_are_counted():
+    """Test that duplicate chains are kept as multiple terminals."""
+    trie = ChainTrie.from_chains([['a', 'b'], ['a', 'b']])
+    assert trie.chain_count == 2
+    assert trie.root.children['a'].children['b'].terminal == 2
+
+def test_from_file_skips_comments_and_blank_lines(toolchains_file):
+    """Test building a trie from a toolchain file."""
+    trie = ChainTrie.from_file(toolchains_file)
+    assert trie.chain_count == 3
+    assert set(trie.root.children) == {'tool1', 'tool2'}
+
+def test_iter_terminals_preserves_insertion_order():
+    """Test that terminals are yielded depth-first in insertion order."""
+    chains = [['a', 'b', 'c'], ['a', 'b', 'd'], ['a', 'e', 'c'], ['f', 'g', 'h']]
+    trie = ChainTrie.from_chains(chains)
+    assert list(trie.root.iter_terminals([])) == chains
+
+def test_iter_terminals_from_subtree():
+    """Test that iterating a subtree prefixes every chain with the given path."""
+    trie = ChainTrie.from_chains([['a', 'b', 'c'], ['a', 'b', 'd'], ['a', 'e', 'c']])
+    node = trie.root.children['a'].children['b']
+    assert list(node.iter_terminals(['a', 'b'])) == [['a', 'b', 'c'], ['a', 'b', 'd']]
@@ -0,0 +1,45 @@
+import pytest
+from pallas.toolrun.FusedRunner import FusedRunner
+from pallas.toolrun.ToolRunner import ToolRunner
+from pallas.toolchain.ToolChainer import ToolChainer
+from pallas.toolchain.ToolProvider import ToolProvider
+
+TOOL_NAMES = ['hex_decoder', 'reverse', 'hex_encoder', 'base64_decoder']
+
+def read_lines(path):
+    return sorted(path.read_text().splitlines())
+
+def test_fused_run_matches_generate_then_run(tmp_path):
+    """Test that the fused search finds exactly the chains a full run succeeds on."""
+    provider = ToolProvider(tool_names=TOOL_NAMES)
+    chainer = ToolChainer(tool_provider=provider, max_tree_size=3)
+    chainer.generate_chains(run_id='fused_reference')
+
+    runner = ToolRunner(str(chainer.output_file), "48656c6c6f", tool_provider=provider)
+    runner.output_dir = tmp_path / "linear"
+    runner.output_dir.mkdir()
+    runner.run()
+
+    fused = FusedRunner(ToolChainer(tool_provider=provider, max_tree_size=3), "48656c6c6f")
+    fused.output_dir = tmp_path / "fused"
+    fused.output_dir.mkdir()
+    fused.run()
+
+    linear_success = read_lines(runner.output_dir / f'toolrun_succeeded_{runner.run_id}.txt')
+    fused_success = read_lines(fused.output_dir / f'toolrun_succeeded_{fused.run_id}.txt')
+    assert fused_success == linear_success
+    assert fused.stats['chains_succeeded'] == runner.stats['chains_succeeded']
+
+def test_fused_run_prunes_failed_prefixes(tmp_path):
+    """Test that a failing prefix is reported once and its subtree is never run."""
+    chainer = ToolChainer(tool_provider=ToolProvider(tool_names=TOOL_NAMES), max_tree_size=3)
+    fused = FusedRunner(chainer, "not hex!", run_id='prune')
+    fused.output_dir = tmp_path
+    fused.run()
+
+    failed = read_lines(tmp_path / 'toolrun_failed_prune.txt')
+    # hex_decoder and base64_decoder reject the input outright, so each fails as a one-tool prefix
+    assert any(line.startswith("hex_decoder = Error: hex_decoder:") for line in failed)
+    assert not any(line.startswith("hex_decoder ->") for line in failed)
+    assert fused.stats['prefixes_failed'] == len(failed)
+    assert fused.stats['tools_run'] < 4 * 3 * 2 * 3
@@ -0,0 +1,76 @@
+import multiprocessing
+import pytest
+from pallas.toolrun.PersistentCache import PersistentCache
+from pallas.toolrun.ResultCache import ResultCache
+from pallas.tools.encoders.hex import HexEncoder
+from pallas.tools.decoders.hex import HexDecoder
+from pallas.tools.transformers.reverse import Reverse
+
+def test_results_survive_reopening(tmp_path):
+    """Test that results written by one cache are served to the next."""
+    path = tmp_path / "cache.db"
+    with PersistentCache(path) as backend:
+        cache = ResultCache(1 << 20, backend=backend)
+        expected = cache.run(HexEncoder(), "Hello")
+        cache.run(HexDecoder(), "zz")
+
+    with PersistentCache(path) as backend:
+        cache = ResultCache(1 << 20, backend=backend)
+        assert cache.run(HexEncoder(), "Hello") == expected
+        result, sep, error = cache.run(HexDecoder(), "zz")
+        assert result == "zz"
+        assert error.tool_name == "hex_decoder"
+        assert backend.stats == {'hits': 2, 'misses': 0, 'evictions': 0}
+
+def test_version_is_part_of_key(tmp_path):
+    """Test that bumping a tool version invalidates its stored results."""
+    class NewReverse(Reverse):
+        version = "2"
+
+    with PersistentCache(tmp_path / "cache.db") as backend:
+        digest = ResultCache.digest("abc")
+        backend.put(Reverse(), None, digest, "cba", None, None)
+        backend.flush()
+        assert backend.get(Reverse(), None, digest) == ("cba", None, None)
+        assert backend.get(NewReverse(), None, digest) is None
+
+def test_evicts_least_recently_accessed(tmp_path):
+    """Test that the oldest rows are evicted once the size limit is exceeded."""
+    tool = Reverse()
+    with PersistentCache(tmp_path / "cache.db", max_bytes=6, flush_every=1) as backend:
+        first, second, third = (ResultCache.digest(text) for text in ("abc", "def", "ghi"))
+        backend.put(tool, None, first, "cba", None, None)
+        backend.put(tool, None, second, "fed", None, None)
+        backend.get(tool, None, first)
+        backend.put(tool, None, third, "ihg", None, None)
+
+        assert backend.stats['evictions'] == 1
+        assert backend.size == 6
+        assert backend.get(tool, None, second) is None
+        assert backend.get(tool, None, first) == ("cba", None, None)
+
+def _fill(path, start):
+    with PersistentCache(path, flush_every=8) as backend:
+        cache = ResultCache(0, backend=backend)
+        for i in range(start, start + 200):
+            cache.run(Reverse(), str(i))
+
+def test_concurrent_writers(tmp_path):
+    """Test that several processes can fill the same database at once."""
+    path = tmp_path / "cache.db"
+    PersistentCache(path).close()
+    processes = [multiprocessing.Process(target=_fill, args=(path, start)) for start in (0, 100, 200, 300)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+
+    with PersistentCache(path) as backend:
+        count = backend._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        assert count == 500
+        assert backend.size == sum(len(str(i)) for i in range(500))
+
+def test_negative_size(tmp_path):
+    with pytest.raises(ValueError):
+        PersistentCache(tmp_path / "cache.db", max_bytes=-1)
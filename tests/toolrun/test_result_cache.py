@@ -0,0 +1,81 @@
+import sys
+import pytest
+from pallas.toolrun.ResultCache import ResultCache
+from pallas.toolrun.ToolRunner import ToolRunner
+from pallas.toolchain.ToolProvider import ToolProvider
+from pallas.tools.encoders.hex import HexEncoder
+from pallas.tools.decoders.hex import HexDecoder
+from pallas.tools.transformers.reverse import Reverse
+
+def test_hit_returns_same_result():
+    """Test that a repeated run is served from the cache."""
+    cache = ResultCache(1 << 20)
+    tool = HexEncoder()
+    first = cache.run(tool, "Hello")
+    second = cache.run(tool, "Hello")
+
+    assert first == second == tool.run("Hello")
+    assert cache.stats == {'hits': 1, 'misses': 1, 'evictions': 0}
+
+def test_key_separates_tools_and_separators():
+    """Test that different tools and separators do not share entries."""
+    cache = ResultCache(1 << 20)
+    cache.run(HexEncoder(), "abc")
+    cache.run(Reverse(), "abc")
+    cache.run(HexEncoder(separator=','), "abc")
+    assert cache.stats['misses'] == 3
+    assert cache.run(HexEncoder(separator=','), "abc") == ("61,62,63", ',', None)
+
+def test_errors_are_cached():
+    """Test that a failed run is cached and returns the unchanged input like Tool.run."""
+    cache = ResultCache(1 << 20)
+    tool = HexDecoder()
+    first = cache.run(tool, "zz")
+    second = cache.run(tool, "zz")
+
+    assert first[0] == second[0] == "zz"
+    assert second[2].message == first[2].message
+    assert cache.stats['hits'] == 1
+
+def test_evicts_least_recently_used():
+    """Test that the cache evicts by size, oldest access first."""
+    entry_size = sys.getsizeof("cba")
+    cache = ResultCache(2 * entry_size)
+    tool = Reverse()
+    cache.run(tool, "abc")
+    cache.run(tool, "def")
+    cache.run(tool, "abc")
+    cache.run(tool, "ghi")
+
+    assert cache.stats['evictions'] == 1
+    assert cache.size <= cache.max_bytes
+    cache.run(tool, "abc")
+    assert cache.stats['hits'] == 2
+    cache.run(tool, "def")
+    assert cache.stats['misses'] == 4
+
+def test_oversized_results_are_not_cached():
+    """Test that a result larger than the whole cache is passed through."""
+    cache = ResultCache(10)
+    assert cache.run(Reverse(), "abc") == ("cba", None, None)
+    assert len(cache) == 0
+
+def test_negative_size():
+    with pytest.raises(ValueError):
+        ResultCache(-1)
+
+def test_tool_runner_with_cache(tmp_path):
+    """Test that ToolRunner output is unchanged by the cache and shared steps hit it."""
+    chains = tmp_path / "chains.txt"
+    chains.write_text("reverse -> hex_encoder\nreverse -> reverse\nhex_encoder -> hex_decoder\n")
+    provider = ToolProvider(tool_names=['reverse', 'hex_encoder', 'hex_decoder'])
+
+    outputs = []
+    for cache in (None, ResultCache(1 << 20)):
+        runner = ToolRunner(str(chains), "Hello", tool_provider=provider, cache=cache)
+        runner.output_dir = tmp_path
+        runner.run()
+        outputs.append((tmp_path / f'toolrun_succeeded_{runner.run_id}.txt').read_text())
+
+    assert outputs[0] == outputs[1]
+    assert cache.stats['hits'] == 1
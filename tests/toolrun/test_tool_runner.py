@@ -145,4 +145,247 @@ def test_run_complete_execution(toolchains_file, mock_tool_provider, mock_tools,
     assert runner.stats['chains_processed'] == 3
     assert runner.stats['chains_succeeded'] == 1
     assert runner.stats['chains_failed'] == 2
-    assert runner.stats['tools_loaded'] == len(mock_tools)
\ No newline at end of file
+    assert runner.stats['tools_loaded'] == len(mock_tools)
+
+class CountingTool(MockTool):
+    def __init__(self, name, should_fail=False):
+        super().__init__(name, should_fail)
+        self.calls = 0
+
+    def run(self, input_text, input_separator: Optional[str] = None):
+        self.calls += 1
+        return super().run(input_text, input_separator)
+
+def test_run_trie_matches_linear_run(toolchains_file, mock_tool_provider, tmp_path):
+    """Test that trie execution writes the same results as linear execution."""
+    outputs = {}
+    for use_trie in (False, True):
+        runner = ToolRunner(toolchains_file, "test_input", tool_provider=mock_tool_provider, use_trie=use_trie)
+        runner.output_dir = tmp_path / f"out_{use_trie}"
+        runner.output_dir.mkdir()
+        runner.run()
+        success = (runner.output_dir / f'toolrun_succeeded_{runner.run_id}.txt').read_text()
+        failed = (runner.output_dir / f'toolrun_failed_{runner.run_id}.txt').read_text()
+        outputs[use_trie] = (sorted(success.splitlines()), sorted(failed.splitlines()), runner.stats)
+    assert outputs[True] == outputs[False]
+
+def test_run_trie_runs_each_prefix_once(tmp_path):
+    """Test that a shared prefix is executed once and failed subtrees are skipped."""
+    tools = {
+        'tool1': CountingTool('tool1'),
+        'tool2': CountingTool('tool2'),
+        'failing_tool': CountingTool('failing_tool', should_fail=True),
+    }
+    provider = ToolProvider()
+    provider.discover_tools = lambda: list(tools.values())
+    file_path = tmp_path / "toolchains.txt"
+    file_path.write_text(
+        "tool1 -> tool2 -> tool1\n"
+        "tool1 -> tool2 -> failing_tool\n"
+        "failing_tool -> tool1 -> tool2\n"
+        "failing_tool -> tool2 -> tool1\n"
+    )
+
+    runner = ToolRunner(str(file_path), "x", tool_provider=provider, use_trie=True)
+    runner.output_dir = tmp_path / "out"
+    runner.output_dir.mkdir()
+    runner.run()
+
+    # tool1 runs for "tool1" and "tool1 -> tool2 -> tool1"; tool2 only once for "tool1 -> tool2"
+    assert tools['tool1'].calls == 2
+    assert tools['tool2'].calls == 1
+    assert tools['failing_tool'].calls == 2
+    assert runner.stats['chains_processed'] == 4
+    assert runner.stats['chains_succeeded'] == 1
+    assert runner.stats['chains_failed'] == 3
+
+    failed = (runner.output_dir / f'toolrun_failed_{runner.run_id}.txt').read_text()
+    assert "failing_tool -> tool1 -> tool2 = Error: failing_tool: Mock error" in failed
+    assert "failing_tool -> tool2 -> tool1 = Error: failing_tool: Mock error" in failed
+
+def test_run_binary_toolchain_file(mock_tool_provider, tmp_path):
+    """Test that the runner detects and executes a binary toolchain file."""
+    from pallas.utils.chain_file import encode_record, write_binary_header
+    file_path = tmp_path / "toolchains.bin"
+    with open(file_path, 'wb') as f:
+        write_binary_header(f, ['tool1', 'tool2', 'failing_tool'], 2)
+        f.write(encode_record([0, 1]))
+        f.write(encode_record([0, 2]))
+
+    runner = ToolRunner(str(file_path), "test_input", tool_provider=mock_tool_provider)
+    runner.output_dir = tmp_path / "out"
+    runner.output_dir.mkdir()
+    runner.run()
+
+    success_content = (runner.output_dir / f'toolrun_succeeded_{runner.run_id}.txt').read_text()
+    assert success_content == "tool1 -> tool2 = test_input_tool1_tool2\n"
+    assert runner.stats['chains_succeeded'] == 1
+    assert runner.stats['chains_failed'] == 1
+
+@pytest.mark.parametrize("use_trie", [False, True])
+def test_run_bytes_matches_str_run(tmp_path, use_trie):
+    """Test that bytes mode writes the same results as str mode."""
+    chains = tmp_path / "chains.txt"
+    chains.write_text("hex_decoder -> reverse\nhex_decoder -> base64_encoder -> base64_decoder\n"
+                      "reverse -> hex_decoder\nbase64_decoder -> hex_encoder\n")
+    provider = ToolProvider(tool_names=['hex_decoder', 'reverse', 'base64_encoder', 'base64_decoder', 'hex_encoder'])
+
+    outputs = {}
+    for use_bytes in (False, True):
+        runner = ToolRunner(str(chains), "48 65 6c 6c 6f ff", tool_provider=provider, use_trie=use_trie, use_bytes=use_bytes)
+        runner.output_dir = tmp_path / f"out_{use_bytes}"
+        runner.output_dir.mkdir()
+        runner.run()
+        success = (runner.output_dir / f'toolrun_succeeded_{runner.run_id}.txt').read_text()
+        failed = (runner.output_dir / f'toolrun_failed_{runner.run_id}.txt').read_text()
+        outputs[use_bytes] = (success, failed.count('\n'), runner.stats)
+    assert outputs[True] == outputs[False]
+    assert "hex_decoder -> reverse = \xffolleH" in outputs[True][0]
+
+def test_run_stream_matches_str_run(tmp_path):
+    """Test that streaming mode writes the same results as str mode, including tools without a stream method."""
+    chains = tmp_path / "chains.txt"
+    chains.write_text("hex_decoder -> reverse\nhex_decoder -> base64_encoder -> base64_decoder\n"
+                      "reverse -> hex_decoder\nbase64_decoder -> hex_encoder\nhex_decoder -> missing\n"
+                      "hex_decoder -> tool1\n")
+    provider = ToolProvider(tool_names=['hex_decoder', 'reverse', 'base64_encoder', 'base64_decoder', 'hex_encoder'])
+    discover_tools = provider.discover_tools
+    provider.discover_tools = lambda: discover_tools() + [MockTool('tool1')]
+
+    outputs = {}
+    for streaming in (False, True):
+        runner = ToolRunner(str(chains), "48 65 6c 6c 6f ff", tool_provider=provider, streaming=streaming)
+        runner.output_dir = tmp_path / f"out_{streaming}"
+        runner.output_dir.mkdir()
+        runner.run()
+        success = (runner.output_dir / f'toolrun_succeeded_{runner.run_id}.txt').read_text()
+        failed = (runner.output_dir / f'toolrun_failed_{runner.run_id}.txt').read_text()
+        outputs[streaming] = (success, failed, runner.stats)
+    assert outputs[True] == outputs[False]
+    assert "hex_decoder -> reverse = \xffolleH" in outputs[True][0]
+    assert "hex_decoder -> tool1 = Hello\xff_tool1" in outputs[True][0]
+    assert "hex_decoder -> missing = Error: missing: Tool not found: missing" in outputs[True][1]
+
+def test_run_stream_rejects_trie_and_cache(toolchains_file, mock_tool_provider):
+    """Test that streaming mode cannot be combined with the trie or the result cache."""
+    from pallas.toolrun.ResultCache import ResultCache
+    with pytest.raises(ValueError):
+        ToolRunner(toolchains_file, "x", tool_provider=mock_tool_provider, streaming=True, use_trie=True)
+    with pytest.raises(ValueError):
+        ToolRunner(toolchains_file, "x", tool_provider=mock_tool_provider, streaming=True, cache=ResultCache(1024))
+
+def test_compile_rejects_stream_trie_and_cache(toolchains_file, mock_tool_provider):
+    """Test that chain compilation cannot be combined with streaming, the trie or the result cache."""
+    from pallas.toolrun.ResultCache import ResultCache
+    with pytest.raises(ValueError):
+        ToolRunner(toolchains_file, "x", tool_provider=mock_tool_provider, compile_chains=True, streaming=True)
+    with pytest.raises(ValueError):
+        ToolRunner(toolchains_file, "x", tool_provider=mock_tool_provider, compile_chains=True, use_trie=True)
+    with pytest.raises(ValueError):
+        ToolRunner(toolchains_file, "x", tool_provider=mock_tool_provider, compile_chains=True, cache=ResultCache(1024))
+
+@pytest.mark.parametrize("mode", [{}, {'use_bytes': True}, {'use_bytes': True, 'use_trie': True}, {'streaming': True}])
+def test_run_mapped_input_matches_str_run(tmp_path, mode):
+    """Test that a memory-mapped input file gives the same results as the same text passed as str."""
+    from pallas.utils.input_file import open_input_file
+    chains = tmp_path / "chains.txt"
+    chains.write_text("hex_decoder -> reverse\nreverse -> hex_decoder\nreverse -> reverse\n")
+    input_file = tmp_path / "input.txt"
+    input_file.write_bytes(b"48 65 6c 6c 6f ff")
+    provider = ToolProvider(tool_names=['hex_decoder', 'reverse'])
+
+    outputs = []
+    with open_input_file(str(input_file)) as mapped:
+        for input_text, options in (("48 65 6c 6c 6f ff", {}), (mapped, mode)):
+            runner = ToolRunner(str(chains), input_text, tool_provider=provider, **options)
+            runner.output_dir = tmp_path / f"out_{len(outputs)}"
+            runner.output_dir.mkdir()
+            runner.run()
+            success = (runner.output_dir / f'toolrun_succeeded_{runner.run_id}.txt').read_text()
+            failed = (runner.output_dir / f'toolrun_failed_{runner.run_id}.txt').read_text()
+            outputs.append((sorted(success.splitlines()), failed))
+    assert outputs[0] == outputs[1]
+    assert "hex_decoder -> reverse = \xffolleH" in outputs[1][0]
+
+@pytest.mark.parametrize("use_bytes", [False, True])
+def test_run_threaded_matches_sequential_run(tmp_path, use_bytes):
+    """Test that running chains on threads writes the same results, in the same order, as one thread."""
+    from pallas.toolchain.ToolChainer import ToolChainer
+    provider = ToolProvider()
+    chainer = ToolChainer(tool_provider=provider, max_tree_size=3)
+    chains = tmp_path / "chains.txt"
+    chainer.write_chains(chains, chainer.iter_chains())
+
+    outputs = {}
+    for threads in (1, 4):
+        runner = ToolRunner(str(chains), "48 65 6c 6c 6f", tool_provider=provider,
+                            use_bytes=use_bytes, threads=threads)
+        runner.output_dir = tmp_path / f"out_{threads}"
+        runner.output_dir.mkdir()
+        runner.run()
+        success = (runner.output_dir / f'toolrun_succeeded_{runner.run_id}.txt').read_text()
+        failed = (runner.output_dir / f'toolrun_failed_{runner.run_id}.txt').read_text()
+        outputs[threads] = (success, failed, runner.stats)
+    assert outputs[4] == outputs[1]
+    assert outputs[4][2]['chains_succeeded'] > 0
+
+@pytest.mark.parametrize("use_bytes", [False, True])
+def test_run_compiled_matches_uncompiled_run(tmp_path, use_bytes):
+    """Test that compiling chains changes neither the results nor their order."""
+    from pallas.toolchain.ToolChainer import ToolChainer
+    provider = ToolProvider()
+    chainer = ToolChainer(tool_provider=provider, max_tree_size=3)
+    chains = tmp_path / "chains.txt"
+    chainer.write_chains(chains, chainer.iter_chains())
+
+    outputs = {}
+    for compile_chains in (False, True):
+        runner = ToolRunner(str(chains), "Hell\xf6 48 65", tool_provider=provider,
+                            use_bytes=use_bytes, compile_chains=compile_chains)
+        runner.output_dir = tmp_path / f"out_{compile_chains}"
+        runner.output_dir.mkdir()
+        runner.run()
+        success = (runner.output_dir / f'toolrun_succeeded_{runner.run_id}.txt').read_text()
+        failed = (runner.output_dir / f'toolrun_failed_{runner.run_id}.txt').read_text()
+        outputs[compile_chains] = (success, failed, runner.stats)
+    assert outputs[True] == outputs[False]
+    assert runner.compiler.stats['tools_fused'] > 0
+
+def test_trace_logs_steps_only_when_enabled(toolchains_file, mock_tool_provider, tmp_path, monkeypatch):
+    """Test that per-step messages are written, with outputs cut, only when tracing is enabled."""
+    from pallas.utils.logging_config import close_logger
+    monkeypatch.chdir(tmp_path)
+    logs = {}
+    for trace in (None, 8):
+        runner = ToolRunner(toolchains_file, "test_input", tool_provider=mock_tool_provider, trace=trace)
+        runner.run()
+        close_logger('pallas.toolrun.ToolRunner')
+        logs[trace] = (tmp_path / 'logs' / f'pallas_toolrun_ToolRunner_{runner.run_id}.log').read_text()
+    assert "Output from" not in logs[None]
+    assert "TRACE - Output from tool1: test_inp... (16 chars)" in logs[8]
+
+def test_run_threaded_rejects_shared_state(toolchains_file, mock_tool_provider):
+    """Test that threads cannot be combined with the cache, the trie or streaming."""
+    from pallas.toolrun.ResultCache import ResultCache
+    for options in ({'cache': ResultCache(1024)}, {'use_trie': True}, {'streaming': True}, {'threads': 0}):
+        with pytest.raises(ValueError):
+            ToolRunner(toolchains_file, "x", tool_provider=mock_tool_provider, **{'threads': 2, **options})
+
+def test_run_bytes_rejects_wide_input(toolchains_file, mock_tool_provider):
+    """Test that bytes mode needs input representable in latin-1."""
+    with pytest.raises(ValueError):
+        ToolRunner(toolchains_file, "€", tool_provider=mock_tool_provider, use_bytes=True)
+
+def test_run_step_passes_output_mask(tmp_path):
+    """Test that a step hands the encoder's output bitmap to the next tool."""
+    provider = ToolProvider(tool_names=['hex_encoder', 'hex_decoder'])
+    runner = ToolRunner(str(tmp_path / "unused.txt"), "Hi", tool_provider=provider)
+    runner._load_tools()
+
+    encoded, error, mask = runner._run_step('hex_encoder', "Hi", runner.input_mask)
+    assert (encoded, error) == ("48 69", None)
+    assert mask == runner.tools['hex_encoder'].output_mask()
+    decoder = runner.tools['hex_decoder']
+    decoder.execute = MagicMock(wraps=decoder.execute)
+    assert runner._run_step('hex_decoder', encoded, mask)[:2] == ("Hi", None)
+    decoder.execute.assert_called_once_with(encoded, input_mask=mask)
@@ -40,4 +40,15 @@ def test_decimal_decoder_domain_chars():
 def test_decimal_decoder_range_chars():
     decoder = DecimalDecoder()
     for i in range(256):
-        assert chr(i) in decoder.range_chars
\ No newline at end of file
+        assert chr(i) in decoder.range_chars
+
+def test_decimal_decoder_padded_values():
+    decoder = DecimalDecoder()
+    result, sep, error = decoder.run("072 0101 108")
+    assert error is None
+    assert result == "Hel"
+
+def test_decimal_decoder_matches_encoder_for_all_codes():
+    text = "".join(chr(i) for i in range(256))
+    encoded = " ".join(str(i) for i in range(256))
+    assert DecimalDecoder().run(encoded) == (text, " ", None)
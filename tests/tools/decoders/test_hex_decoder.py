@@ -51,4 +51,24 @@ def test_hex_decoder_domain_chars():
 def test_hex_decoder_range_chars():
     decoder = HexDecoder()
     for i in range(256):
-        assert chr(i) in decoder.range_chars
\ No newline at end of file
+        assert chr(i) in decoder.range_chars
+
+@pytest.mark.parametrize("encoded,expected", [
+    ("48 65 6C", "Hel"),
+    ("48 65 6c ", None),
+    ("048 65 6c", "Hel"),
+    ("48  65 6c", None),
+    ("4865 6c", None),
+])
+def test_hex_decoder_irregular_values(encoded, expected):
+    """Test that inputs outside the two-digit fast path decode or fail as before."""
+    decoder = HexDecoder()
+    if expected is None:
+        with pytest.raises(ValueError):
+            decoder._process(encoded)
+    else:
+        assert decoder._process(encoded) == expected
+
+def test_hex_decoder_single_digit_values():
+    decoder = HexDecoder(separator=",")
+    assert decoder._process("a,4f,0") == "\nO\x00"
@@ -47,4 +47,15 @@ def test_octal_decoder_domain_chars():
 def test_octal_decoder_range_chars():
     decoder = OctalDecoder()
     for i in range(256):
-        assert chr(i) in decoder.range_chars
\ No newline at end of file
+        assert chr(i) in decoder.range_chars
+
+def test_octal_decoder_padded_values():
+    decoder = OctalDecoder()
+    result, sep, error = decoder.run("0110 145 00154")
+    assert error is None
+    assert result == "Hel"
+
+def test_octal_decoder_matches_encoder_for_all_codes():
+    text = "".join(chr(i) for i in range(256))
+    encoded = " ".join(f"{i:o}" for i in range(256))
+    assert OctalDecoder().run(encoded) == (text, " ", None)
@@ -1,5 +1,8 @@
 import pytest
 from pallas.tools.Tool import Tool, ToolError
+from pallas.tools.encoders import Base64Encoder, DecimalEncoder, HexEncoder, OctalEncoder
+from pallas.tools.transformers.reverse import Reverse
+from pallas.common import charset_mask
 from typing import Optional
 
 class MockTool(Tool):
@@ -27,4 +30,80 @@ def test_tool_error_handling():
     result, sep, error = MockTool().run("abc")
     assert error is not None
     assert isinstance(error, ToolError)
-    assert "Test error" in str(error)
\ No newline at end of file
+    assert "Test error" in str(error)
+
+def test_tool_validation_accepts_domain_and_exemptions():
+    tool = MockTool()
+    assert tool.run("ab ba")[2] is None
+    assert tool.run("ab,ba", ",")[2] is None
+
+def test_tool_validation_reports_invalid_characters():
+    result, sep, error = MockTool().run("abxd")
+    assert result == "abxd"
+    assert error.message.startswith("Input contains invalid characters:")
+    assert eval(error.message.split(": ", 1)[1]) == {"x", "d"}
+
+def test_tool_validation_multi_character_separator_is_not_exempt():
+    result, sep, error = MockTool().run("a::b", "::")
+    assert eval(error.message.split(": ", 1)[1]) == {":"}
+
+def test_tool_validation_wide_characters():
+    result, sep, error = MockTool().run("a€b")
+    assert eval(error.message.split(": ", 1)[1]) == {"€"}
+
+def test_tool_validity_table_follows_separator():
+    tool = MockTool()
+    assert tool.run("a,b", ",")[2] is None
+    assert tool.run("a,b", ";")[2] is not None
+    assert set(tool._validity) == {",", ";"}
+
+def test_tool_input_mask_skips_validation():
+    tool = MockTool()
+    # A mask inside the domain skips the scan, even if the input disagrees
+    assert tool.run("abxd", input_mask=charset_mask("ab"))[2] is None
+    assert tool.run("abxd", input_mask=charset_mask("abx"))[2] is not None
+
+def test_tool_output_mask():
+    assert MockTool().output_mask(charset_mask("ab")) is None
+
+    encoder = HexEncoder(separator=",")
+    encoder.run("Hi")
+    assert encoder.output_mask() == charset_mask("0123456789abcdef,")
+
+    assert Reverse().output_mask(charset_mask("xyz")) == charset_mask("xyz")
+
+@pytest.mark.parametrize("text", ["Hello", "Hell\xf6", "€"])
+def test_encoder_output_fits_output_mask(text):
+    for encoder in (HexEncoder(), OctalEncoder(), DecimalEncoder(), Base64Encoder()):
+        result, sep, error = encoder.run(text)
+        if error is None:
+            mask = encoder.output_mask()
+            assert charset_mask(result) & ~mask == 0
+
+def test_execute_leaves_separator_unchanged():
+    encoder = HexEncoder()
+    assert encoder.execute("Hi", ",") == ("48,69", None)
+    assert encoder.separator == " "
+    assert encoder.execute("Hi") == ("48 69", None)
+    assert encoder.execute_bytes(b"Hi", ":") == (b"48:69", None)
+    assert encoder.output_mask(input_separator=",") == charset_mask("0123456789abcdef,")
+
+    # run keeps replacing the separator for later runs
+    assert encoder.run("Hi", ",")[:2] == ("48,69", ",")
+    assert encoder.execute("Hi") == ("48,69", None)
+
+def test_execute_validates_with_call_separator():
+    from pallas.tools.decoders import HexDecoder
+    decoder = HexDecoder()
+    assert decoder.execute("48,69", ",") == ("Hi", None)
+    result, error = decoder.execute("48,69")
+    assert result == "48,69"
+    assert "invalid characters" in error.message
+
+def test_execute_is_thread_safe():
+    from concurrent.futures import ThreadPoolExecutor
+    encoder = HexEncoder()
+    separators = [",", ":", "-", ";"] * 50
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda sep: encoder.execute("Hello" * 100, sep)[0], separators))
+    assert results == [sep.join(["48", "65", "6c", "6c", "6f"] * 100) for sep in separators]
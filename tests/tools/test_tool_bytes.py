@@ -0,0 +1,29 @@
+import pytest
+from pallas.tools.tool_map import tools
+
+INPUTS = [
+    "", " ", "Hello", "Hell\xf6 \xff", "48 65 6c 6c 6f", "48656c", "4 41", "41  42", " 41 42 ", "41 42\n",
+    "SGVsbG8=", "SGVsbG8", "S G V s", "101 102", "110 145 154", "65 66 67", "256", "a b", "1,2,3",
+]
+
+@pytest.mark.parametrize("name", list(tools))
+@pytest.mark.parametrize("separator", [None, " ", ","])
+def test_run_bytes_matches_run(name, separator):
+    """Test that run_bytes returns the latin-1 encoding of what run returns, with the same errors."""
+    for text in INPUTS:
+        result, sep, error = tools[name]().run(text, separator)
+        result_bytes, sep_bytes, error_bytes = tools[name]().run_bytes(text.encode('latin1'), separator)
+
+        assert sep_bytes == sep
+        assert (error_bytes is None) == (error is None), text
+        if error is None:
+            assert result_bytes == result.encode('latin1'), text
+        elif not error.message.startswith("Input contains invalid characters"):
+            # Invalid character sets print in arbitrary order, so only other messages compare exactly
+            assert error_bytes.message == error.message, text
+
+def test_run_bytes_accepts_memoryview():
+    """Test that run_bytes takes any bytes-like input."""
+    result, sep, error = tools['reverse']().run_bytes(memoryview(b"abc"))
+    assert result == b"cba"
+    assert error is None
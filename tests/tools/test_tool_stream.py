@@ -0,0 +1,82 @@
+import pytest
+from pallas.tools import streaming
+from pallas.tools.tool_map import tools
+from pallas.tools.Tool import ToolError
+from pallas.tools.streaming import iter_chunks, stream_tokens
+
+INPUTS = [
+    "", " ", "Hello", "Hell\xf6 \xff", "48 65 6c 6c 6f", "48656c", "4 41", "41  42", " 41 42 ", "41 42\n",
+    "SGVsbG8=", "SGVsbG8", "S G V s", "SGVs=bG8", "SGVsbG8=SGVs", "SGVsb", "101 102", "110 145 154", "65 66 67",
+    "256", "a b", "1,2,3", "1,2,", ",", "41,,42",
+]
+
+def run_stream(tool, data, chunk_size, separator=None):
+    """Stream the input through a tool, returning the output and the error message."""
+    try:
+        return b"".join(tool.stream(iter_chunks(data, chunk_size), separator)), None
+    except ToolError as e:
+        return None, e.message
+
+@pytest.mark.parametrize("name", list(tools))
+@pytest.mark.parametrize("separator", [None, " ", ","])
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 64])
+def test_stream_matches_run_bytes(name, separator, chunk_size):
+    """Test that streaming in chunks of any size returns what run_bytes returns, with the same errors."""
+    for text in INPUTS:
+        data = text.encode('latin1')
+        result, sep, error = tools[name]().run_bytes(data, separator)
+        output, message = run_stream(tools[name](), data, chunk_size, separator)
+
+        assert (message is None) == (error is None), text
+        if error is None:
+            assert output == result, text
+        elif message.startswith("Input contains invalid characters"):
+            # Invalid character sets print in arbitrary order
+            assert eval(message.split(": ", 1)[1]) == eval(error.message.split(": ", 1)[1]), text
+        elif name == 'base64_decoder':
+            # A streamed base64 error describes only the rest of the input left to decode
+            assert message.split("(")[0] == error.message.split("(")[0], text
+        else:
+            assert message == error.message, text
+
+def test_stream_chain_reports_first_failing_tool():
+    """Test that an error late in an earlier tool's output wins over invalid characters the next tool sees first."""
+    decimal = tools['decimal_decoder']()
+    octal = tools['octal_decoder']()
+    with pytest.raises(ToolError) as excinfo:
+        b"".join(octal.stream(decimal.stream(iter_chunks(b"65 66 67 999", 2))))
+    assert excinfo.value.tool_name == 'decimal_decoder'
+    assert "999" in excinfo.value.message
+
+def test_base64_decoder_length_error():
+    """Test that a base64 input of the wrong length fails in chunks like it does as a whole."""
+    data = b"QUJD" * 50 + b"Q"
+    _, _, error = tools['base64_decoder']().run_bytes(data)
+    assert error is not None
+    output, message = run_stream(tools['base64_decoder'](), data, 7)
+    assert output is None
+    assert message.startswith("Invalid Base64 input: ")
+
+def test_reverse_spills_to_file(monkeypatch):
+    """Test that reverse reads a spilled input back from the end in blocks."""
+    monkeypatch.setattr(streaming, 'SPOOL_SIZE', 1024)
+    data = bytes(range(256)) * 1000
+    assert run_stream(tools['reverse'](), data, 4096) == (data[::-1], None)
+
+def test_encoder_output_chunks_are_bounded():
+    """Test that encoders split large chunks so the output chunks stay bounded."""
+    data = b"x" * (streaming.CHUNK_SIZE * 4)
+    chunks = list(tools['hex_encoder']().stream([data]))
+    assert b"".join(chunks) == tools['hex_encoder']().run_bytes(data)[0]
+    assert max(map(len, chunks)) <= streaming.CHUNK_SIZE
+
+@pytest.mark.parametrize("chunks, expected", [
+    ([], []),
+    ([b"41 4", b"2 43"], [[b"41"], [b"42"], [b"43"]]),
+    ([b"4", b"1", b" "], [[b"41"], [b""]]),
+    ([b"  "], [[b"", b""], [b""]]),
+    ([b"41"], [[b"41"]]),
+])
+def test_stream_tokens(chunks, expected):
+    """Test that tokens cut by chunk boundaries are joined and the last token is always yielded."""
+    assert list(stream_tokens(chunks, b" ")) == expected
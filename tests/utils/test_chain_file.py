@@ -0,0 +1,70 @@
+import pytest
+from pallas.utils.chain_file import (BinaryChainReader, encode_record, is_binary_chain_file,
+                                     iter_chain_file, write_binary_header)
+from pallas.toolchain.ToolChainer import ToolChainer
+from pallas.toolchain.ToolProvider import ToolProvider
+from pallas.toolchain.rules.RuleEnforcer import RuleEnforcer
+from pallas.toolchain.rules.RedundantPairRule import RedundantPairRule
+
+TOOL_NAMES = ['hex_encoder', 'base64_decoder', 'reverse']
+
+@pytest.fixture
+def binary_file(tmp_path):
+    path = tmp_path / "toolchain.bin"
+    with open(path, 'wb') as f:
+        write_binary_header(f, TOOL_NAMES, 2)
+        for chain in ([0, 1], [1, 2], [2, 0], [0, 2]):
+            f.write(encode_record(chain))
+    return path
+
+def test_binary_reader_random_access(binary_file):
+    """Test reading the header and seeking to any record."""
+    with BinaryChainReader(binary_file) as reader:
+        assert reader.tool_names == TOOL_NAMES
+        assert reader.chain_length == 2
+        assert len(reader) == 4
+        assert reader[2] == ['reverse', 'hex_encoder']
+        with pytest.raises(IndexError):
+            reader[4]
+
+def test_binary_reader_record_range(binary_file):
+    """Test iterating a slice of records."""
+    with BinaryChainReader(binary_file) as reader:
+        assert list(reader.iter_chains(1, 3)) == [['base64_decoder', 'reverse'], ['reverse', 'hex_encoder']]
+
+def test_binary_reader_rejects_text_file(tmp_path):
+    """Test that a text file is not accepted as binary."""
+    path = tmp_path / "toolchain.txt"
+    path.write_text("hex_encoder -> reverse\n")
+    assert not is_binary_chain_file(path)
+    with pytest.raises(ValueError):
+        BinaryChainReader(path)
+
+def test_binary_reader_rejects_empty_file(tmp_path):
+    """Test that an empty file is rejected like any other non-binary file."""
+    path = tmp_path / "toolchain.bin"
+    path.touch()
+    with pytest.raises(ValueError, match="not a binary toolchain file"):
+        BinaryChainReader(path)
+
+def test_iter_chain_file_detects_format(binary_file, tmp_path):
+    """Test that text and binary files yield the same chains."""
+    text_file = tmp_path / "toolchain.txt"
+    text_file.write_text("# comment\nhex_encoder -> base64_decoder\nbase64_decoder -> reverse\n\n"
+                         "reverse -> hex_encoder\nhex_encoder -> reverse\n")
+    assert is_binary_chain_file(binary_file)
+    assert list(iter_chain_file(binary_file)) == list(iter_chain_file(text_file))
+    assert list(iter_chain_file(binary_file, 3)) == list(iter_chain_file(text_file, 3))
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_chainer_binary_output_matches_text(workers):
+    """Test that ToolChainer writes the same chains in both formats."""
+    chains = {}
+    for output_format in ('text', 'binary'):
+        chainer = ToolChainer(tool_provider=ToolProvider(), max_tree_size=3, workers=workers,
+                              rule_enforcer=RuleEnforcer([RedundantPairRule]), output_format=output_format)
+        chainer.generate_chains(run_id=f'format_{workers}')
+        assert chainer.output_file.suffix == ('.bin' if output_format == 'binary' else '.txt')
+        chains[output_format] = list(iter_chain_file(chainer.output_file))
+    assert chains['binary'] == chains['text']
+    assert len(chains['text']) == chainer.chain_count
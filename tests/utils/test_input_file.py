@@ -0,0 +1,25 @@
+import io
+import sys
+from pallas.utils.input_file import open_input_file
+
+def test_open_input_file_maps_file(tmp_path):
+    """Test that a file is mapped and the mapping is closed on exit."""
+    path = tmp_path / "input.bin"
+    path.write_bytes(b"48 65\xff")
+    with open_input_file(str(path)) as data:
+        assert data[:] == b"48 65\xff"
+        assert len(data) == 6
+    assert data.closed
+
+def test_open_input_file_empty(tmp_path):
+    """Test that an empty file, which cannot be mapped, gives an empty buffer."""
+    path = tmp_path / "empty.bin"
+    path.write_bytes(b"")
+    with open_input_file(str(path)) as data:
+        assert data == b""
+
+def test_open_input_file_stdin(monkeypatch):
+    """Test that '-' maps a spooled copy of standard input."""
+    monkeypatch.setattr(sys, 'stdin', io.TextIOWrapper(io.BytesIO(b"SGVsbG8=")))
+    with open_input_file('-') as data:
+        assert data[:] == b"SGVsbG8="
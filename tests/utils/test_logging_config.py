@@ -0,0 +1,93 @@
+import logging
+import threading
+import pytest
+from pallas.utils import logging_config
+from pallas.utils.logging_config import TRACE, close_logger, get_logger, setup_logger
+from pallas.utils.logging_helpers import LoggingHelper, Truncated
+
+@pytest.fixture(autouse=True)
+def in_tmp_path(tmp_path, monkeypatch):
+    """Write the logs/ directory under the test's temporary directory."""
+    monkeypatch.chdir(tmp_path)
+    yield
+    for name in list(logging_config._listeners):
+        if name.startswith('test.'):
+            close_logger(name)
+
+class Counted:
+    """An argument that counts how often it is formatted and on which thread."""
+
+    def __init__(self):
+        self.threads = []
+
+    def __str__(self):
+        self.threads.append(threading.current_thread())
+        return "counted"
+
+def read_log(tmp_path, name, run_id=None):
+    close_logger(name)
+    filename = f"{name.replace('.', '_')}_{run_id}.log" if run_id else f"{name.replace('.', '_')}.log"
+    return (tmp_path / 'logs' / filename).read_text()
+
+def test_records_are_written_by_the_listener_thread(tmp_path):
+    """Test that records are formatted on the listener thread and flushed when the logger closes."""
+    logger = setup_logger('test.listener', run_id='run')
+    argument = Counted()
+    logger.info("value %s", argument)
+
+    assert read_log(tmp_path, 'test.listener', 'run').endswith("INFO - value counted\n")
+    # pytest's own capture handler formats the propagated record on the calling thread as well
+    assert any(thread is not threading.current_thread() for thread in argument.threads)
+
+def test_disabled_levels_are_not_formatted(tmp_path):
+    """Test that messages below the level never format their arguments."""
+    logger = get_logger('test.levels')
+    argument = Counted()
+    logger.debug("value %s", argument)
+    logger.log(TRACE, "value %s", argument)
+    logger.info("written")
+
+    assert "value" not in read_log(tmp_path, 'test.levels')
+    assert argument.threads == []
+
+def test_listener_starts_with_first_record():
+    """Test that a logger nothing is written to starts no thread and opens no file."""
+    setup_logger('test.lazy')
+    listener = logging_config._listeners['test.lazy']
+    assert listener.thread is None
+    logging.getLogger('test.lazy').info("first")
+    assert listener.thread is not None
+
+def test_setup_logger_closes_previous_handlers(tmp_path):
+    """Test that setting a logger up again closes the file of its previous handlers."""
+    logger = setup_logger('test.reset', run_id='first')
+    logger.info("first")
+    listener = logging_config._listeners['test.reset']
+    [file_handler] = listener.handlers
+
+    setup_logger('test.reset', run_id='second')
+    assert file_handler.stream is None
+    assert listener.thread is None
+    assert len(logger.handlers) == 1
+    assert read_log(tmp_path, 'test.reset', 'first').endswith("first\n")
+
+def test_trace_is_opt_in(tmp_path):
+    """Test that trace messages are only written when enabled, with long payloads cut."""
+    LoggingHelper('test.trace_off').trace("payload %s", "x" * 10)
+    close_logger('test.trace_off')
+    assert not (tmp_path / 'logs' / 'test_trace_off.log').exists()
+
+    helper = LoggingHelper('test.trace_on', trace=True, trace_limit=4)
+    assert helper.trace_enabled()
+    helper.trace("payload %s %s", "x" * 10, b"abc")
+    assert read_log(tmp_path, 'test.trace_on').endswith("TRACE - payload xxxx... (10 chars) abc\n")
+
+@pytest.mark.parametrize("value, expected", [
+    ("four", "four"),
+    ("long text", "long... (9 chars)"),
+    (b"\xe9t\xe9", "\xe9t\xe9"),
+    (b"bytes!", "byte... (6 chars)"),
+    (12345678, "1234... (8 chars)"),
+])
+def test_truncated(value, expected):
+    assert str(Truncated(value, 4)) == expected
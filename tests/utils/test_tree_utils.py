@@ -1,38 +1,39 @@
+import itertools
 import pytest
-from pallas.utils.tree_utils import calculate_max_tree_size
+from pallas.utils.tree_utils import calculate_max_tree_size, calculate_subtree_sizes
 
 def test_calculate_max_tree_size_empty_tools():
     """Test calculation with empty tools list."""
     assert calculate_max_tree_size([], 3) == 0
 
 def test_calculate_max_tree_size_single_tool():
-    """Test calculation with a single tool."""
-    assert calculate_max_tree_size(['tool1'], 3) == 3
+    """Test calculation with a single tool, which cannot follow itself."""
+    assert calculate_max_tree_size(['tool1'], 3) == 1
 
 def test_calculate_max_tree_size_two_tools():
     """Test calculation with two tools."""
     # For 2 tools and max_tree_size=3:
     # Level 1: 2 nodes
-    # Level 2: 4 nodes (2²)
-    # Level 3: 8 nodes (2³)
-    # Total = 2 + 4 + 8 = 14
-    assert calculate_max_tree_size(['tool1', 'tool2'], 3) == 14
+    # Level 2: 2 nodes (2 * 1)
+    # Level 3: 0 nodes (no tool left)
+    # Total = 2 + 2 = 4
+    assert calculate_max_tree_size(['tool1', 'tool2'], 3) == 4
 
 def test_calculate_max_tree_size_three_tools():
     """Test calculation with three tools."""
     # For 3 tools and max_tree_size=2:
     # Level 1: 3 nodes
-    # Level 2: 9 nodes (3²)
-    # Total = 3 + 9 = 12
-    assert calculate_max_tree_size(['tool1', 'tool2', 'tool3'], 2) == 12
+    # Level 2: 6 nodes (3 * 2)
+    # Total = 3 + 6 = 9
+    assert calculate_max_tree_size(['tool1', 'tool2', 'tool3'], 2) == 9
 
 def test_calculate_max_tree_size_large_input():
     """Test calculation with larger number of tools."""
     # For 5 tools and max_tree_size=2:
     # Level 1: 5 nodes
-    # Level 2: 25 nodes (5²)
-    # Total = 5 + 25 = 30
-    assert calculate_max_tree_size(['tool1', 'tool2', 'tool3', 'tool4', 'tool5'], 2) == 30
+    # Level 2: 20 nodes (5 * 4)
+    # Total = 5 + 20 = 25
+    assert calculate_max_tree_size(['tool1', 'tool2', 'tool3', 'tool4', 'tool5'], 2) == 25
 
 def test_calculate_max_tree_size_max_depth_one():
     """Test calculation with max_tree_size=1."""
@@ -43,4 +44,21 @@ def test_calculate_max_tree_size_max_depth_one():
 def test_calculate_max_tree_size_zero_max_depth():
     """Test calculation with max_tree_size=0."""
     tools = ['tool1', 'tool2', 'tool3']
-    assert calculate_max_tree_size(tools, 0) == 0
\ No newline at end of file
+    assert calculate_max_tree_size(tools, 0) == 0
+
+@pytest.mark.parametrize("tool_count, max_tree_size", [(1, 1), (3, 2), (4, 4), (5, 3), (3, 5)])
+def test_calculate_max_tree_size_counts_permutations(tool_count, max_tree_size):
+    """Test that the tree size matches enumerating every chain without repeated tools."""
+    tools = [f'tool{i}' for i in range(tool_count)]
+    expected = sum(len(list(itertools.permutations(tools, level))) for level in range(1, max_tree_size + 1))
+    assert calculate_max_tree_size(tools, max_tree_size) == expected
+
+@pytest.mark.parametrize("tool_count, max_tree_size", [(4, 3), (5, 5), (3, 5), (6, 2)])
+def test_calculate_subtree_sizes(tool_count, max_tree_size):
+    """Test that pruning every first tool cuts the complete tree, and subtrees shrink by depth."""
+    sizes = calculate_subtree_sizes(tool_count, max_tree_size)
+    assert len(sizes) == max_tree_size
+    assert tool_count * sizes[0] == calculate_max_tree_size(list(range(tool_count)), max_tree_size)
+    assert sizes[-1] == (1 if tool_count >= max_tree_size else 0)
+    for depth in range(min(max_tree_size, tool_count) - 1):
+        assert sizes[depth] == 1 + (tool_count - depth - 1) * sizes[depth + 1]